@@ -0,0 +1,260 @@
+"""
+Agent: runs SystemMonitor headless and ships snapshots to a collector.
+
+Rows are queued, then sent in batches every --batch seconds (see app/wire.py).
+If the collector is slow or away, rows wait in a bounded queue, and the
+oldest are dropped once it is full.
+
+    python -m app.agent --collector 10.0.0.5:7700
+    python -m app.agent --collector 127.0.0.1:7700 --udp --name web-01
+    python -m app.agent --collector 127.0.0.1:7700 --clones 300      # load-test a collector
+"""
+import argparse
+import collections
+import json
+import socket
+import sys
+import threading
+import time
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+from .config import CONFIG
+from .disks import DiskProber
+from .monitor import SystemMonitor
+from .recorder import snapshot_values
+from .sampler import Sampler
+from .wire import MAX_SCHEMAS, BatchEncoder, column_places, encode_hello, frame, quantize
+
+# keeps a UDP datagram under a typical path MTU
+MAX_DATAGRAM = 1200
+
+
+def parse_address(s: str, default_port: int = 7700) -> Tuple[str, int]:
+    host, _, port = s.rpartition(":")
+    if not host:
+        return s, default_port
+    return host.strip("[]"), int(port)
+
+
+class Agent:
+    """
+    Queues snapshots (append() is a Sampler sink) and sends them from its own
+    thread, so a slow network never delays sampling.
+
+    TCP: a batch is only built once the previous one is fully written. A
+    collector that stops reading therefore fills the socket, then the queue,
+    and then old rows are dropped, counted in `dropped`.
+    UDP: one batch per datagram, no retries.
+    """
+
+    def __init__(self, address: Tuple[str, int], name: Optional[str] = None, udp: bool = False,
+                 batch_s: float = 5.0, queue_rows: int = 600, timeout_s: float = 2.0):
+        self.address = address
+        self.name = name or socket.gethostname()
+        self.udp = udp
+        self.batch_s = batch_s
+        self.timeout_s = timeout_s
+        self._rows: Deque[Tuple[float, int, Tuple[int, ...]]] = collections.deque(maxlen=max(1, queue_rows))
+        self._schemas: List[Tuple[Tuple[str, ...], Tuple[int, ...]]] = []
+        # column set -> its schema id, so a disk that comes and goes reuses its ids
+        self._schema_ids: Dict[Tuple[str, ...], int] = {}
+        self._schema = -1
+        self._sock: Optional[socket.socket] = None
+        self._out = b""
+        self._hello_sent: set = set()
+        self._retry_at = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.sent_rows = 0
+        self.sent_bytes = 0
+        self.dropped = 0
+        self.last_error: Optional[str] = None
+
+    # --- sampler side ---
+
+    def append(self, snap) -> None:
+        values = snapshot_values(snap)
+        self.append_values(snap.ts, tuple(values), tuple(values.values()))
+
+    def append_values(self, ts: float, columns: Tuple[str, ...], values: Sequence[float]) -> None:
+        schemas = self._schemas
+        schema = self._schema
+        if schema < 0 or schemas[schema][0] != columns:
+            schema = self._schema_ids.get(columns, -1)
+            if schema < 0:
+                if len(schemas) >= MAX_SCHEMAS:
+                    # ids are u16 on the wire: start over, and drop the rows that use the old ones
+                    self.dropped += len(self._rows)
+                    self._rows.clear()
+                    schemas.clear()
+                    self._schema_ids.clear()
+                    self._hello_sent = set()
+                # a new set of columns: new schema id, announced before its first batch
+                schema = self._schema_ids[columns] = len(schemas)
+                schemas.append((columns, tuple(column_places(c) for c in columns)))
+            self._schema = schema
+        if len(self._rows) == self._rows.maxlen:
+            self.dropped += 1
+        self._rows.append((ts, schema, quantize(values, schemas[schema][1])))
+
+    # --- sender thread ---
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="syspulse-agent", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+        self._close()
+
+    def _run(self):
+        while not self._stop.wait(self.batch_s):
+            try:
+                self.flush()
+            except Exception as e:
+                # keep sending later rows; the reason shows up in stats()
+                self.last_error = f"flush: {type(e).__name__}: {e}"
+
+    def _connect(self) -> bool:
+        if self._sock is not None:
+            return True
+        now = time.monotonic()
+        if now < self._retry_at:
+            return False
+        try:
+            if self.udp:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                sock.connect(self.address)
+            else:
+                sock = socket.create_connection(self.address, timeout=self.timeout_s)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.settimeout(self.timeout_s)
+        except OSError as e:
+            self.last_error = f"connect: {e}"
+            self._retry_at = now + min(30.0, max(1.0, self.batch_s))
+            return False
+        self._sock = sock
+        self._out = b""
+        self._hello_sent = set()
+        return True
+
+    def _close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def _take_batch(self, limit: int) -> List[bytes]:
+        """Pop queued rows of one schema into messages (HELLO first if needed)."""
+        if not self._rows:
+            return []
+        schema = self._rows[0][1]
+        msgs = []
+        # UDP: resend the schema every batch; it is small and datagrams get lost
+        if self.udp or schema not in self._hello_sent:
+            columns, places = self._schemas[schema]
+            msgs.append(encode_hello(self.name, schema, columns, places))
+            self._hello_sent.add(schema)
+        enc = BatchEncoder(self.name, schema)
+        while self._rows and self._rows[0][1] == schema and enc.size() < limit and enc.rows < 65535:
+            ts, _, ivalues = self._rows.popleft()
+            enc.add(ts, ivalues)
+        self.sent_rows += enc.rows
+        msgs.append(enc.finish())
+        return msgs
+
+    def flush(self):
+        if not self._rows and not self._out:
+            return
+        if not self._connect():
+            return
+        try:
+            if self.udp:
+                while self._rows:
+                    for msg in self._take_batch(MAX_DATAGRAM - 200):
+                        self._sock.send(msg)
+                        self.sent_bytes += len(msg)
+                return
+            while True:
+                if not self._out:
+                    msgs = self._take_batch(64 * 1024)
+                    if not msgs:
+                        return
+                    self._out = b"".join(frame(m) for m in msgs)
+                # a collector that is not reading makes this time out: keep the rest for later
+                n = self._sock.send(self._out)
+                self._out = self._out[n:]
+                self.sent_bytes += n
+        except socket.timeout:
+            self.last_error = "collector is not keeping up"
+        except OSError as e:
+            self.last_error = f"send: {e}"
+            self._close()
+            self._retry_at = time.monotonic() + 1.0
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self._rows),
+            "sent_rows": self.sent_rows,
+            "sent_bytes": self.sent_bytes,
+            "dropped": self.dropped,
+            "error": self.last_error,
+        }
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="ship SysPulse snapshots to a collector")
+    p.add_argument("--collector", required=True, metavar="HOST:PORT")
+    p.add_argument("--name", default=None, help="host name shown by the collector (default: hostname)")
+    p.add_argument("--udp", action="store_true", help="send datagrams instead of a TCP stream")
+    p.add_argument("--interval", type=float, default=CONFIG.refresh_ms / 1000.0, help="seconds between samples")
+    p.add_argument("--batch", type=float, default=CONFIG.agent_batch_s, help="seconds between sends")
+    p.add_argument("--clones", type=int, default=0,
+                   help="also send every sample as N extra hosts (<name>-1 ..), to load-test a collector")
+    p.add_argument("--stats", action="store_true", help="print send stats to stderr every batch")
+    args = p.parse_args(argv)
+
+    address = parse_address(args.collector, CONFIG.collector_port)
+    agent = Agent(address, args.name, args.udp, args.batch, CONFIG.agent_queue_rows)
+    clones = [Agent(address, f"{agent.name}-{i}", args.udp, args.batch, CONFIG.agent_queue_rows)
+              for i in range(1, args.clones + 1)]
+    agents = [agent] + clones
+
+    monitor = SystemMonitor(
+        history_points=CONFIG.history_points,
+        disk_prober=DiskProber(
+            CONFIG.disk_partitions_refresh_s,
+            CONFIG.disk_probe_timeout_s,
+            CONFIG.disk_probe_workers,
+            CONFIG.disk_probe_max_workers,
+        ),
+    )
+    sampler = Sampler(monitor, interval_ms=int(args.interval * 1000), with_connections=False,
+                      sinks=[a.append for a in agents])
+    sampler.start()
+    for a in agents:
+        a.start()
+    try:
+        while True:
+            time.sleep(args.batch)
+            if args.stats:
+                total = {"hosts": len(agents), "sent_bytes": sum(a.sent_bytes for a in agents),
+                         "dropped": sum(a.dropped for a in agents), "error": agent.last_error}
+                print(json.dumps(total), file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sampler.stop()
+        for a in agents:
+            a.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+"""
+Rule-based alerts over the snapshot stream, evaluated incrementally.
+
+A rule is one line:
+
+    <name>: <stat>(<metric>, <window>) <op> <threshold> [clear <value>] [warn|crit]
+
+    cpu_hot:     avg(cpu, 60s) > 85 clear 80 warn
+    disk_fill:   rate(disk_free:*, 1h) < -5 warn      # GB per hour
+    core_sat:    avg(core*, 30s) > 95 clear 85
+
+stat is avg / min / max / rate (change per hour, least squares over the
+window); metric may be a glob and binds to every matching column. Columns are
+the history names (cpu, ram, net_up, net_down, core<N>, disk:<mount>) plus
+disk_free:<mount> in GB.
+
+Each (column, window) keeps one RollingWindow shared by all rules on it, with
+running sums, so a tick costs O(1) per window and per rule. A rule fires when
+the stat crosses the threshold and resolves only once it is back past `clear`
+(hysteresis). Only transitions are logged: one "fired" and one "resolved" per
+episode, and a re-fire within `cooldown_s` of resolving is folded into the
+previous episode. A column that stops reporting (unmounted disk, unplugged
+NIC) for a whole window resolves its open alerts and is forgotten; if it
+comes back it starts over with empty windows.
+"""
+import collections
+import fnmatch
+import json
+import os
+import re
+import threading
+from dataclasses import asdict, dataclass, field, replace
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from .recorder import snapshot_values
+
+STATS = ("avg", "min", "max", "rate")
+SEVERITIES = {"warn": "WARNING", "crit": "CRITICAL"}
+_RANK = {"OK": 0, "WARNING": 1, "CRITICAL": 2}
+
+_RULE_RE = re.compile(
+    r"^\s*(?P<name>[\w.-]+)\s*:\s*(?P<stat>\w+)\(\s*(?P<metric>[^,\s]+)\s*,\s*(?P<window>[\d.]+[smh]?)\s*\)"
+    r"\s*(?P<op>[<>])\s*(?P<threshold>-?[\d.]+)"
+    r"(?:\s+clear\s+(?P<clear>-?[\d.]+))?(?:\s+(?P<severity>warn|crit))?\s*$"
+)
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    stat: str
+    metric: str
+    window_s: float
+    op: str
+    threshold: float
+    clear: float
+    severity: str = "WARNING"
+
+    def breached(self, v: float) -> bool:
+        return v > self.threshold if self.op == ">" else v < self.threshold
+
+    def cleared(self, v: float) -> bool:
+        return v <= self.clear if self.op == ">" else v >= self.clear
+
+
+def parse_rule(text: str) -> Rule:
+    m = _RULE_RE.match(text)
+    if not m:
+        raise ValueError(f"bad alert rule: {text!r}")
+    stat = m["stat"]
+    if stat not in STATS:
+        raise ValueError(f"bad alert rule: {text!r} (stat must be one of {', '.join(STATS)})")
+    w = m["window"]
+    window_s = float(w[:-1]) * {"s": 1, "m": 60, "h": 3600}[w[-1]] if w[-1] in "smh" else float(w)
+    op = m["op"]
+    threshold = float(m["threshold"])
+    if m["clear"] is not None:
+        clear = float(m["clear"])
+    else:
+        # default band: 5% of the threshold, on the safe side
+        band = abs(threshold) * 0.05
+        clear = threshold - band if op == ">" else threshold + band
+    return Rule(
+        name=m["name"],
+        stat=stat,
+        metric=m["metric"],
+        window_s=window_s,
+        op=op,
+        threshold=threshold,
+        clear=clear,
+        severity=SEVERITIES[m["severity"] or "warn"],
+    )
+
+
+class RollingWindow:
+    """
+    Samples of one column over the last `window_s` seconds.
+
+    Keeps running sums (for avg and the least-squares slope) and monotonic
+    deques (for min / max), so add() is amortized O(1) and every stat is O(1).
+    """
+
+    # sums are rebuilt from the samples this often, to stop float drift
+    REBUILD_EVERY = 10000
+
+    def __init__(self, window_s: float, track_extremes: bool = True):
+        self.window_s = window_s
+        self._q: Deque[Tuple[float, float]] = collections.deque()
+        self._min: Deque[Tuple[float, float]] = collections.deque()
+        self._max: Deque[Tuple[float, float]] = collections.deque()
+        self._extremes = track_extremes
+        # times are relative to t0 to keep the slope sums well conditioned
+        self._t0: Optional[float] = None
+        self._n = 0
+        self._st = self._stt = self._sv = self._stv = 0.0
+        self._evicted = 0
+
+    def add(self, ts: float, v: float):
+        if self._t0 is None:
+            self._t0 = ts
+        t = ts - self._t0
+        self._q.append((t, v))
+        self._n += 1
+        self._sv += v
+        self._st += t
+        self._stt += t * t
+        self._stv += t * v
+        if self._extremes:
+            while self._min and self._min[-1][1] >= v:
+                self._min.pop()
+            self._min.append((t, v))
+            while self._max and self._max[-1][1] <= v:
+                self._max.pop()
+            self._max.append((t, v))
+
+        cutoff = t - self.window_s
+        q = self._q
+        while q and q[0][0] < cutoff:
+            ot, ov = q.popleft()
+            self._n -= 1
+            self._sv -= ov
+            self._st -= ot
+            self._stt -= ot * ot
+            self._stv -= ot * ov
+            self._evicted += 1
+        if self._extremes:
+            while self._min and self._min[0][0] < cutoff:
+                self._min.popleft()
+            while self._max and self._max[0][0] < cutoff:
+                self._max.popleft()
+        if self._evicted >= self.REBUILD_EVERY:
+            self._rebuild()
+
+    def _rebuild(self):
+        self._evicted = 0
+        self._sv = sum(v for _, v in self._q)
+        self._st = sum(t for t, _ in self._q)
+        self._stt = sum(t * t for t, _ in self._q)
+        self._stv = sum(t * v for t, v in self._q)
+
+    def span(self) -> float:
+        return self._q[-1][0] - self._q[0][0] if self._q else 0.0
+
+    def warm(self) -> bool:
+        """Enough history to judge: at least two samples spanning half the window."""
+        return self._n >= 2 and self.span() >= self.window_s * 0.5
+
+    def stat(self, name: str) -> float:
+        if name == "avg":
+            return self._sv / self._n
+        if name == "min":
+            return self._min[0][1]
+        if name == "max":
+            return self._max[0][1]
+        # rate: least-squares slope, per hour
+        n = self._n
+        den = n * self._stt - self._st * self._st
+        if den <= 0:
+            return 0.0
+        return (n * self._stv - self._st * self._sv) / den * 3600.0
+
+
+@dataclass(frozen=True)
+class AlertEvent:
+    rule: str
+    column: str
+    severity: str
+    state: str          # "fired" / "resolved"
+    ts: float
+    value: float
+    threshold: float
+    since: float
+    # re-fires folded into this episode (cooldown)
+    repeats: int = 0
+    message: str = field(default="", compare=False)
+
+
+class _Binding:
+    __slots__ = ("rule", "column", "window", "active", "event", "resolved_at")
+
+    def __init__(self, rule: Rule, column: str, window: RollingWindow):
+        self.rule = rule
+        self.column = column
+        self.window = window
+        self.active = False
+        self.event: Optional[AlertEvent] = None
+        self.resolved_at = float("-inf")
+
+
+def alert_values(snap) -> Dict[str, float]:
+    """snapshot_values() plus disk_free:<mount> (GB) for the disk rules."""
+    values = snapshot_values(snap)
+    for d in snap.disks:
+        values[f"disk_free:{d.mount}"] = d.free_gb
+    return values
+
+
+class AlertEngine:
+    """
+    Evaluates rules on every snapshot (observe() is a Sampler sink).
+
+    `active` maps (rule, column) to the open AlertEvent, and `events` keeps
+    the newest transitions; both are read by the UI thread under `lock`.
+    Transitions are also appended to `log_path` as NDJSON.
+    """
+
+    def __init__(self, rules: Iterable[Rule], log_path: Optional[str] = None,
+                 cooldown_s: float = 60.0, max_events: int = 200):
+        self.rules = list(rules)
+        self.log_path = log_path
+        if log_path:
+            os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+        self.cooldown_s = cooldown_s
+        self.lock = threading.Lock()
+        self.active: Dict[Tuple[str, str], AlertEvent] = {}
+        self.events: Deque[AlertEvent] = collections.deque(maxlen=max_events)
+        # bumped whenever `active` or `events` change, so readers can skip redraws;
+        # events are frozen and replaced, never changed in place
+        self.version = 0
+        self._windows: Dict[Tuple[str, float], RollingWindow] = {}
+        self._by_column: Dict[str, List[RollingWindow]] = {}
+        self._bindings: List[_Binding] = []
+        self._columns: set = set()
+        # column -> ts of its newest real (non-NaN) value, for columns some rule watches
+        self._seen: Dict[str, float] = {}
+        # column -> its longest window: how long it may go unreported before it is dropped
+        self._span: Dict[str, float] = {}
+        self._expire_at = float("-inf")
+
+    def _bind(self, column: str):
+        self._columns.add(column)
+        windows = self._by_column.setdefault(column, [])
+        for rule in self.rules:
+            if not fnmatch.fnmatchcase(column, rule.metric):
+                continue
+            key = (column, rule.window_s)
+            w = self._windows.get(key)
+            if w is None:
+                w = self._windows[key] = RollingWindow(rule.window_s)
+                windows.append(w)
+            self._bindings.append(_Binding(rule, column, w))
+        if windows:
+            self._span[column] = max(w.window_s for w in windows)
+            # may run out before the next planned check
+            self._expire_at = float("-inf")
+
+    def observe(self, snap) -> List[AlertEvent]:
+        return self.observe_values(snap.ts, alert_values(snap))
+
+    def _resolve(self, b: _Binding, ts: float, v: float, message: str,
+                 publish: Dict[Tuple[str, str], Optional[AlertEvent]]) -> AlertEvent:
+        rule = b.rule
+        b.active = False
+        b.resolved_at = ts
+        publish[(rule.name, b.column)] = None
+        return AlertEvent(
+            rule=rule.name, column=b.column, severity=rule.severity, state="resolved",
+            ts=ts, value=v, threshold=rule.threshold, since=b.event.since,
+            repeats=b.event.repeats, message=message,
+        )
+
+    def _expire(self, ts: float, changed: List[AlertEvent],
+                publish: Dict[Tuple[str, str], Optional[AlertEvent]]):
+        """Resolve and unbind the columns that have had no value for their longest window."""
+        gone = set()
+        # next time a column still reporting could run out; no rescan before then
+        expire_at = float("inf")
+        for column, seen in self._seen.items():
+            until = seen + self._span[column]
+            if ts > until:
+                gone.add(column)
+            elif until < expire_at:
+                expire_at = until
+        self._expire_at = expire_at
+        if not gone:
+            return
+        keep = []
+        for b in self._bindings:
+            if b.column not in gone:
+                keep.append(b)
+            elif b.active:
+                changed.append(self._resolve(
+                    b, ts, b.event.value,
+                    f"{b.column} not reported for {ts - self._seen[b.column]:.0f}s", publish,
+                ))
+        self._bindings = keep
+        for column in gone:
+            del self._seen[column]
+            del self._span[column]
+            self._columns.discard(column)
+            for w in self._by_column.pop(column):
+                del self._windows[(column, w.window_s)]
+
+    def observe_values(self, ts: float, values: Dict[str, float]) -> List[AlertEvent]:
+        for column in values:
+            if column not in self._columns:
+                self._bind(column)
+        present = set()
+        for column, v in values.items():
+            windows = self._by_column[column]
+            if windows and v == v:  # skip NaN: no reading for this column this time
+                present.add(column)
+                self._seen[column] = ts
+                for w in windows:
+                    w.add(ts, v)
+
+        changed: List[AlertEvent] = []
+        # (rule, column) -> its new AlertEvent in `active`, or None to remove it
+        publish: Dict[Tuple[str, str], Optional[AlertEvent]] = {}
+        if len(present) < len(self._seen) and ts >= self._expire_at:
+            self._expire(ts, changed, publish)
+        for b in self._bindings:
+            w = b.window
+            if b.column not in present or not w.warm():
+                continue
+            rule = b.rule
+            v = w.stat(rule.stat)
+            key = (rule.name, b.column)
+            if not b.active and rule.breached(v):
+                b.active = True
+                message = f"{rule.stat}({b.column}, {rule.window_s:g}s) = {v:.2f} {rule.op} {rule.threshold:g}"
+                if b.event is not None and ts - b.resolved_at < self.cooldown_s:
+                    # flapping: same episode, logged as a repeat
+                    b.event = replace(b.event, state="fired", ts=ts, value=v,
+                                      repeats=b.event.repeats + 1, message=message)
+                else:
+                    b.event = AlertEvent(
+                        rule=rule.name, column=b.column, severity=rule.severity, state="fired",
+                        ts=ts, value=v, threshold=rule.threshold, since=ts, message=message,
+                    )
+                changed.append(b.event)
+                publish[key] = b.event
+            elif b.active:
+                if rule.cleared(v):
+                    changed.append(self._resolve(
+                        b, ts, v, f"{rule.stat}({b.column}, {rule.window_s:g}s) = {v:.2f} back past {rule.clear:g}",
+                        publish,
+                    ))
+                elif v != b.event.value:
+                    b.event = replace(b.event, value=v)
+                    publish[key] = b.event
+
+        if publish or changed:
+            with self.lock:
+                for key, event in publish.items():
+                    if event is None:
+                        self.active.pop(key, None)
+                    else:
+                        self.active[key] = event
+                self.events.extend(changed)
+                self.version += 1
+            if changed:
+                self._log(changed)
+        return changed
+
+    def _log(self, events: List[AlertEvent]):
+        if not self.log_path:
+            return
+        try:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                for e in events:
+                    f.write(json.dumps(asdict(e), separators=(",", ":")) + "\n")
+        except OSError:
+            pass
+
+    def status(self, prefixes: Iterable[str]) -> str:
+        """Worst active severity among columns starting with any of `prefixes` ("OK" if none)."""
+        prefixes = tuple(prefixes)
+        worst = "OK"
+        with self.lock:
+            for (_, column), e in self.active.items():
+                if column.startswith(prefixes) and _RANK[e.severity] > _RANK[worst]:
+                    worst = e.severity
+        return worst
+
+    def snapshot(self) -> Tuple[List[AlertEvent], List[AlertEvent]]:
+        """(active alerts, newest events first) for display."""
+        with self.lock:
+            return list(self.active.values()), list(reversed(self.events))
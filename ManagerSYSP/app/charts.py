@@ -0,0 +1,358 @@
+"""
+Live charts that redraw only what moves.
+
+Axes, ticks, labels and legends are drawn once into a cached background.
+Each tick restores that background, feeds the new history into the existing
+artists with set_data / set_segments, draws just those artists and blits the
+axes areas. Layout (tight_layout) runs only on resize, and a full redraw
+happens only then or when an auto-scaled axis needs a new limit.
+
+A group of series (every core, every disk) is one artist: a min-max band
+(one polygon, the same cost for 8 or 128 cores) or a LineCollection when the
+group is small enough for individual lines to be readable. A heatmap panel
+shows a group as one image (columns x time) whose backing array is refilled
+in place; Agg resamples it to the axes' pixels, so it too costs the same for
+any core count.
+
+    python -m app.charts --bench --cores 64 --frames 200     # FPS: this renderer vs. clear-and-replot
+"""
+import argparse
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.collections import LineCollection
+from matplotlib.patches import Polygon
+
+
+@dataclass(frozen=True)
+class Series:
+    column: str           # history column, or a prefix ending in "*" for a group
+    label: str = ""
+    scale: float = 1.0    # e.g. 1 / 2**20 for MB/s
+    color: Optional[str] = None
+    width: float = 1.5
+    alpha: float = 1.0
+    # groups only: draw the min-max envelope instead of one line per column
+    band: bool = False
+
+
+@dataclass(frozen=True)
+class Panel:
+    ylabel: str
+    series: Tuple[Series, ...]
+    ylim: Optional[Tuple[float, float]] = None    # None = auto, in "nice" steps
+    legend: bool = False
+    # one image of the (single, grouped) series instead of lines; ylim is the color range
+    heatmap: bool = False
+    height: float = 1.0   # relative to the other panels
+
+
+def default_panels(per_core: bool = True, disks: bool = False, heatmap: bool = False) -> List[Panel]:
+    mb = 1 / 2 ** 20
+    cpu = (Series("core*", alpha=0.2, color="tab:blue", band=True),) if per_core else ()
+    panels = [
+        Panel("CPU %", cpu + (Series("cpu", "CPU", color="tab:blue"),), ylim=(0, 100)),
+        Panel("RAM %", (Series("ram", "RAM", color="tab:orange"),), ylim=(0, 100)),
+        Panel("Net MB/s", (Series("net_up", "Up (MB/s)", mb), Series("net_down", "Down (MB/s)", mb)), legend=True),
+    ]
+    if disks:
+        panels.append(Panel("Disk %", (Series("disk:*", width=1.0, color="tab:green"),), ylim=(0, 100)))
+    if heatmap:
+        panels.append(Panel("Core", (Series("core*"),), ylim=(0, 100), heatmap=True, height=2.0))
+    return panels
+
+
+def _nice_ceiling(v: float) -> float:
+    """1, 2, 5 x 10^k at or above v."""
+    if v <= 0 or not math.isfinite(v):
+        return 1.0
+    exp = math.floor(math.log10(v))
+    for m in (1, 2, 5, 10):
+        if m * 10 ** exp >= v:
+            return m * 10 ** exp
+    return 10 ** (exp + 1)
+
+
+class _HeatBuffer:
+    """
+    RGBA bytes of a heatmap, colour-mapped through a 256-entry table into
+    arrays that are reused every frame (reallocated only when the shape
+    changes). The image gets ready-made pixels, so matplotlib skips its own
+    normalize / colour-map pass. NaN (no sample) is transparent.
+    """
+
+    def __init__(self, cmap, vmin: float, vmax: float):
+        self.vmin = vmin
+        self.scale = 255.0 / (vmax - vmin)
+        # index 256 = no data
+        self.lut = np.vstack([cmap(np.linspace(0.0, 1.0, 256), bytes=True), [[0, 0, 0, 0]]]).astype(np.uint8)
+        self.rows = -1
+        self._f = self._i = self.rgba = None
+
+    def fill(self, y: np.ndarray) -> np.ndarray:
+        """y: (time, rows) -> (rows, time, 4) uint8, in place."""
+        shape = y.shape[::-1]
+        if self._f is None or self._f.shape != shape:
+            self.rows = shape[0]
+            self._f = np.empty(shape)
+            self._i = np.empty(shape, dtype=np.intp)
+            self.rgba = np.empty(shape + (4,), dtype=np.uint8)
+        f = self._f
+        np.subtract(y.T, self.vmin, out=f)
+        f *= self.scale
+        np.clip(f, 0.0, 255.0, out=f)
+        np.nan_to_num(f, copy=False, nan=256.0)
+        np.copyto(self._i, f, casting="unsafe")
+        np.take(self.lut, self._i, axis=0, out=self.rgba)
+        return self.rgba
+
+
+class LiveCharts:
+    """
+    Stacked time-series panels over a HistoryStore, updated by blitting.
+
+    `canvas` is any Agg-based matplotlib canvas (FigureCanvasTkAgg in the app,
+    FigureCanvasAgg in the benchmark).
+    """
+
+    def __init__(self, fig, canvas, panels: Sequence[Panel], window_s: float = 60.0):
+        self.fig = fig
+        self.canvas = canvas
+        self.panels = list(panels)
+        self.window_s = window_s
+        self.axes = fig.subplots(len(self.panels), 1, sharex=True, squeeze=False,
+                                 gridspec_kw={"height_ratios": [p.height for p in self.panels]})[:, 0]
+        # per panel: [(series, artist)]
+        self._artists: List[List[Tuple[Series, object]]] = []
+        # id(image) -> its backing arrays
+        self._heat: Dict[int, _HeatBuffer] = {}
+        self._bg = None
+        self.full_draws = 0
+
+        for ax, panel in zip(self.axes, self.panels):
+            arts = []
+            for s in panel.series:
+                if panel.heatmap:
+                    heat = _HeatBuffer(colormaps["magma"], *panel.ylim)
+                    art = ax.imshow(np.zeros((1, 1, 4), dtype=np.uint8), aspect="auto", origin="lower",
+                                    interpolation="nearest", extent=(-window_s, 0, -0.5, 0.5), animated=True)
+                    self._heat[id(art)] = heat
+                    ax.set_autoscale_on(False)
+                elif s.band:
+                    art = Polygon(np.zeros((0, 2)), closed=True, lw=0, alpha=s.alpha,
+                                  facecolor=s.color or "tab:gray", animated=True)
+                    ax.add_patch(art)
+                elif s.column.endswith("*"):
+                    art = LineCollection([], linewidths=s.width, alpha=s.alpha, colors=s.color or "tab:gray",
+                                         animated=True)
+                    ax.add_collection(art)
+                else:
+                    (art,) = ax.plot([], [], lw=s.width, alpha=s.alpha, color=s.color, label=s.label or None,
+                                     animated=True)
+                arts.append((s, art))
+            self._artists.append(arts)
+            ax.set_ylabel(panel.ylabel)
+            ax.set_xlim(-window_s, 0)
+            if not panel.heatmap:
+                ax.set_ylim(*(panel.ylim or (0, 1)))
+            if panel.legend:
+                # legend handles need no data; drawn once with the background
+                ax.legend(loc="upper right", fontsize=8)
+        self.axes[-1].set_xlabel("seconds ago")
+        fig.tight_layout()
+
+        canvas.mpl_connect("draw_event", self._on_draw)
+        canvas.mpl_connect("resize_event", self._on_resize)
+
+    def _on_resize(self, event=None):
+        # the only place layout is recomputed; the resize redraw then refreshes the background
+        self.fig.tight_layout()
+        self._bg = None
+
+    def _on_draw(self, event=None):
+        self.full_draws += 1
+        self._bg = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        for ax, arts in zip(self.axes, self._artists):
+            for _, art in arts:
+                ax.draw_artist(art)
+
+    def _update_heatmap(self, ax, image, x, y) -> bool:
+        """Refill the image's array with the window; True if the row count changed (new y axis)."""
+        rows, cols = y.shape[1], len(x)
+        heat = self._heat[id(image)]
+        resized = heat.rows != rows
+        image.set_data(heat.fill(y))
+        # half a sample either side, so each column is centred on its timestamp
+        half = (x[-1] - x[0]) / max(cols - 1, 1) / 2
+        image.set_extent((x[0] - half, x[-1] + half, -0.5, rows - 0.5))
+        if resized:
+            ax.set_ylim(-0.5, rows - 0.5)
+        return resized
+
+    def update(self, store) -> bool:
+        """Push the newest window of `store` into the artists; True if it was blitted."""
+        rescale = False
+        for ax, panel, arts in zip(self.axes, self.panels, self._artists):
+            top = 0.0
+            for s, art in arts:
+                names = store.column_names(s.column[:-1]) if s.column.endswith("*") else [s.column]
+                if not names:
+                    continue
+                ts, data = store.window(names, self.window_s, max_points=2000)
+                if len(ts) < 2:
+                    continue
+                x = ts - ts[-1]
+                y = data * s.scale if s.scale != 1.0 else data
+                if panel.heatmap:
+                    rescale |= self._update_heatmap(ax, art, x, y)
+                    continue
+                if s.band:
+                    with np.errstate(all="ignore"):
+                        hi = np.nanmax(y, axis=1)
+                        lo = np.nanmin(y, axis=1)
+                    art.set_xy(np.concatenate([np.c_[x, hi], np.c_[x[::-1], lo[::-1]]]))
+                elif isinstance(art, LineCollection):
+                    seg = np.empty((y.shape[1], len(x), 2))
+                    seg[:, :, 0] = x
+                    seg[:, :, 1] = y.T
+                    art.set_segments(seg)
+                else:
+                    art.set_data(x, y[:, 0] if y.ndim == 2 else y)
+                if panel.ylim is None and len(y):
+                    with np.errstate(all="ignore"):
+                        m = np.nanmax(y)
+                    if np.isfinite(m):
+                        top = max(top, float(m))
+            if panel.ylim is None:
+                # new limit only when the data outgrows it or shrinks well below it
+                lo, hi = ax.get_ylim()
+                if top > hi or top < hi / 4 and hi > 1.0:
+                    ax.set_ylim(0, _nice_ceiling(top * 1.1))
+                    rescale = True
+
+        if rescale or self._bg is None:
+            # ticks changed (or first frame / resize): full draw, which re-captures the background
+            self.canvas.draw()
+            return False
+        self.canvas.restore_region(self._bg)
+        self._draw_artists()
+        for ax in self.axes:
+            self.canvas.blit(ax.bbox)
+        return True
+
+
+# --- benchmark -------------------------------------------------------------
+
+def _legacy_frame(fig, axes, canvas, hist):
+    """What ui.py used to do every tick: clear, re-plot, legend, tight_layout, full draw."""
+    x = hist["ts"] - hist["ts"][0]
+    ax1, ax2, ax3 = axes
+    for ax in axes:
+        ax.clear()
+    ax1.plot(x, hist["cpu"])
+    ax1.set_ylabel("CPU %")
+    ax1.set_ylim(0, 100)
+    ax2.plot(x, hist["ram"])
+    ax2.set_ylabel("RAM %")
+    ax2.set_ylim(0, 100)
+    ax3.plot(x, hist["net_up"] / 2 ** 20, label="Up (MB/s)")
+    ax3.plot(x, hist["net_down"] / 2 ** 20, label="Down (MB/s)")
+    ax3.set_ylabel("Net MB/s")
+    ax3.set_xlabel("seconds")
+    ax3.legend(loc="upper right", fontsize=8)
+    fig.tight_layout()
+    canvas.draw()
+
+
+def _bench(cores: int, disks: int, frames: int, points: int):
+    from types import SimpleNamespace as NS
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    from .history import HistoryStore
+
+    rng = np.random.default_rng(0)
+    store = HistoryStore(n_cores=cores, raw_points=max(points, 3600), max_disks=max(disks, 1))
+
+    def push(t):
+        per_core = tuple(float(v) for v in rng.uniform(0, 100, cores))
+        snap = NS(
+            ts=t,
+            cpu=NS(percent=float(np.mean(per_core)), per_core=per_core),
+            ram=NS(percent=40.0 + 10 * math.sin(t / 10)),
+            net=NS(up_bps=float(rng.uniform(0, 3e6)), down_bps=float(rng.uniform(0, 8e6))),
+            disks=tuple(NS(mount=f"/d{i}", percent=50.0 + i) for i in range(disks)),
+        )
+        store.append(snap)
+
+    t = 1_000_000.0
+    for _ in range(points):
+        t += 1.0
+        push(t)
+
+    results = {}
+
+    fig = Figure(figsize=(8, 3.6), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    axes = [fig.add_subplot(311), fig.add_subplot(312), fig.add_subplot(313)]
+    # only rendering is timed, not the synthetic samples
+    spent = 0.0
+    for _ in range(frames):
+        t += 1.0
+        push(t)
+        start = time.perf_counter()
+        ts, data = store.last(["cpu", "ram", "net_up", "net_down"], points)
+        _legacy_frame(fig, axes, canvas, {"ts": ts, "cpu": data[:, 0], "ram": data[:, 1],
+                                          "net_up": data[:, 2], "net_down": data[:, 3]})
+        spent += time.perf_counter() - start
+    results["clear + replot (3 lines)"] = frames / spent
+
+    variants = (
+        ("blit (3 lines)", default_panels(False), 3.6),
+        (f"blit (+{cores}-core band, {disks} disk lines)", default_panels(True, disks > 0), 4.8),
+        (f"blit ({cores}-core heatmap only)", [p for p in default_panels(heatmap=True) if p.heatmap], 2.4),
+        ("blit (all of the above + heatmap)", default_panels(True, disks > 0, heatmap=True), 6.0),
+    )
+    for label, panels, height in variants:
+        fig = Figure(figsize=(8, height), dpi=100)
+        canvas = FigureCanvasAgg(fig)
+        charts = LiveCharts(fig, canvas, panels, window_s=points)
+        charts.update(store)
+        spent = 0.0
+        for _ in range(frames):
+            t += 1.0
+            push(t)
+            start = time.perf_counter()
+            charts.update(store)
+            spent += time.perf_counter() - start
+        results[label] = frames / spent
+        results[label + " full draws"] = charts.full_draws
+
+    for k, v in results.items():
+        print(f"{k:44} {v:8.1f}" + ("" if "full draws" in k else " fps"))
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="live chart renderer")
+    p.add_argument("--bench", action="store_true", help="measure frames per second (Agg, no window)")
+    p.add_argument("--cores", type=int, default=64)
+    p.add_argument("--disks", type=int, default=8)
+    p.add_argument("--frames", type=int, default=200)
+    p.add_argument("--points", type=int, default=60, help="seconds of history on screen")
+    args = p.parse_args(argv)
+    if args.bench:
+        _bench(args.cores, args.disks, args.frames, args.points)
+    else:
+        p.print_help()
+
+
+if __name__ == "__main__":
+    main()
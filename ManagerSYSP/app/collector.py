@@ -0,0 +1,324 @@
+"""
+Collector: receives agent batches (app/agent.py) and keeps per-host history.
+
+One thread serves every agent through a selector (TCP and UDP on the same
+port), so hundreds of hosts at 1 Hz cost a few batches per second to decode.
+
+    python -m app.collector --listen 0.0.0.0:7700            # print a host table every 5s
+    python -m app.collector --listen 127.0.0.1:7700 --udp-only
+"""
+import argparse
+import selectors
+import socket
+import struct
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .config import CONFIG
+from .history import Ring
+from .wire import MAX_FRAME, Batch, Hello, WireError, decode
+
+# charted per host; everything else is kept as "latest value" only
+HOST_COLUMNS = ("cpu", "ram", "net_up", "net_down")
+# schemas kept per host, least recently used dropped first (agents re-send a HELLO after reconnecting)
+MAX_SCHEMAS = 64
+
+_RECV = 64 * 1024
+
+
+class HostState:
+    """History and latest values of one agent."""
+
+    def __init__(self, name: str, points: int):
+        self.name = name
+        self.addr = ""
+        self.transport = ""
+        self.ring = Ring(points, len(HOST_COLUMNS))
+        self.latest: Dict[str, float] = {}
+        # newest sample time, on the agent's clock: shown, never compared with ours
+        self.last_ts = 0.0
+        # when its last batch arrived, on the collector's clock: age and staleness
+        self.last_seen = 0.0
+        self.rows = 0
+        self.batches = 0
+        # schema id -> (columns, scale per column), least recently used first
+        self.schemas: Dict[int, Tuple[Tuple[str, ...], np.ndarray]] = {}
+
+    def add_hello(self, msg: Hello):
+        scale = np.array([10.0 ** -p for p in msg.places], dtype=np.float64)
+        self.schemas.pop(msg.schema, None)
+        self.schemas[msg.schema] = (msg.columns, scale)
+        if len(self.schemas) > MAX_SCHEMAS:
+            del self.schemas[next(iter(self.schemas))]
+
+    def add_batch(self, msg: Batch, now: float):
+        columns, scale = self.schemas[msg.schema] = self.schemas.pop(msg.schema)
+        pick = [columns.index(c) if c in columns else -1 for c in HOST_COLUMNS]
+        row = np.full(len(HOST_COLUMNS), np.nan)
+        for ts, ivalues in msg.rows:
+            # an old batch after a reconnect must not rewind the history
+            if ts <= self.last_ts:
+                continue
+            values = np.asarray(ivalues, dtype=np.float64) * scale
+            for k, i in enumerate(pick):
+                row[k] = values[i] if i >= 0 else np.nan
+            self.ring.append(ts, row)
+            self.last_ts = ts
+            self.rows += 1
+        if msg.rows:
+            self.latest = dict(zip(columns, (np.asarray(msg.rows[-1][1], dtype=np.float64) * scale).tolist()))
+        self.batches += 1
+        self.last_seen = now
+
+
+class _Conn:
+    __slots__ = ("sock", "addr", "buf")
+
+    def __init__(self, sock, addr):
+        self.sock = sock
+        self.addr = addr
+        self.buf = bytearray()
+
+
+class Collector:
+    """
+    Listens for agents and keeps a HostState per host name.
+
+    Backpressure: each ready TCP connection gets one bounded recv() per loop,
+    so a chatty agent cannot starve the others, and data not read yet stays
+    in the kernel, which throttles that agent's sends. Malformed streams are
+    dropped, counted in `errors`.
+    """
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 7700, tcp: bool = True, udp: bool = True,
+                 points: int = 3600, max_hosts: int = 1024):
+        self.host = host
+        self.port = port
+        self.points = points
+        self.max_hosts = max_hosts
+        self.hosts: Dict[str, HostState] = {}
+        self.lock = threading.Lock()
+        self.errors = 0
+        self.bytes_in = 0
+        self.batches = 0
+        self._sel = selectors.DefaultSelector()
+        self._tcp: Optional[socket.socket] = None
+        self._udp: Optional[socket.socket] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        if tcp:
+            self._tcp = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._tcp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self._tcp.bind((host, port))
+            self._tcp.listen(128)
+            self._tcp.setblocking(False)
+            self._sel.register(self._tcp, selectors.EVENT_READ, "accept")
+            # port 0 = pick one (tests); UDP then shares it
+            self.port = self._tcp.getsockname()[1]
+        if udp:
+            self._udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._udp.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+            self._udp.bind((host, self.port))
+            self._udp.setblocking(False)
+            self._sel.register(self._udp, selectors.EVENT_READ, "udp")
+            self.port = self._udp.getsockname()[1]
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="syspulse-collector", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        for key in list(self._sel.get_map().values()):
+            key.fileobj.close()
+        self._sel.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            for key, _ in self._sel.select(timeout=0.5):
+                if key.data == "accept":
+                    self._accept()
+                elif key.data == "udp":
+                    self._read_udp()
+                else:
+                    self._read_tcp(key.data)
+
+    def _accept(self):
+        try:
+            sock, addr = self._tcp.accept()
+        except OSError:
+            return
+        sock.setblocking(False)
+        self._sel.register(sock, selectors.EVENT_READ, _Conn(sock, f"{addr[0]}:{addr[1]}"))
+
+    def _drop(self, conn: _Conn):
+        self._sel.unregister(conn.sock)
+        conn.sock.close()
+
+    def _read_tcp(self, conn: _Conn):
+        try:
+            data = conn.sock.recv(_RECV)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._drop(conn)
+            return
+        self.bytes_in += len(data)
+        buf = conn.buf
+        buf += data
+        i = 0
+        while len(buf) - i >= 4:
+            n = int.from_bytes(buf[i:i + 4], "little")
+            if n > MAX_FRAME:
+                self.errors += 1
+                self._drop(conn)
+                return
+            if len(buf) - i - 4 < n:
+                break
+            if not self._handle(bytes(buf[i + 4:i + 4 + n]), conn.addr, "tcp"):
+                self._drop(conn)
+                return
+            i += 4 + n
+        del buf[:i]
+
+    def _read_udp(self):
+        # drain what is there now, bounded so TCP agents get their turn
+        for _ in range(256):
+            try:
+                data, addr = self._udp.recvfrom(65535)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            self.bytes_in += len(data)
+            self._handle(data, f"{addr[0]}:{addr[1]}", "udp")
+
+    def _handle(self, message, addr: str, transport: str) -> bool:
+        now = time.time()
+        with self.lock:
+            try:
+                msg = decode(message, _SchemaView(self.hosts))
+            except KeyError:
+                # batch before its HELLO (UDP reordering / loss): skip it
+                return True
+            except (WireError, struct.error, IndexError, ValueError):
+                self.errors += 1
+                return False
+            state = self.hosts.get(msg.host)
+            if state is None:
+                if len(self.hosts) >= self.max_hosts:
+                    return False
+                state = self.hosts[msg.host] = HostState(msg.host, self.points)
+            state.addr = addr
+            state.transport = transport
+            if isinstance(msg, Hello):
+                state.add_hello(msg)
+            else:
+                state.add_batch(msg, now)
+                self.batches += 1
+        return True
+
+    def summary(self, window_s: float = 60.0) -> List[dict]:
+        """
+        One dict per host, sorted by name: latest values, window averages and age.
+
+        age_s is the time since the host's last batch arrived, measured on this
+        clock, so an agent whose clock is off is neither stale nor in the future.
+        """
+        now = time.time()
+        out = []
+        with self.lock:
+            for name in sorted(self.hosts):
+                h = self.hosts[name]
+                ts, data = h.ring.last()
+                recent = data[ts >= h.last_ts - window_s] if len(ts) else data
+                with np.errstate(all="ignore"):
+                    avg = np.nanmean(recent, axis=0) if len(recent) else np.full(len(HOST_COLUMNS), np.nan)
+                out.append({
+                    "host": name,
+                    "addr": h.addr,
+                    "transport": h.transport,
+                    "cpu": h.latest.get("cpu"),
+                    "ram": h.latest.get("ram"),
+                    "net_up": h.latest.get("net_up"),
+                    "net_down": h.latest.get("net_down"),
+                    "cpu_avg": float(avg[0]),
+                    "ram_avg": float(avg[1]),
+                    "age_s": now - h.last_seen if h.last_seen else None,
+                    "last_ts": h.last_ts or None,
+                    "rows": h.rows,
+                })
+        return out
+
+    def history(self, host: str, n: Optional[int] = None):
+        """(ts, {column: values}) of one host's newest n rows (copies: safe after the lock)."""
+        with self.lock:
+            h = self.hosts[host]
+            ts, data = h.ring.last(n)
+            return ts.copy(), {c: data[:, i].copy() for i, c in enumerate(HOST_COLUMNS)}
+
+
+def _clock(ts: Optional[float]) -> str:
+    """Agent-side sample time for display (HH:MM:SS), "-" if none yet."""
+    return time.strftime("%H:%M:%S", time.localtime(ts)) if ts else "-"
+
+
+class _SchemaView:
+    """(host, schema) -> column count, looked up in the live HostStates for decode()."""
+
+    __slots__ = ("_hosts",)
+
+    def __init__(self, hosts: Dict[str, HostState]):
+        self._hosts = hosts
+
+    def __getitem__(self, key):
+        host, schema = key
+        return len(self._hosts[host].schemas[schema][0])
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="receive snapshots from SysPulse agents")
+    p.add_argument("--listen", default=f"{CONFIG.collector_host}:{CONFIG.collector_port}", metavar="HOST:PORT")
+    g = p.add_mutually_exclusive_group()
+    g.add_argument("--tcp-only", action="store_true")
+    g.add_argument("--udp-only", action="store_true")
+    p.add_argument("--every", type=float, default=5.0, help="seconds between host tables")
+    args = p.parse_args(argv)
+
+    host, _, port = args.listen.rpartition(":")
+    collector = Collector(host or "0.0.0.0", int(port), tcp=not args.udp_only, udp=not args.tcp_only,
+                          points=CONFIG.collector_history_points, max_hosts=CONFIG.collector_max_hosts)
+    collector.start()
+    print(f"listening on {collector.host}:{collector.port}", file=sys.stderr)
+    cpu0, wall0 = time.process_time(), time.monotonic()
+    try:
+        while True:
+            time.sleep(args.every)
+            rows = collector.summary()
+            stale = sum(1 for r in rows if r["age_s"] is None or r["age_s"] > 3 * CONFIG.agent_batch_s)
+            cpu = 100.0 * (time.process_time() - cpu0) / (time.monotonic() - wall0)
+            print(f"{len(rows)} hosts ({stale} stale)  {collector.batches} batches  "
+                  f"{collector.bytes_in / 1024:.0f} KiB in  {collector.errors} errors  cpu {cpu:.1f}%")
+            for r in rows[:20]:
+                print(f"  {r['host'][:24]:24} cpu {r['cpu'] or 0:5.1f}% (avg {r['cpu_avg']:5.1f})  "
+                      f"ram {r['ram'] or 0:5.1f}%  age {r['age_s'] or 0:5.1f}s  {r['transport']}  "
+                      f"sample {_clock(r['last_ts'])}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        collector.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,46 @@
 from dataclasses import dataclass
+from typing import Tuple
 
 @dataclass(frozen=True)
 class Config:
-    # UI refresh rate (ms)
+    # Sampling rate (ms); collection runs on a background thread
     refresh_ms: int = 1000
 
+    # How often the UI checks for a new sample (ms); cheap when nothing changed
+    ui_poll_ms: int = 100
+    # ... and while the window is minimized (nothing is drawn then)
+    ui_hidden_poll_ms: int = 1000
+
+    # Adaptive refresh (app/scheduler.py). When off, everything is collected every
+    # refresh_ms and the process table every process_refresh_ms.
+    enable_adaptive_refresh: bool = True
+    # Per collector: (base, min, max) seconds
+    schedule_cpu_s: Tuple[float, float, float] = (1.0, 0.25, 5.0)
+    schedule_disks_s: Tuple[float, float, float] = (5.0, 1.0, 60.0)
+    schedule_connections_s: Tuple[float, float, float] = (3.0, 1.0, 30.0)
+    schedule_processes_s: Tuple[float, float, float] = (2.0, 1.0, 20.0)
+    # Slow-down factor while the window is minimized
+    schedule_hidden_backoff: float = 5.0
+    # "Flat": cpu / ram / disk % moved less than this between samples; intervals
+    # then stretch gradually up to schedule_flat_max x
+    schedule_flat_delta: float = 2.0
+    schedule_flat_max: float = 4.0
+    # SysPulse's own CPU use (percent of one core) to stay under; 0 = no budget
+    cpu_budget_percent: float = 5.0
+
     # History length for charts (seconds)
     history_points: int = 60
+    # Min-max band of all cores behind the CPU line (one polygon, any core count)
+    chart_per_core: bool = True
+    # Extra chart panel with one line per tracked disk
+    chart_disks: bool = False
+    # Per-core heatmap panel (cores x time, one image)
+    chart_core_heatmap: bool = True
+
+    # Raw samples kept in memory (older data lives on in 10s/1min/10min rollups)
+    history_raw_points: int = 3600
+    # Mounts tracked in the per-disk history columns
+    history_max_disks: int = 16
 
     # Alerts (percent)
     cpu_warn: float = 85.0
@@ -18,10 +52,65 @@ class Config:
     disk_free_warn_gb: float = 10.0
     disk_free_crit_gb: float = 5.0
 
+    # Rolling-window alert rules (app/alerts.py); when off, the cards use the
+    # instantaneous thresholds above. Rule syntax:
+    #   name: avg|min|max|rate(metric, window) >|< threshold [clear value] [warn|crit]
+    enable_alerts: bool = True
+    alert_rules: Tuple[str, ...] = (
+        "cpu_high: avg(cpu, 60s) > 85 clear 80 warn",
+        "cpu_critical: avg(cpu, 60s) > 95 clear 90 crit",
+        "ram_high: avg(ram, 60s) > 85 clear 80 warn",
+        "ram_critical: avg(ram, 60s) > 95 clear 90 crit",
+        "core_saturated: avg(core*, 30s) > 95 clear 85 warn",
+        "disk_low: max(disk_free:*, 60s) < 10 clear 11 warn",
+        "disk_very_low: max(disk_free:*, 60s) < 5 clear 5.5 crit",
+        "disk_filling: rate(disk_free:*, 1h) < -5 clear -2 warn",
+    )
+    # Fired / resolved transitions, one JSON object per line (relative = project folder)
+    alert_log: str = "reports/alerts.ndjson"
+    # A rule that fires again this soon after resolving stays the same episode
+    alert_cooldown_s: float = 60.0
+
+    # Disk probing: partition list re-read interval (also on mount changes),
+    # per-refresh deadline for disk_usage calls, and probe threads (threads stuck on
+    # a hung mount are replaced, up to disk_probe_max_workers in all)
+    disk_partitions_refresh_s: float = 60.0
+    disk_probe_timeout_s: float = 0.5
+    disk_probe_workers: int = 4
+    disk_probe_max_workers: int = 16
+
+    # On-disk snapshot log (app/recorder.py); relative paths are under the project folder
+    enable_recorder: bool = False
+    record_dir: str = "recordings"
+    record_segment_rows: int = 86400
+    record_retention_days: float = 30.0
+
+    # Per-stage latency histograms + debug panel (near-zero cost when off)
+    enable_instrumentation: bool = False
+
     # Optional (Windows) active app usage tracker
     enable_app_usage_tracker: bool = True
 
-    # Connections table rows
-    max_connections_rows: int = 50
+    # Top processes table (CPU% from deltas between refreshes)
+    enable_process_table: bool = True
+    top_processes_rows: int = 15
+    process_refresh_ms: int = 2000
+
+    # Multi-host: agents (app/agent.py) send to a collector. With enable_collector
+    # the window also listens on collector_port (TCP + UDP) and shows a Hosts grid.
+    enable_collector: bool = False
+    collector_host: str = "0.0.0.0"
+    collector_port: int = 7700
+    collector_history_points: int = 3600
+    collector_max_hosts: int = 1024
+    # Agent: seconds between sends, and rows kept while the collector is unreachable
+    agent_batch_s: float = 5.0
+    agent_queue_rows: int = 600
+
+    # Process metadata cache (names for connections / active window). Entries are
+    # re-checked every proc_cache_revalidate_s, and at once when a pid opens a new
+    # socket, so a reused pid never lends its old name to a new connection
+    proc_cache_size: int = 4096
+    proc_cache_revalidate_s: float = 5.0
 
 CONFIG = Config()
@@ -0,0 +1,210 @@
+"""
+Connections table that draws only the rows on screen.
+
+The rows live in a ConnView (app/conn_tracker.py), patched with the
+tracker's diffs. The widget is one Canvas with a fixed pool of text items,
+one per visible cell. Scrolling, sorting, filtering and new data only
+change the text of those items, so 50 or 50 000 connections cost the
+same to draw. Scroll position and the selected row are kept across updates.
+"""
+import time
+import tkinter as tk
+import tkinter.font as tkfont
+from typing import List, Optional
+
+import customtkinter as ctk
+
+from .conn_tracker import FILTER_FIELDS, ConnChanges, ConnRow, ConnView, SockKey
+
+# (sort column, width in characters, header)
+COLUMNS = (
+    ("process", 18, "PROCESS"),
+    ("pid", 7, "PID"),
+    ("status", 12, "STATUS"),
+    ("local", 22, "LOCAL"),
+    ("remote", 22, "REMOTE"),
+    ("age", 6, "AGE"),
+)
+
+
+def _age(seconds: float) -> str:
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}m"
+    if seconds < 86400:
+        return f"{seconds / 3600:.0f}h"
+    return f"{seconds / 86400:.0f}d"
+
+
+def _cells(r: ConnRow, now: float) -> tuple:
+    return (r.process, str(r.pid or "-"), r.status, r.local, r.remote, _age(now - r.opened))
+
+
+class ConnTable(ctk.CTkFrame):
+    """Filter bar, clickable header (sort) and a virtualized, scrollable body."""
+
+    def __init__(self, master, **kwargs):
+        super().__init__(master, fg_color="transparent", **kwargs)
+        self.view = ConnView()
+        self.top = 0
+        # once scrolled, the row at the top stays there when rows come and go above it
+        self._top_key: Optional[SockKey] = None
+        self.selected: Optional[SockKey] = None
+        # pool: one list of canvas text ids per visible row, plus the text each one shows
+        self._items: List[List[int]] = []
+        self._texts: List[List[str]] = []
+
+        bar = ctk.CTkFrame(self, fg_color="transparent")
+        bar.pack(fill="x", pady=(0, 4))
+        self.filter_entry = ctk.CTkEntry(bar, placeholder_text="filter", height=26)
+        self.filter_entry.pack(side="left", fill="x", expand=True)
+        self.filter_entry.bind("<KeyRelease>", lambda e: self._apply_filter())
+        self.filter_field = ctk.CTkOptionMenu(bar, values=list(FILTER_FIELDS), width=90, height=26,
+                                              command=lambda _: self._apply_filter())
+        self.filter_field.pack(side="left", padx=(6, 0))
+        self.count_lbl = ctk.CTkLabel(bar, text="", font=ctk.CTkFont(size=11))
+        self.count_lbl.pack(side="left", padx=(8, 0))
+
+        body = ctk.CTkFrame(self, fg_color="transparent")
+        body.pack(fill="both", expand=True)
+        self.font = tkfont.Font(family="Courier", size=10)
+        self.char_w = self.font.measure("0")
+        self.row_h = self.font.metrics("linespace") + 3
+        self._x = []
+        x = 4
+        for _, width, _ in COLUMNS:
+            self._x.append(x)
+            x += (width + 1) * self.char_w
+
+        bg = self._apply_appearance_mode(ctk.ThemeManager.theme["CTkTextbox"]["fg_color"])
+        self.fg = self._apply_appearance_mode(ctk.ThemeManager.theme["CTkLabel"]["text_color"])
+        self.select_bg = self._apply_appearance_mode(ctk.ThemeManager.theme["CTkButton"]["fg_color"])
+        self.canvas = tk.Canvas(body, bg=bg, highlightthickness=0, height=240)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ctk.CTkScrollbar(body, command=self._yview)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self._header = [
+            self.canvas.create_text(x, 2, anchor="nw", text=title, font=self.font, fill=self.fg)
+            for x, (_, _, title) in zip(self._x, COLUMNS)
+        ]
+        self.canvas.create_line(0, self.row_h + 1, x, self.row_h + 1, fill="gray")
+        self._select_rect = self.canvas.create_rectangle(0, -100, 0, -100, fill=self.select_bg, width=0)
+
+        self.canvas.bind("<Configure>", lambda e: self._resize(e.height))
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<MouseWheel>", lambda e: self._scroll(-1 if e.delta > 0 else 1))
+        self.canvas.bind("<Button-4>", lambda e: self._scroll(-1))
+        self.canvas.bind("<Button-5>", lambda e: self._scroll(1))
+
+    # --- data ---
+
+    def apply(self, changes: ConnChanges):
+        """Patch the rows with the tracker's diff and redraw the visible part."""
+        if self.view.apply(changes):
+            self._restore_top()
+        self.redraw()
+
+    def _apply_filter(self):
+        self.view.set_filter(self.filter_entry.get(), self.filter_field.get())
+        self.top = 0
+        self.redraw()
+
+    def _restore_top(self):
+        # at the very top, new rows simply show up; scrolled down, the view stays put
+        if self._top_key is not None and self.top > 0:
+            i = self.view.index(self._top_key)
+            if i is not None:
+                self.top = i
+
+    # --- geometry / input ---
+
+    def _visible(self) -> int:
+        return len(self._items)
+
+    def _resize(self, height: int):
+        rows = max(1, (height - self.row_h - 2) // self.row_h)
+        while len(self._items) < rows:
+            y = (len(self._items) + 1) * self.row_h + 3
+            self._items.append([
+                self.canvas.create_text(x, y, anchor="nw", text="", font=self.font, fill=self.fg)
+                for x in self._x
+            ])
+            self._texts.append([""] * len(COLUMNS))
+        while len(self._items) > rows:
+            for item in self._items.pop():
+                self.canvas.delete(item)
+            self._texts.pop()
+        self.redraw()
+
+    def _yview(self, *args):
+        n = len(self.view)
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * n)
+        elif args[0] == "scroll":
+            step = self._visible() if args[2] == "pages" else 1
+            self.top += int(args[1]) * step
+        self.redraw()
+
+    def _scroll(self, units: int):
+        self.top += units * 3
+        self.redraw()
+
+    def _on_click(self, event):
+        if event.y <= self.row_h:
+            # header: sort by the column under the pointer
+            for x, (column, _, _) in zip(reversed(self._x), reversed(COLUMNS)):
+                if event.x >= x:
+                    self.view.set_sort(column)
+                    self.top = 0
+                    break
+        else:
+            i = self.top + (event.y - self.row_h - 3) // self.row_h
+            self.selected = self.view.key(i) if 0 <= i < len(self.view) else None
+        self.redraw()
+
+    # --- drawing ---
+
+    def redraw(self):
+        view = self.view
+        n = len(view)
+        visible = self._visible()
+        self.top = max(0, min(self.top, n - visible))
+        self._top_key = view.key(self.top) if n else None
+        now = time.time()
+        selected_at = None
+        for i in range(visible):
+            idx = self.top + i
+            if idx < n:
+                key = view.key(idx)
+                cells = _cells(view.rows[key], now)
+                if key == self.selected:
+                    selected_at = i
+            else:
+                cells = ("",) * len(COLUMNS)
+            items = self._items[i]
+            texts = self._texts[i]
+            for c, (text, (_, width, _)) in enumerate(zip(cells, COLUMNS)):
+                text = text[:width]
+                # only touch the items whose text changed
+                if texts[c] != text:
+                    texts[c] = text
+                    self.canvas.itemconfigure(items[c], text=text)
+
+        if selected_at is None:
+            self.canvas.coords(self._select_rect, 0, -100, 0, -100)
+        else:
+            y = (selected_at + 1) * self.row_h + 2
+            self.canvas.coords(self._select_rect, 0, y, self.canvas.winfo_width(), y + self.row_h)
+        self.canvas.tag_lower(self._select_rect)
+
+        arrow = " v" if view.descending else " ^"
+        for item, (column, _, title) in zip(self._header, COLUMNS):
+            self.canvas.itemconfigure(item, text=title + (arrow if column == view.sort else ""))
+        if n:
+            self.scrollbar.set(self.top / n, min(1.0, (self.top + visible) / n))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        shown = f"{n}" if n == len(view.rows) else f"{n} of {len(view.rows)}"
+        self.count_lbl.configure(text=f"{shown} rows")
@@ -0,0 +1,336 @@
+import bisect
+import collections
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Counter, Deque, Dict, List, Optional, Tuple
+
+import psutil
+
+from .proc_cache import ProcessCache
+
+# socket identity (fd, type, local, remote, pid): a new status on the same key is a change
+SockKey = Tuple[int, int, tuple, tuple, Optional[int]]
+
+
+@dataclass(frozen=True)
+class ConnRow:
+    local: str
+    remote: str
+    status: str
+    pid: Optional[int]
+    process: str
+    # time.time() when first seen
+    opened: float
+
+
+@dataclass(frozen=True)
+class ConnEvent:
+    kind: str           # "opened" / "closed" / "changed"
+    ts: float
+    row: ConnRow
+    lifetime_s: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class ConnChanges:
+    """What changed since a reader's version. `full` is set when it fell too far behind."""
+    version: int
+    upserts: Dict[SockKey, ConnRow]
+    removed: Tuple[SockKey, ...]
+    full: Optional[Dict[SockKey, ConnRow]] = None
+
+
+def _bump(counter: Counter[str], key: str, n: int):
+    v = counter[key] + n
+    if v > 0:
+        counter[key] = v
+    else:
+        # keep the counters as small as the live set
+        del counter[key]
+
+
+def _addr(a) -> str:
+    return f"{a.ip}:{a.port}" if a else "-"
+
+
+class ConnectionTracker:
+    """
+    Follows psutil.net_connections() between ticks.
+
+    The raw records are diffed as sets of namedtuples (hashing in C), and
+    only the records that differ are turned into ConnRows, events and
+    aggregate updates. A tick with no churn does no per-socket Python work
+    beyond building that set.
+
+    Readers (the UI) call changes_since(version) for the rows that changed,
+    so they never rebuild the full table either.
+    """
+
+    def __init__(self, proc_cache: Optional[ProcessCache] = None, kind: str = "inet",
+                 max_events: int = 1000, max_diffs: int = 64):
+        self.proc_cache = proc_cache or ProcessCache()
+        self.kind = kind
+        self.lock = threading.Lock()
+        self.rows: Dict[SockKey, ConnRow] = {}
+        self.by_process: Counter[str] = collections.Counter()
+        self.by_remote: Counter[str] = collections.Counter()
+        self.by_status: Counter[str] = collections.Counter()
+        self.events: Deque[ConnEvent] = collections.deque(maxlen=max_events)
+        self.version = 0
+        # closed-connection lifetimes
+        self.closed = 0
+        self.lifetime_total_s = 0.0
+        self.lifetime_max_s = 0.0
+        self.last_churn = 0
+        self._raw: frozenset = frozenset()
+        self._diffs: Deque[Tuple[int, Dict[SockKey, ConnRow], Tuple[SockKey, ...]]] = collections.deque(
+            maxlen=max_diffs)
+        self._primed = False
+
+    @staticmethod
+    def _key(c) -> SockKey:
+        return (c.fd, c.type, c.laddr, c.raddr, c.pid)
+
+    def _row(self, c, opened: float, names: Dict[int, str], opening: bool) -> ConnRow:
+        name = "-"
+        if c.pid:
+            name = names.get(c.pid)
+            if name is None:
+                # a pid on a new socket may belong to a new process: check its create time now
+                name = names[c.pid] = self.proc_cache.name(c.pid, revalidate=opening)
+        return ConnRow(
+            local=_addr(c.laddr),
+            remote=_addr(c.raddr),
+            status=c.status,
+            pid=c.pid,
+            process=name,
+            opened=opened,
+        )
+
+    def _count(self, row: ConnRow, n: int):
+        _bump(self.by_process, row.process, n)
+        _bump(self.by_status, row.status, n)
+        if row.remote != "-":
+            _bump(self.by_remote, row.remote.rpartition(":")[0], n)
+
+    def update(self) -> int:
+        """Poll once; returns the number of sockets that opened, closed or changed."""
+        try:
+            raw = frozenset(psutil.net_connections(kind=self.kind))
+        except (psutil.Error, OSError):
+            return 0
+        now = time.time()
+        gone = self._raw - raw
+        new = raw - self._raw
+        self._raw = raw
+        if not gone and not new:
+            self.last_churn = 0
+            return 0
+
+        # a first poll is a baseline, not a burst of "opened" events
+        first = not self._primed
+        self._primed = True
+        # pid -> name for this tick (many sockets share a process)
+        names: Dict[int, str] = {}
+        # only this thread writes self.rows, so reads here need no lock;
+        # rows are built first and the lock is held just to apply them
+        new_keys = {self._key(c): c for c in new}
+        removed: List[SockKey] = [key for key in map(self._key, gone)
+                                  if key in self.rows and key not in new_keys]
+        upserts: Dict[SockKey, ConnRow] = {}
+        for key, c in new_keys.items():
+            old = self.rows.get(key)
+            if old is None:
+                upserts[key] = self._row(c, now, names, True)
+            else:
+                upserts[key] = self._row(c, old.opened, names, False)
+
+        with self.lock:
+            for key in removed:
+                old = self.rows.pop(key)
+                self._count(old, -1)
+                lifetime = now - old.opened
+                self.closed += 1
+                self.lifetime_total_s += lifetime
+                self.lifetime_max_s = max(self.lifetime_max_s, lifetime)
+                self.events.append(ConnEvent("closed", now, old, lifetime))
+            for key, row in upserts.items():
+                old = self.rows.get(key)
+                if old is not None:
+                    self._count(old, -1)
+                    self.events.append(ConnEvent("changed", now, row, now - old.opened))
+                elif not first:
+                    self.events.append(ConnEvent("opened", now, row))
+                self.rows[key] = row
+                self._count(row, 1)
+            self.version += 1
+            self._diffs.append((self.version, upserts, tuple(removed)))
+        self.last_churn = len(new) + len(removed)
+        return self.last_churn
+
+    def changes_since(self, version: int) -> ConnChanges:
+        with self.lock:
+            if version == self.version:
+                return ConnChanges(self.version, {}, ())
+            if not self._diffs or self._diffs[0][0] > version + 1:
+                # too far behind (or first call): start over from a full copy
+                return ConnChanges(self.version, {}, (), full=dict(self.rows))
+            upserts: Dict[SockKey, ConnRow] = {}
+            removed = set()
+            for v, up, rm in self._diffs:
+                if v <= version:
+                    continue
+                for key in rm:
+                    upserts.pop(key, None)
+                    removed.add(key)
+                for key, row in up.items():
+                    upserts[key] = row
+                    removed.discard(key)
+            return ConnChanges(self.version, upserts, tuple(removed))
+
+    def aggregates(self, top: int = 5) -> Dict[str, List[Tuple[str, int]]]:
+        with self.lock:
+            return {
+                "process": self.by_process.most_common(top),
+                "remote": self.by_remote.most_common(top),
+                "status": self.by_status.most_common(top),
+            }
+
+    def stats(self) -> Dict[str, float]:
+        with self.lock:
+            return {
+                "open": len(self.rows),
+                "closed": self.closed,
+                "lifetime_avg_s": self.lifetime_total_s / self.closed if self.closed else 0.0,
+                "lifetime_max_s": self.lifetime_max_s,
+                "churn": self.last_churn,
+            }
+
+
+# sort columns of ConnView; every key ends in a per-row sequence number, so keys never tie
+SORT_KEYS: Dict[str, Callable[[ConnRow], tuple]] = {
+    "process": lambda r: (r.process.lower(), r.pid or 0),
+    "pid": lambda r: (r.pid or 0,),
+    # established first, as the old text table did
+    "status": lambda r: (r.status != "ESTABLISHED", r.status, r.process.lower()),
+    "local": lambda r: (r.local,),
+    "remote": lambda r: (r.remote,),
+    "age": lambda r: (-r.opened,),
+}
+FILTER_FIELDS = ("any", "process", "status", "remote")
+
+
+class ConnView:
+    """
+    A reader's sorted, filtered copy of the tracker's rows.
+
+    apply() patches it with a ConnChanges: each upsert or removal is one
+    bisect into the sorted list, so a tick costs O(churn log n), not a
+    re-sort of every row. Sorting or filtering differently rebuilds the list
+    once, from the local copy (no new psutil call). Rows are read by position
+    (row(i)), so a table only formats the rows it shows.
+    """
+
+    # a diff larger than this share of the rows is cheaper as one re-sort
+    REBUILD_SHARE = 0.25
+
+    def __init__(self, sort: str = "status", descending: bool = False):
+        self.rows: Dict[SockKey, ConnRow] = {}
+        self.version = 0
+        self.sort = sort
+        self.descending = descending
+        self.filter_text = ""
+        self.filter_field = "any"
+        # (sort key, seq, key), ascending; only rows that pass the filter
+        self._order: List[tuple] = []
+        self._entries: Dict[SockKey, tuple] = {}
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def _match(self, r: ConnRow) -> bool:
+        needle = self.filter_text
+        if not needle:
+            return True
+        field = self.filter_field
+        if field == "any":
+            return any(needle in v.lower() for v in (r.process, r.status, r.remote, r.local, str(r.pid or "")))
+        return needle in getattr(r, field).lower()
+
+    def _entry(self, key: SockKey, row: ConnRow) -> tuple:
+        entry = (SORT_KEYS[self.sort](row), next(self._seq), key)
+        self._entries[key] = entry
+        return entry
+
+    def _rebuild(self):
+        self._entries = {}
+        self._order = sorted(self._entry(key, row) for key, row in self.rows.items() if self._match(row))
+
+    def _drop(self, key: SockKey):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            del self._order[bisect.bisect_left(self._order, entry)]
+
+    def apply(self, changes: ConnChanges) -> bool:
+        """Patch with changes_since() output; False if there was nothing to do."""
+        if changes.version == self.version and changes.full is None:
+            return False
+        self.version = changes.version
+        if changes.full is not None:
+            self.rows = dict(changes.full)
+            self._rebuild()
+            return True
+        rows = self.rows
+        for key in changes.removed:
+            rows.pop(key, None)
+        rows.update(changes.upserts)
+        if len(changes.removed) + len(changes.upserts) > self.REBUILD_SHARE * max(len(self._order), 1):
+            self._rebuild()
+            return True
+
+        sort_key = SORT_KEYS[self.sort]
+        for key in changes.removed:
+            self._drop(key)
+        for key, row in changes.upserts.items():
+            old = self._entries.get(key)
+            if old is not None and old[0] == sort_key(row) and self._match(row):
+                # same place in the list; the row itself is read from self.rows
+                continue
+            self._drop(key)
+            if self._match(row):
+                bisect.insort(self._order, self._entry(key, row))
+        return True
+
+    def set_sort(self, column: str):
+        """Sort by `column`; the current column again flips the direction."""
+        if column == self.sort:
+            self.descending = not self.descending
+            return
+        self.sort = column
+        self.descending = False
+        self._rebuild()
+
+    def set_filter(self, text: str, field: str = "any"):
+        text = text.strip().lower()
+        if (text, field) == (self.filter_text, self.filter_field):
+            return
+        self.filter_text = text
+        self.filter_field = field
+        self._rebuild()
+
+    def key(self, i: int) -> SockKey:
+        return self._order[len(self._order) - 1 - i if self.descending else i][2]
+
+    def row(self, i: int) -> ConnRow:
+        return self.rows[self.key(i)]
+
+    def index(self, key: SockKey) -> Optional[int]:
+        """Position of a row in the current order (None if gone or filtered out)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        i = bisect.bisect_left(self._order, entry)
+        return len(self._order) - 1 - i if self.descending else i
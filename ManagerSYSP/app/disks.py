@@ -0,0 +1,169 @@
+import os
+import queue
+import select
+import threading
+import time
+from concurrent.futures import Future, wait
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+
+# (device-or-mountpoint shown in the UI, mountpoint to probe)
+Mount = Tuple[str, str]
+
+
+class DiskProber:
+    """
+    Disk usage without letting one slow mount stall the snapshot.
+
+    The partition list is cached and re-read every `refresh_s` seconds, or as
+    soon as the mount table changes (Linux). disk_usage calls run on a few
+    daemon threads with a shared `timeout_s` deadline; a mount that misses it
+    is reported with its last known value and marked stale, and is not probed
+    again until the hung call returns.
+
+    A thread stuck in a hung call is replaced, so `workers` threads stay free
+    for the healthy mounts, up to `max_workers` threads in all; threads left
+    over once a hung call returns exit.
+    """
+
+    def __init__(self, refresh_s: float = 60.0, timeout_s: float = 0.5, workers: int = 4,
+                 max_workers: int = 16):
+        self.refresh_s = refresh_s
+        self.timeout_s = timeout_s
+        self.workers = max(1, workers)
+        self.max_workers = max(self.workers, max_workers)
+        self._mounts: List[Mount] = []
+        self._listed_at: Optional[float] = None
+        self._last: Dict[str, object] = {}       # mountpoint -> last disk_usage result
+        self._pending: Dict[str, Future] = {}    # mountpoint -> probe queued or running
+        self._jobs: "queue.Queue[Tuple[Future, str]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads = 0
+        self._spawned = 0
+        self._running: Dict[str, float] = {}     # mountpoint -> when its disk_usage call started
+        self._grow()
+        self._mtab = self._open_mount_table()
+
+    @staticmethod
+    def _open_mount_table():
+        # /proc/self/mounts reports POLLPRI when something is (un)mounted
+        if not hasattr(select, "poll") or not os.path.exists("/proc/self/mounts"):
+            return None
+        try:
+            f = open("/proc/self/mounts", "rb")
+            f.read()
+            p = select.poll()
+            p.register(f, select.POLLPRI | select.POLLERR)
+            return f, p
+        except OSError:
+            return None
+
+    def _mount_table_changed(self) -> bool:
+        if self._mtab is None:
+            return False
+        f, p = self._mtab
+        if not p.poll(0):
+            return False
+        f.seek(0)
+        f.read()  # re-arm the notification
+        return True
+
+    def mounts(self) -> List[Mount]:
+        now = time.monotonic()
+        if self._listed_at is None or now - self._listed_at >= self.refresh_s or self._mount_table_changed():
+            self._mounts = self._list_mounts()
+            self._listed_at = now
+        return self._mounts
+
+    @staticmethod
+    def _list_mounts() -> List[Mount]:
+        mounts = []
+        seen = set()
+        for part in psutil.disk_partitions(all=False):
+            # skip cd-roms / weird
+            if "cdrom" in part.opts.lower():
+                continue
+            key = part.device or part.mountpoint
+            # de-dup mounts
+            if key in seen:
+                continue
+            seen.add(key)
+            mounts.append((key, part.mountpoint))
+        return sorted(mounts, key=lambda m: m[0].lower())
+
+    def _hung_count(self) -> int:
+        # caller holds self._lock
+        cutoff = time.monotonic() - self.timeout_s
+        return sum(1 for started in self._running.values() if started < cutoff)
+
+    def hung(self) -> List[str]:
+        """Mountpoints whose disk_usage call has been running past the deadline."""
+        cutoff = time.monotonic() - self.timeout_s
+        with self._lock:
+            return [m for m, started in self._running.items() if started < cutoff]
+
+    def _grow(self):
+        """Start threads until `workers` of them are not stuck (at most `max_workers` in all)."""
+        with self._lock:
+            missing = self.workers - (self._threads - self._hung_count())
+            missing = min(missing, self.max_workers - self._threads)
+            for _ in range(max(0, missing)):
+                self._threads += 1
+                self._spawned += 1
+                threading.Thread(target=self._worker, name=f"syspulse-disk-{self._spawned}", daemon=True).start()
+
+    def _worker(self):
+        while True:
+            fut, mountpoint = self._jobs.get()
+            if not fut.set_running_or_notify_cancel():
+                continue
+            with self._lock:
+                self._running[mountpoint] = time.monotonic()
+            try:
+                fut.set_result(psutil.disk_usage(mountpoint))
+            except BaseException as e:
+                fut.set_exception(e)
+            with self._lock:
+                del self._running[mountpoint]
+                # a replacement took over while this call hung: retire the extra thread
+                if self._threads - self._hung_count() > self.workers:
+                    self._threads -= 1
+                    return
+
+    def probe(self) -> List[Tuple[str, object, bool]]:
+        """(label, disk_usage result, stale) per mount; mounts with no value yet are left out."""
+        mounts = self.mounts()
+        # replace threads stuck since the last round before queueing this one
+        self._grow()
+        started = {}
+        for _, mountpoint in mounts:
+            if mountpoint in self._pending or mountpoint in started:
+                continue
+            fut: Future = Future()
+            self._jobs.put((fut, mountpoint))
+            started[mountpoint] = fut
+        self._pending.update(started)
+
+        # only wait for this round; mounts still hung from earlier rounds stay stale
+        wait(list(started.values()), timeout=self.timeout_s)
+
+        for mountpoint, fut in list(self._pending.items()):
+            if not fut.done():
+                continue
+            del self._pending[mountpoint]
+            if fut.exception() is None:
+                self._last[mountpoint] = fut.result()
+            else:
+                self._last.pop(mountpoint, None)
+
+        current = {m for _, m in mounts}
+        for mountpoint in [m for m in self._last if m not in current]:
+            del self._last[mountpoint]
+
+        out = []
+        for label, mountpoint in mounts:
+            du = self._last.get(mountpoint)
+            if du is not None:
+                out.append((label, du, mountpoint in self._pending))
+        return out
@@ -1,7 +1,7 @@
 import csv
 import os
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 from .monitor import Snapshot
 
@@ -12,7 +12,8 @@ def ensure_reports_dir() -> str:
     return out
 
 
-def export_snapshot_csv(snap: Snapshot, path: Optional[str] = None) -> str:
+def export_snapshot_csv(snap: Snapshot, path: Optional[str] = None,
+                        timings: Optional[Dict[str, Dict[str, float]]] = None) -> str:
     reports = ensure_reports_dir()
     if path is None:
         name = datetime.now().strftime("snapshot_%Y-%m-%d_%H-%M-%S.csv")
@@ -33,18 +34,42 @@ def export_snapshot_csv(snap: Snapshot, path: Optional[str] = None) -> str:
         w.writerow(["Total recv GB", snap.net.total_recv_gb])
         w.writerow([])
         w.writerow(["Disks"])
-        w.writerow(["mount", "used_gb", "total_gb", "free_gb", "percent"])
+        w.writerow(["mount", "used_gb", "total_gb", "free_gb", "percent", "stale"])
         for d in snap.disks:
-            w.writerow([d.mount, d.used_gb, d.total_gb, d.free_gb, f"{d.percent:.2f}"])
+            w.writerow([d.mount, d.used_gb, d.total_gb, d.free_gb, f"{d.percent:.2f}", d.stale])
         w.writerow([])
         w.writerow(["Battery present", snap.battery.present])
         w.writerow(["Battery %", snap.battery.percent if snap.battery.percent is not None else "N/A"])
         w.writerow(["Charging", snap.battery.plugged if snap.battery.plugged is not None else "N/A"])
         w.writerow(["Seconds left", snap.battery.secs_left if snap.battery.secs_left is not None else "N/A"])
+        if timings:
+            w.writerow([])
+            w.writerow(["Stage timings (ms, rolling)"])
+            w.writerow(["stage", "count", "p50", "p95", "max"])
+            for name, st in timings.items():
+                w.writerow([name, st["count"], f"{st['p50']:.3f}", f"{st['p95']:.3f}", f"{st['max']:.3f}"])
 
     return path
 
 
+def export_history_csv(log, t0: float, t1: float, metrics: Optional[Iterable[str]] = None,
+                       step: Optional[float] = None, path: Optional[str] = None) -> str:
+    """Dump a time range of a recorder.RecordLog to CSV."""
+    reports = ensure_reports_dir()
+    if path is None:
+        name = datetime.now().strftime("history_%Y-%m-%d_%H-%M-%S.csv")
+        path = os.path.join(reports, name)
+
+    ts, values = log.range(t0, t1, metrics, step)
+    names = list(values)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["timestamp"] + names)
+        for k in range(len(ts)):
+            w.writerow([datetime.fromtimestamp(ts[k]).isoformat()] + [f"{values[m][k]:.2f}" for m in names])
+    return path
+
+
 def export_app_usage_csv(usage_seconds: Dict[str, int], path: Optional[str] = None) -> str:
     reports = ensure_reports_dir()
     if path is None:
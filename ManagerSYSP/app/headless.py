@@ -0,0 +1,164 @@
+"""
+Headless collector: SystemMonitor without the GUI.
+
+Only psutil / numpy are imported (no customtkinter, no matplotlib), so it
+starts fast and runs on servers without a display.
+
+    python -m app.headless --interval 0.5 --ndjson -                 # stream to stdout
+    python -m app.headless --record recordings --ndjson samples.ndjson
+    python -m app.headless --interval 0.1 --count 600 --overhead     # measure its own cost
+    python -m app.headless --adaptive --record recordings            # cadence follows the load
+    python -m app.headless --alerts reports/alerts.ndjson            # evaluate alert_rules
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict
+
+import psutil
+
+from .alerts import AlertEngine, parse_rule
+from .config import CONFIG
+from .disks import DiskProber
+from .instrument import STAGES
+from .monitor import SystemMonitor
+from .recorder import Recorder
+from .sampler import Sampler
+from .scheduler import Scheduler
+
+GUI_MODULES = ("customtkinter", "tkinter", "matplotlib")
+
+
+class NdjsonWriter:
+    """Writes one JSON object per snapshot, one per line."""
+
+    def __init__(self, path: str):
+        self._f = sys.stdout if path == "-" else open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        # the reader went away (e.g. `| head`)
+        self.broken = False
+
+    def append(self, snap) -> None:
+        if self.broken:
+            return
+        record = asdict(snap)
+        if STAGES.enabled:
+            record["stages"] = STAGES.summary()
+        line = json.dumps(record, separators=(",", ":"))
+        with self._lock:
+            try:
+                self._f.write(line + "\n")
+                self._f.flush()
+            except BrokenPipeError:
+                self.broken = True
+
+    def close(self) -> None:
+        if self._f is not sys.stdout:
+            self._f.close()
+
+
+class Overhead:
+    """Process CPU time spent per sample, measured around the whole run."""
+
+    def __init__(self):
+        self.samples = 0
+        self.collect_ms = 0.0
+        self._cpu0 = time.process_time()
+        self._wall0 = time.perf_counter()
+
+    def report(self) -> dict:
+        cpu_s = time.process_time() - self._cpu0
+        wall_s = max(time.perf_counter() - self._wall0, 1e-9)
+        n = max(self.samples, 1)
+        return {
+            "samples": self.samples,
+            "cpu_ms_per_sample": round(cpu_s * 1000 / n, 3),
+            "collect_ms_avg": round(self.collect_ms / n, 3),
+            "cpu_percent_of_one_core": round(100.0 * cpu_s / wall_s, 2),
+            "wall_s": round(wall_s, 2),
+        }
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="run the SysPulse collector without the GUI")
+    p.add_argument("--interval", type=float, default=CONFIG.refresh_ms / 1000.0,
+                   help="seconds between samples, sub-second is fine (default: refresh_ms)")
+    p.add_argument("--ndjson", default=None, metavar="PATH", help="append snapshots as NDJSON ('-' = stdout)")
+    p.add_argument("--record", default=None, metavar="DIR", help="append snapshots to an on-disk log")
+    p.add_argument("--count", type=int, default=0, help="stop after N samples (0 = run until Ctrl+C)")
+    p.add_argument("--overhead", action="store_true", help="print CPU cost per sample on exit (stderr)")
+    p.add_argument("--alerts", default=None, metavar="PATH",
+                   help="evaluate alert_rules from config.py and append fired/resolved events as NDJSON")
+    p.add_argument("--adaptive", action="store_true",
+                   help="use the adaptive scheduler (schedule_* in config.py) instead of a fixed --interval")
+    p.add_argument("--stages", action="store_true",
+                   help="time each collector stage; adds rolling p50/p95/max to every NDJSON line "
+                        "and to the --overhead report")
+    args = p.parse_args(argv)
+    STAGES.enabled = args.stages or CONFIG.enable_instrumentation
+
+    monitor = SystemMonitor(
+        history_points=CONFIG.history_points,
+        disk_prober=DiskProber(
+            CONFIG.disk_partitions_refresh_s,
+            CONFIG.disk_probe_timeout_s,
+            CONFIG.disk_probe_workers,
+            CONFIG.disk_probe_max_workers,
+        ),
+    )
+    sinks = []
+    writer = NdjsonWriter(args.ndjson) if args.ndjson else None
+    recorder = Recorder(args.record, CONFIG.record_segment_rows, CONFIG.record_retention_days) if args.record else None
+    if writer:
+        sinks.append(writer.append)
+    if recorder:
+        sinks.append(recorder.append)
+    alerts = None
+    if args.alerts:
+        alerts = AlertEngine([parse_rule(r) for r in CONFIG.alert_rules], args.alerts, CONFIG.alert_cooldown_s)
+        sinks.append(alerts.observe)
+
+    overhead = Overhead()
+    done = threading.Event()
+    scheduler = Scheduler.from_config(CONFIG, ("cpu", "disks")) if args.adaptive else None
+    sampler = Sampler(monitor, interval_ms=int(args.interval * 1000), with_connections=False, scheduler=scheduler)
+
+    def count(snap):
+        overhead.samples += 1
+        overhead.collect_ms += sampler.latest().collect_ms
+        if args.count and overhead.samples >= args.count:
+            done.set()
+
+    sampler.sinks = [count] + sinks
+    sampler.start()
+    try:
+        while not done.wait(0.5):
+            if writer and writer.broken:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sampler.stop()
+        if writer and not writer.broken:
+            writer.close()
+        if recorder:
+            recorder.close()
+
+    if args.overhead:
+        report = overhead.report()
+        if scheduler is not None:
+            report["schedule"] = scheduler.describe()
+        if alerts is not None:
+            report["alerts_active"] = sorted(f"{rule}[{column}]" for rule, column in alerts.active)
+        report["gui_modules_loaded"] = [m for m in GUI_MODULES if m in sys.modules]
+        report["rss_mb"] = round(psutil.Process(os.getpid()).memory_info().rss / 2**20, 1)
+        if STAGES.enabled:
+            report["stages"] = STAGES.summary()
+        print(json.dumps(report), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
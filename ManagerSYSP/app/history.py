@@ -0,0 +1,186 @@
+import math
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# (bucket seconds, buckets kept): 10s for 6h, 1min for 24h, 10min for 7 days
+DEFAULT_LEVELS = ((10, 2160), (60, 1440), (600, 1008))
+
+BASE_COLUMNS = ("cpu", "ram", "net_up", "net_down")
+STATS = ("min", "avg", "max")
+
+
+class Ring:
+    """
+    Preallocated ring of rows (one column per metric) plus timestamps.
+
+    Every row is written twice, at i and i + capacity, so the newest n rows
+    are always one contiguous slice: reads are numpy views, never copies.
+    A view stays valid until the next append (only its oldest row can change
+    then, and only if it spans the whole capacity).
+    """
+
+    def __init__(self, capacity: int, ncols: int, dtype=np.float32):
+        self.capacity = max(2, capacity)
+        self.ts = np.full(2 * self.capacity, np.nan, dtype=np.float64)
+        self.data = np.full((2 * self.capacity, ncols), np.nan, dtype=dtype)
+        self.count = 0
+        self._i = -1
+
+    def append(self, ts: float, row: np.ndarray):
+        i = (self._i + 1) % self.capacity
+        self.ts[i] = self.ts[i + self.capacity] = ts
+        self.data[i] = row
+        self.data[i + self.capacity] = row
+        self._i = i
+        self.count = min(self.count + 1, self.capacity)
+
+    def last(self, n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(ts, data) views of the newest n rows, oldest first."""
+        n = self.count if n is None else max(0, min(n, self.count))
+        end = self._i + self.capacity + 1
+        return self.ts[end - n:end], self.data[end - n:end]
+
+    def nbytes(self) -> int:
+        return self.ts.nbytes + self.data.nbytes
+
+
+class _Rollup:
+    """min/avg/max of fixed time buckets, written to three rings when a bucket closes."""
+
+    def __init__(self, step: int, capacity: int, ncols: int):
+        self.step = step
+        self.rings = {stat: Ring(capacity, ncols) for stat in STATS}
+        self._bucket: Optional[int] = None
+        self._sum = np.zeros(ncols, dtype=np.float64)
+        self._n = np.zeros(ncols, dtype=np.int64)
+        self._min = np.full(ncols, np.nan, dtype=np.float64)
+        self._max = np.full(ncols, np.nan, dtype=np.float64)
+
+    def add(self, ts: float, row: np.ndarray):
+        bucket = int(ts // self.step)
+        if self._bucket is not None and bucket != self._bucket:
+            self._flush()
+        self._bucket = bucket
+        ok = ~np.isnan(row)
+        self._sum += np.where(ok, row, 0.0)
+        self._n += ok
+        self._min = np.fmin(self._min, row)
+        self._max = np.fmax(self._max, row)
+
+    def _flush(self):
+        ts = float(self._bucket * self.step)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avg = np.where(self._n > 0, self._sum / np.maximum(self._n, 1), np.nan)
+        self.rings["min"].append(ts, self._min)
+        self.rings["avg"].append(ts, avg)
+        self.rings["max"].append(ts, self._max)
+        self._sum[:] = 0.0
+        self._n[:] = 0
+        self._min[:] = np.nan
+        self._max[:] = np.nan
+
+    def nbytes(self) -> int:
+        return sum(r.nbytes() for r in self.rings.values())
+
+
+class HistoryStore:
+    """
+    Metric history for the charts: raw samples plus 10s / 1min / 10min rollups.
+
+    Columns: cpu, ram, net_up, net_down, core<N> per logical CPU and
+    disk:<mount> (percent used) for up to `max_disks` mounts, assigned as they
+    appear. Memory is fixed at construction.
+    """
+
+    def __init__(self, n_cores: int, raw_points: int = 3600, max_disks: int = 16,
+                 levels: Sequence[Tuple[int, int]] = DEFAULT_LEVELS):
+        self.n_cores = n_cores
+        self.max_disks = max_disks
+        names = list(BASE_COLUMNS) + [f"core{i}" for i in range(n_cores)]
+        self.columns: Dict[str, int] = {name: i for i, name in enumerate(names)}
+        self._disk_base = len(names)
+        self.ncols = self._disk_base + max_disks
+        self.raw = Ring(raw_points, self.ncols)
+        self.levels = {step: _Rollup(step, cap, self.ncols) for step, cap in levels}
+        self.lock = threading.Lock()
+        self._row = np.full(self.ncols, np.nan, dtype=np.float64)
+
+    def _disk_column(self, mount: str) -> Optional[int]:
+        key = f"disk:{mount}"
+        i = self.columns.get(key)
+        if i is None:
+            used = len(self.columns) - self._disk_base
+            if used >= self.max_disks:
+                return None
+            i = self.columns[key] = self._disk_base + used
+        return i
+
+    def append(self, snap):
+        row = self._row
+        row[:] = np.nan
+        row[0] = snap.cpu.percent
+        row[1] = snap.ram.percent
+        row[2] = snap.net.up_bps
+        row[3] = snap.net.down_bps
+        cores = snap.cpu.per_core[:self.n_cores]
+        row[4:4 + len(cores)] = cores
+        with self.lock:
+            for d in snap.disks:
+                i = self._disk_column(d.mount)
+                if i is not None:
+                    row[i] = d.percent
+            self.raw.append(snap.ts, row)
+            for level in self.levels.values():
+                level.add(snap.ts, row)
+
+    def column_names(self, prefix: str = "") -> List[str]:
+        return [name for name in self.columns if name.startswith(prefix)]
+
+    def _cols(self, names):
+        if isinstance(names, str):
+            return self.columns[names]
+        idx = [self.columns[n] for n in names]
+        # a run of adjacent columns (e.g. all cores) is still a view
+        if idx and idx == list(range(idx[0], idx[0] + len(idx))):
+            return slice(idx[0], idx[0] + len(idx))
+        return idx
+
+    def last(self, names, n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(ts, values) of the newest n raw samples for one column name or a list of names."""
+        with self.lock:
+            ts, data = self.raw.last(n)
+            return ts, data[:, self._cols(names)]
+
+    def rollup(self, step: int, names, stat: str = "avg", n: Optional[int] = None):
+        """(ts, values) of the newest n closed buckets of the `step`-second rollup."""
+        with self.lock:
+            ts, data = self.levels[step].rings[stat].last(n)
+            return ts, data[:, self._cols(names)]
+
+    def window(self, names, seconds: float, stat: str = "avg", max_points: int = 1000):
+        """
+        (ts, values) covering the newest `seconds`, at the finest resolution
+        that holds that much history in at most `max_points` points.
+        """
+        with self.lock:
+            cols = self._cols(names)
+            ts, data = self.raw.last()
+            if len(ts) > 1:
+                start = int(np.searchsorted(ts, ts[-1] - seconds, side="left"))
+                # n samples span n - 1 intervals
+                step = (ts[-1] - ts[0]) / (len(ts) - 1)
+                covered = self.raw.count < self.raw.capacity or ts[0] <= ts[-1] - seconds + step
+                if covered and len(ts) - start <= max_points:
+                    return ts[start:], data[start:, cols]
+            steps = sorted(self.levels)
+            for step in steps:
+                n = math.ceil(seconds / step)
+                if n <= self.levels[step].rings[stat].capacity and n <= max_points:
+                    break
+            ts, data = self.levels[step].rings[stat].last(min(max_points, math.ceil(seconds / step)))
+            return ts, data[:, cols]
+
+    def nbytes(self) -> int:
+        return self.raw.nbytes() + sum(level.nbytes() for level in self.levels.values())
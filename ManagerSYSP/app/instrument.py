@@ -0,0 +1,163 @@
+import math
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Log-spaced latency buckets: 1 µs .. ~10 s, each 25% wider than the last
+MIN_MS = 0.001
+GROWTH = 1.25
+N_BUCKETS = 73
+
+# Rolling window = SLICES x SLICE_S seconds
+SLICES = 6
+SLICE_S = 10.0
+
+
+class LatencyHistogram:
+    """
+    Rolling latency stats in fixed memory.
+
+    Samples land in log-spaced buckets; the window is a ring of time slices,
+    and the oldest slice is dropped as time moves on. Percentiles are accurate
+    to a bucket (~12%) and clamped to the window's min / max, so
+    p50 <= p95 <= max always holds.
+    """
+
+    def __init__(self, slices: int = SLICES, slice_s: float = SLICE_S):
+        self.slice_s = slice_s
+        self._counts: List[List[int]] = [[0] * N_BUCKETS for _ in range(slices)]
+        self._min: List[float] = [math.inf] * slices
+        self._max: List[float] = [0.0] * slices
+        self._slice = int(time.monotonic() // slice_s)
+        self._lock = threading.Lock()
+        self.last_ms = 0.0
+        self.total = 0
+
+    def _advance(self, now_slice: int):
+        n = len(self._counts)
+        steps = min(now_slice - self._slice, n)
+        for k in range(1, steps + 1):
+            i = (self._slice + k) % n
+            self._counts[i] = [0] * N_BUCKETS
+            self._min[i] = math.inf
+            self._max[i] = 0.0
+        self._slice = now_slice
+
+    def add(self, ms: float):
+        b = 0 if ms <= MIN_MS else min(N_BUCKETS - 1, int(math.log(ms / MIN_MS, GROWTH)) + 1)
+        now_slice = int(time.monotonic() // self.slice_s)
+        with self._lock:
+            if now_slice != self._slice:
+                self._advance(now_slice)
+            i = now_slice % len(self._counts)
+            self._counts[i][b] += 1
+            if ms < self._min[i]:
+                self._min[i] = ms
+            if ms > self._max[i]:
+                self._max[i] = ms
+            self.last_ms = ms
+            self.total += 1
+
+    def stats(self) -> Dict[str, float]:
+        """{"count", "p50", "p95", "max", "last"} over the rolling window (ms)."""
+        now_slice = int(time.monotonic() // self.slice_s)
+        with self._lock:
+            if now_slice != self._slice:
+                self._advance(now_slice)
+            merged = [sum(col) for col in zip(*self._counts)]
+            mn = min(self._min)
+            mx = max(self._max)
+            last = self.last_ms
+        n = sum(merged)
+        return {
+            "count": n,
+            "p50": round(_percentile(merged, n, 0.50, mn, mx), 3),
+            "p95": round(_percentile(merged, n, 0.95, mn, mx), 3),
+            "max": round(mx, 3),
+            "last": round(last, 3),
+        }
+
+
+def _percentile(counts: List[int], n: int, q: float, lo: float, hi: float) -> float:
+    """q-quantile of the bucket counts, kept within the observed [lo, hi]."""
+    if n == 0:
+        return 0.0
+    rank = q * n
+    seen = 0
+    v = MIN_MS * GROWTH ** (N_BUCKETS - 1)
+    for b, c in enumerate(counts):
+        seen += c
+        if seen >= rank:
+            # geometric middle of the bucket
+            v = MIN_MS if b == 0 else MIN_MS * GROWTH ** (b - 0.5)
+            break
+    # the middle of the top (or bottom) bucket may lie past the largest (smallest) sample
+    return max(lo, min(v, hi))
+
+
+class _Timer:
+    __slots__ = ("_hist", "_t0")
+
+    def __init__(self, hist: LatencyHistogram):
+        self._hist = hist
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._hist.add((time.perf_counter() - self._t0) * 1000.0)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullTimer()
+
+
+class Stages:
+    """
+    Named pipeline stages, each with a LatencyHistogram.
+
+        with STAGES.time("snapshot.disks"):
+            ...
+
+    While disabled, time() returns one shared no-op context manager, so the
+    probes left in hot paths cost about a method call.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._hists: Dict[str, LatencyHistogram] = {}
+
+    def time(self, name: str):
+        if not self.enabled:
+            return _NULL
+        hist = self._hists.get(name)
+        if hist is None:
+            hist = self._hists.setdefault(name, LatencyHistogram())
+        return _Timer(hist)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {name: self._hists[name].stats() for name in sorted(self._hists)}
+
+    def format(self, names: Optional[List[str]] = None) -> str:
+        """One line per stage: name  p50 / p95 / max ms."""
+        lines = []
+        for name, st in self.summary().items():
+            if names is not None and name not in names:
+                continue
+            lines.append(f"{name:22} p50 {st['p50']:7.2f}  p95 {st['p95']:7.2f}  max {st['max']:7.2f} ms")
+        return "\n".join(lines)
+
+
+# Shared by the monitor, sampler and UI; enabled from CONFIG.enable_instrumentation
+STAGES = Stages()
@@ -1,6 +1,14 @@
-from .ui import App
+import sys
+
 
 def main():
+    # `--headless` runs the collector only; the GUI modules are never imported
+    if "--headless" in sys.argv[1:]:
+        from .headless import main as headless_main
+        headless_main([a for a in sys.argv[1:] if a != "--headless"])
+        return
+
+    from .ui import App
     app = App()
     app.mainloop()
 
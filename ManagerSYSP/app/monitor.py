@@ -1,34 +1,40 @@
 import time
 import psutil
-from collections import deque
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Optional, Tuple
 
+from .disks import DiskProber
+from .history import HistoryStore
+from .instrument import STAGES
+from .proc_cache import ProcessCache
 
-@dataclass
+
+@dataclass(frozen=True)
 class CpuInfo:
     percent: float
     freq_mhz: Optional[float]
-    per_core: List[float]
+    per_core: Tuple[float, ...]
 
 
-@dataclass
+@dataclass(frozen=True)
 class RamInfo:
     used_gb: float
     total_gb: float
     percent: float
 
 
-@dataclass
+@dataclass(frozen=True)
 class DiskInfo:
     mount: str
     used_gb: float
     total_gb: float
     free_gb: float
     percent: float
+    # last known value: the mount did not answer in time
+    stale: bool = False
 
 
-@dataclass
+@dataclass(frozen=True)
 class NetInfo:
     up_bps: float
     down_bps: float
@@ -36,7 +42,7 @@ class NetInfo:
     total_recv_gb: float
 
 
-@dataclass
+@dataclass(frozen=True)
 class BatteryInfo:
     present: bool
     percent: Optional[float]
@@ -44,12 +50,12 @@ class BatteryInfo:
     secs_left: Optional[int]
 
 
-@dataclass
+@dataclass(frozen=True)
 class Snapshot:
     ts: float
     cpu: CpuInfo
     ram: RamInfo
-    disks: List[DiskInfo]
+    disks: Tuple[DiskInfo, ...]
     net: NetInfo
     battery: BatteryInfo
 
@@ -68,13 +74,19 @@ def _bytes_per_sec_to_human(bps: float) -> Tuple[float, str]:
 
 
 class SystemMonitor:
-    def __init__(self, history_points: int = 60):
+    def __init__(self, history_points: int = 60, proc_cache: Optional[ProcessCache] = None,
+                 disk_prober: Optional[DiskProber] = None, history_store: Optional[HistoryStore] = None):
         self.history_points = history_points
-        self.cpu_hist = deque(maxlen=history_points)
-        self.ram_hist = deque(maxlen=history_points)
-        self.net_up_hist = deque(maxlen=history_points)
-        self.net_down_hist = deque(maxlen=history_points)
-        self.ts_hist = deque(maxlen=history_points)
+        self.proc_cache = proc_cache or ProcessCache()
+        self.disk_prober = disk_prober or DiskProber()
+        # raw samples + 10s/1min/10min rollups; safe to read while a sampler thread appends
+        self.store = history_store or HistoryStore(
+            n_cores=psutil.cpu_count(logical=True) or 1,
+            raw_points=max(history_points, 3600),
+        )
+
+        self._disks: Tuple[DiskInfo, ...] = ()
+        self._disks_read = False
 
         self._last_net = psutil.net_io_counters()
         self._last_ts = time.time()
@@ -82,76 +94,72 @@ class SystemMonitor:
         # prime cpu measurement
         psutil.cpu_percent(interval=None)
 
-    def read_snapshot(self) -> Snapshot:
+    def read_snapshot(self, with_disks: bool = True) -> Snapshot:
+        """with_disks=False reuses the previous disk readings (they change slowly)."""
+        timer = STAGES.time
         ts = time.time()
 
-        cpu_percent = psutil.cpu_percent(interval=None)
-        per_core = psutil.cpu_percent(interval=None, percpu=True)
-        freq = psutil.cpu_freq()
-        freq_mhz = float(freq.current) if freq else None
-
-        vm = psutil.virtual_memory()
-        ram = RamInfo(
-            used_gb=round(_bytes_to_gb(vm.used), 2),
-            total_gb=round(_bytes_to_gb(vm.total), 2),
-            percent=float(vm.percent),
-        )
-
-        disks = []
-        for part in psutil.disk_partitions(all=False):
-            # skip cd-roms / weird
-            if "cdrom" in part.opts.lower():
-                continue
-            try:
-                du = psutil.disk_usage(part.mountpoint)
-            except Exception:
-                continue
-            disks.append(DiskInfo(
-                mount=part.device or part.mountpoint,
-                used_gb=round(_bytes_to_gb(du.used), 2),
-                total_gb=round(_bytes_to_gb(du.total), 2),
-                free_gb=round(_bytes_to_gb(du.free), 2),
-                percent=float(du.percent),
-            ))
-        # de-dup mounts
-        seen = set()
-        dedup = []
-        for d in disks:
-            key = d.mount
-            if key in seen:
-                continue
-            seen.add(key)
-            dedup.append(d)
-        disks = sorted(dedup, key=lambda x: x.mount.lower())
-
-        net_now = psutil.net_io_counters()
-        dt = max(ts - self._last_ts, 1e-6)
-        up_bps = (net_now.bytes_sent - self._last_net.bytes_sent) / dt
-        down_bps = (net_now.bytes_recv - self._last_net.bytes_recv) / dt
-        self._last_net = net_now
-        self._last_ts = ts
-
-        net = NetInfo(
-            up_bps=up_bps,
-            down_bps=down_bps,
-            total_sent_gb=round(_bytes_to_gb(net_now.bytes_sent), 2),
-            total_recv_gb=round(_bytes_to_gb(net_now.bytes_recv), 2),
-        )
+        with timer("snapshot.cpu"):
+            cpu_percent = psutil.cpu_percent(interval=None)
+            per_core = psutil.cpu_percent(interval=None, percpu=True)
+            freq = psutil.cpu_freq()
+            freq_mhz = float(freq.current) if freq else None
+
+        with timer("snapshot.ram"):
+            vm = psutil.virtual_memory()
+            ram = RamInfo(
+                used_gb=round(_bytes_to_gb(vm.used), 2),
+                total_gb=round(_bytes_to_gb(vm.total), 2),
+                percent=float(vm.percent),
+            )
 
-        batt = psutil.sensors_battery()
-        if batt is None:
-            battery = BatteryInfo(present=False, percent=None, plugged=None, secs_left=None)
-        else:
-            battery = BatteryInfo(
-                present=True,
-                percent=float(batt.percent) if batt.percent is not None else None,
-                plugged=bool(batt.power_plugged) if batt.power_plugged is not None else None,
-                secs_left=int(batt.secsleft) if batt.secsleft is not None and batt.secsleft >= 0 else None,
+        if with_disks or not self._disks_read:
+            with timer("snapshot.disks"):
+                # cached, de-duplicated partition list; slow mounts come back stale
+                self._disks = tuple(
+                    DiskInfo(
+                        mount=label,
+                        used_gb=round(_bytes_to_gb(du.used), 2),
+                        total_gb=round(_bytes_to_gb(du.total), 2),
+                        free_gb=round(_bytes_to_gb(du.free), 2),
+                        percent=float(du.percent),
+                        stale=stale,
+                    )
+                    for label, du, stale in self.disk_prober.probe()
+                )
+                self._disks_read = True
+        disks = self._disks
+
+        with timer("snapshot.net"):
+            net_now = psutil.net_io_counters()
+            dt = max(ts - self._last_ts, 1e-6)
+            up_bps = (net_now.bytes_sent - self._last_net.bytes_sent) / dt
+            down_bps = (net_now.bytes_recv - self._last_net.bytes_recv) / dt
+            self._last_net = net_now
+            self._last_ts = ts
+
+            net = NetInfo(
+                up_bps=up_bps,
+                down_bps=down_bps,
+                total_sent_gb=round(_bytes_to_gb(net_now.bytes_sent), 2),
+                total_recv_gb=round(_bytes_to_gb(net_now.bytes_recv), 2),
             )
 
+        with timer("snapshot.battery"):
+            batt = psutil.sensors_battery()
+            if batt is None:
+                battery = BatteryInfo(present=False, percent=None, plugged=None, secs_left=None)
+            else:
+                battery = BatteryInfo(
+                    present=True,
+                    percent=float(batt.percent) if batt.percent is not None else None,
+                    plugged=bool(batt.power_plugged) if batt.power_plugged is not None else None,
+                    secs_left=int(batt.secsleft) if batt.secsleft is not None and batt.secsleft >= 0 else None,
+                )
+
         snap = Snapshot(
             ts=ts,
-            cpu=CpuInfo(percent=float(cpu_percent), freq_mhz=freq_mhz, per_core=[float(x) for x in per_core]),
+            cpu=CpuInfo(percent=float(cpu_percent), freq_mhz=freq_mhz, per_core=tuple(float(x) for x in per_core)),
             ram=ram,
             disks=disks,
             net=net,
@@ -159,14 +167,19 @@ class SystemMonitor:
         )
 
         # history
-        self.ts_hist.append(ts)
-        self.cpu_hist.append(snap.cpu.percent)
-        self.ram_hist.append(snap.ram.percent)
-        self.net_up_hist.append(snap.net.up_bps)
-        self.net_down_hist.append(snap.net.down_bps)
+        with timer("snapshot.history"):
+            self.store.append(snap)
 
         return snap
 
+    def history(self, points: Optional[int] = None):
+        """
+        Newest `points` (default history_points) samples for the charts as
+        numpy views: {"ts": ..., "cpu": ..., "ram": ..., "net_up": ..., "net_down": ...}.
+        """
+        ts, data = self.store.last(["cpu", "ram", "net_up", "net_down"], points or self.history_points)
+        return {"ts": ts, "cpu": data[:, 0], "ram": data[:, 1], "net_up": data[:, 2], "net_down": data[:, 3]}
+
     @staticmethod
     def format_speed(bps: float) -> str:
         value, unit = _bytes_per_sec_to_human(bps)
@@ -179,34 +192,3 @@ class SystemMonitor:
         h = secs // 3600
         m = (secs % 3600) // 60
         return f"{h}h {m}m"
-
-    @staticmethod
-    def get_connections(max_rows: int = 50):
-        rows = []
-        try:
-            conns = psutil.net_connections(kind="inet")
-        except Exception:
-            return rows
-
-        # build pid->name map (cache-ish)
-        pid_name = {}
-        for c in conns:
-            if c.pid and c.pid not in pid_name:
-                try:
-                    pid_name[c.pid] = psutil.Process(c.pid).name()
-                except Exception:
-                    pid_name[c.pid] = "?"
-        for c in conns:
-            laddr = f"{c.laddr.ip}:{c.laddr.port}" if c.laddr else "-"
-            raddr = f"{c.raddr.ip}:{c.raddr.port}" if c.raddr else "-"
-            rows.append({
-                "local": laddr,
-                "remote": raddr,
-                "status": c.status,
-                "pid": c.pid or "-",
-                "process": pid_name.get(c.pid, "-") if c.pid else "-"
-            })
-
-        # most informative first: established
-        rows.sort(key=lambda r: (r["status"] != "ESTABLISHED", str(r["process"]), str(r["pid"])))
-        return rows[:max_rows]
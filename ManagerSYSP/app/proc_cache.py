@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import psutil
+
+
+@dataclass(frozen=True)
+class ProcInfo:
+    pid: int
+    create_time: float
+    name: str
+    exe: str
+    cmdline: Tuple[str, ...]
+
+
+class ProcessCache:
+    """
+    Shared LRU cache of process metadata (name, exe, cmdline).
+
+    Entries are keyed on (pid, create_time): a pid is re-checked at most every
+    `revalidate_s` seconds, and if its create time changed the pid was reused
+    and the entry is refetched. Between checks a lookup costs no syscalls, so
+    a reused pid can show the old name for up to `revalidate_s`; callers that
+    see a pid in a new place (a newly opened socket) pass revalidate=True to
+    check its create time right away.
+    """
+
+    def __init__(self, max_size: int = 4096, revalidate_s: float = 5.0):
+        self.max_size = max(1, max_size)
+        self.revalidate_s = revalidate_s
+        self._entries: "OrderedDict[int, Tuple[ProcInfo, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.reused = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, pid: int, revalidate: bool = False) -> Optional[ProcInfo]:
+        """Metadata for `pid`, or None if the process is gone / not accessible."""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(pid)
+            if cached is not None and not revalidate and now - cached[1] < self.revalidate_s:
+                self._entries.move_to_end(pid)
+                self.hits += 1
+                return cached[0]
+
+        try:
+            proc = psutil.Process(pid)
+            create_time = proc.create_time()
+        except Exception:
+            with self._lock:
+                self._entries.pop(pid, None)
+                self.errors += 1
+            return None
+
+        if cached is not None and cached[0].create_time == create_time:
+            with self._lock:
+                self._entries[pid] = (cached[0], now)
+                self._entries.move_to_end(pid)
+                self.hits += 1
+                self.revalidations += 1
+            return cached[0]
+
+        info = self._fetch(proc, create_time)
+        with self._lock:
+            if cached is not None:
+                self.reused += 1
+            self.misses += 1
+            self._entries[pid] = (info, now)
+            self._entries.move_to_end(pid)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return info
+
+    def name(self, pid: int, default: str = "?", revalidate: bool = False) -> str:
+        info = self.get(pid, revalidate)
+        return info.name if info is not None else default
+
+    @staticmethod
+    def _fetch(proc, create_time: float) -> ProcInfo:
+        name, exe, cmdline = "?", "", ()
+        with proc.oneshot():
+            try:
+                name = proc.name()
+            except Exception:
+                pass
+            try:
+                exe = proc.exe()
+            except Exception:
+                pass
+            try:
+                cmdline = tuple(proc.cmdline())
+            except Exception:
+                pass
+        return ProcInfo(pid=proc.pid, create_time=create_time, name=name, exe=exe, cmdline=cmdline)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "reused": self.reused,
+                "evictions": self.evictions,
+                "errors": self.errors,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
@@ -0,0 +1,309 @@
+"""
+Append-only on-disk log of snapshots, for looking back after an incident.
+
+A log is a directory of segment files. Each segment has a small JSON header
+(its column names) followed by fixed-width records: float64 timestamp +
+float32 per column. Segments are memory-mapped for queries and binary-searched
+on the timestamp column, so scanning weeks of 1s samples reads only the range
+asked for.
+
+    python -m app.recorder query --dir recordings --since 2h --metrics cpu,ram --step 60
+    python -m app.recorder info --dir recordings
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MAGIC = b"SPLOG1\0\0"
+SEGMENT_SUFFIX = ".seg"
+# 1 day of 1 Hz samples per segment
+DEFAULT_SEGMENT_ROWS = 86400
+DEFAULT_RETENTION_DAYS = 30.0
+
+
+def _record_dtype(ncols: int) -> np.dtype:
+    return np.dtype([("ts", "<f8"), ("v", "<f4", (ncols,))])
+
+
+def snapshot_values(snap) -> Dict[str, float]:
+    """Flat {column: value} view of a Snapshot (same names as the history store)."""
+    values = {
+        "cpu": snap.cpu.percent,
+        "ram": snap.ram.percent,
+        "net_up": snap.net.up_bps,
+        "net_down": snap.net.down_bps,
+    }
+    for i, p in enumerate(snap.cpu.per_core):
+        values[f"core{i}"] = p
+    for d in snap.disks:
+        values[f"disk:{d.mount}"] = d.percent
+    return values
+
+
+class Segment:
+    """One read-only, memory-mapped segment file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"not a SysPulse log segment: {path}")
+            (hlen,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(hlen))
+        self.columns: List[str] = header["columns"]
+        self.offset = len(MAGIC) + 4 + hlen
+        self.dtype = _record_dtype(len(self.columns))
+        size = os.path.getsize(path)
+        # a torn last record (crash mid-write) is ignored
+        self.rows = max(0, (size - self.offset) // self.dtype.itemsize)
+        self.records = (np.memmap(path, dtype=self.dtype, mode="r", offset=self.offset, shape=(self.rows,))
+                        if self.rows else np.zeros(0, dtype=self.dtype))
+
+    @property
+    def t_first(self) -> float:
+        return float(self.records["ts"][0]) if self.rows else float("nan")
+
+    @property
+    def t_last(self) -> float:
+        return float(self.records["ts"][-1]) if self.rows else float("nan")
+
+    def slice(self, t0: float, t1: float) -> np.ndarray:
+        """Records with t0 <= ts < t1 (a view of the map)."""
+        ts = self.records["ts"]
+        a = int(np.searchsorted(ts, t0, side="left"))
+        b = int(np.searchsorted(ts, t1, side="left"))
+        return self.records[a:b]
+
+
+class Recorder:
+    """
+    Appends snapshots to the current segment of `directory`.
+
+    A new segment starts every `segment_rows` records, or when the set of
+    columns changes (a disk was mounted, ...). Segments older than
+    `retention_days` are deleted on rotation. Safe to call from the sampler
+    thread.
+    """
+
+    def __init__(self, directory: str, segment_rows: int = DEFAULT_SEGMENT_ROWS,
+                 retention_days: Optional[float] = DEFAULT_RETENTION_DAYS):
+        self.directory = directory
+        self.segment_rows = max(1, segment_rows)
+        self.retention_days = retention_days
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._f = None
+        self._columns: Tuple[str, ...] = ()
+        self._index: Dict[str, int] = {}
+        self._rows = 0
+        self._dtype = None
+
+    def _open_segment(self, ts: float, columns: Sequence[str]):
+        self.close()
+        name = datetime.fromtimestamp(ts).strftime("%Y%m%d-%H%M%S") + f"-{int(ts * 1000) % 1000:03d}"
+        path = os.path.join(self.directory, name + SEGMENT_SUFFIX)
+        n = 1
+        while os.path.exists(path):
+            path = os.path.join(self.directory, f"{name}.{n}{SEGMENT_SUFFIX}")
+            n += 1
+        header = json.dumps({"version": 1, "columns": list(columns), "created": ts}).encode("utf-8")
+        # pad so records start 8-byte aligned
+        header += b" " * (-(len(MAGIC) + 4 + len(header)) % 8)
+        self._f = open(path, "ab")
+        self._f.write(MAGIC + struct.pack("<I", len(header)) + header)
+        self._columns = tuple(columns)
+        self._index = {c: i for i, c in enumerate(columns)}
+        self._dtype = _record_dtype(len(columns))
+        self._rows = 0
+        self._prune(ts)
+
+    def _prune(self, now: float):
+        if not self.retention_days:
+            return
+        cutoff = now - self.retention_days * 86400
+        current = self._f.name if self._f else None
+        for path in list_segments(self.directory):
+            if path == current:
+                continue
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def append(self, snap) -> None:
+        values = snapshot_values(snap)
+        with self._lock:
+            if (self._f is None or self._rows >= self.segment_rows
+                    or len(values) != len(self._columns) or any(k not in self._index for k in values)):
+                self._open_segment(snap.ts, list(values))
+            rec = np.zeros(1, dtype=self._dtype)
+            rec["ts"] = snap.ts
+            v = rec["v"][0]
+            for k, x in values.items():
+                v[self._index[k]] = x
+            self._f.write(rec.tobytes())
+            self._f.flush()
+            self._rows += 1
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+
+def list_segments(directory: str) -> List[str]:
+    try:
+        names = sorted(n for n in os.listdir(directory) if n.endswith(SEGMENT_SUFFIX))
+    except OSError:
+        return []
+    return [os.path.join(directory, n) for n in names]
+
+
+class RecordLog:
+    """Read side: time-range queries over every segment of a log directory."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def segments(self) -> List[Segment]:
+        out = []
+        for path in list_segments(self.directory):
+            try:
+                seg = Segment(path)
+            except (OSError, ValueError):
+                continue
+            if seg.rows:
+                out.append(seg)
+        return sorted(out, key=lambda s: s.t_first)
+
+    def columns(self) -> List[str]:
+        seen: Dict[str, None] = {}
+        for seg in self.segments():
+            for c in seg.columns:
+                seen.setdefault(c, None)
+        return list(seen)
+
+    def range(self, t0: float, t1: float, metrics: Optional[Iterable[str]] = None,
+              step: Optional[float] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Samples with t0 <= ts < t1 as (ts, {metric: values}).
+
+        Metrics missing from a segment come back as NaN. With `step`, samples
+        are averaged into step-second buckets (ts = bucket start).
+        """
+        segs = [s for s in self.segments() if s.t_last >= t0 and s.t_first < t1]
+        if metrics is None:
+            metrics = []
+            for s in segs:
+                metrics += [c for c in s.columns if c not in metrics]
+        metrics = list(metrics)
+
+        ts_parts = []
+        val_parts: Dict[str, list] = {m: [] for m in metrics}
+        for seg in segs:
+            recs = seg.slice(t0, t1)
+            if not len(recs):
+                continue
+            ts_parts.append(recs["ts"])
+            cols = {c: i for i, c in enumerate(seg.columns)}
+            v = recs["v"]
+            for m in metrics:
+                i = cols.get(m)
+                val_parts[m].append(v[:, i] if i is not None else np.full(len(recs), np.nan, dtype=np.float32))
+
+        if not ts_parts:
+            return np.zeros(0), {m: np.zeros(0, dtype=np.float32) for m in metrics}
+        ts = np.concatenate(ts_parts)
+        values = {m: np.concatenate(parts) for m, parts in val_parts.items()}
+        if step:
+            ts, values = _downsample(ts, values, step)
+        return ts, values
+
+
+def _downsample(ts: np.ndarray, values: Dict[str, np.ndarray], step: float):
+    bucket = np.floor(ts / step)
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    out = {}
+    for m, v in values.items():
+        v = v.astype(np.float64)
+        ok = ~np.isnan(v)
+        sums = np.add.reduceat(np.where(ok, v, 0.0), starts)
+        n = np.add.reduceat(ok.astype(np.int64), starts)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[m] = np.where(n > 0, sums / np.maximum(n, 1), np.nan)
+    return bucket[starts] * step, out
+
+
+def _parse_when(s: str, now: float) -> float:
+    """'2h' / '30m' / '90s' / '7d' ago, a unix timestamp or an ISO date-time."""
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    if s[-1:] in units:
+        try:
+            return now - float(s[:-1]) * units[s[-1]]
+        except ValueError:
+            pass
+    try:
+        return float(s)
+    except ValueError:
+        return datetime.fromisoformat(s).timestamp()
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="query a SysPulse snapshot log")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    q = sub.add_parser("query", help="print a time range as CSV")
+    q.add_argument("--dir", default="recordings")
+    q.add_argument("--since", default="1h", help="start: 2h / 30m / 7d ago, unix ts or ISO time")
+    q.add_argument("--until", default=None, help="end (default: now)")
+    q.add_argument("--metrics", default="cpu,ram,net_up,net_down", help="comma-separated, or 'all'")
+    q.add_argument("--step", type=float, default=None, help="average into buckets of this many seconds")
+
+    i = sub.add_parser("info", help="list segments")
+    i.add_argument("--dir", default="recordings")
+    args = p.parse_args(argv)
+
+    log = RecordLog(args.dir)
+    if args.cmd == "info":
+        for seg in log.segments():
+            print(f"{os.path.basename(seg.path)}  rows={seg.rows}  cols={len(seg.columns)}  "
+                  f"{datetime.fromtimestamp(seg.t_first):%Y-%m-%d %H:%M:%S} → "
+                  f"{datetime.fromtimestamp(seg.t_last):%Y-%m-%d %H:%M:%S}")
+        return
+
+    now = time.time()
+    t0 = _parse_when(args.since, now)
+    t1 = _parse_when(args.until, now) if args.until else now + 1
+    metrics = None if args.metrics == "all" else [m.strip() for m in args.metrics.split(",") if m.strip()]
+    started = time.perf_counter()
+    ts, values = log.range(t0, t1, metrics, args.step)
+    elapsed = time.perf_counter() - started
+
+    names = list(values)
+    out = sys.stdout
+    try:
+        out.write(",".join(["timestamp"] + names) + "\n")
+        for k in range(len(ts)):
+            row = [datetime.fromtimestamp(ts[k]).isoformat(timespec="seconds")]
+            row += [f"{values[m][k]:.2f}" for m in names]
+            out.write(",".join(row) + "\n")
+        out.flush()
+    except BrokenPipeError:
+        # reader went away (| head): stop quietly, and point stdout at devnull
+        # so the flush at interpreter exit does not raise again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return
+    print(f"{len(ts)} rows in {elapsed * 1000:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional, Set, Tuple
+
+from .conn_tracker import ConnectionTracker
+from .instrument import STAGES
+from .monitor import Snapshot, SystemMonitor
+from .processes import ProcessTable, ProcRow
+from .scheduler import Scheduler
+
+
+@dataclass(frozen=True)
+class Sample:
+    seq: int
+    snapshot: Snapshot
+    collect_ms: float
+    processes: Tuple[ProcRow, ...] = ()
+
+
+class Sampler:
+    """
+    Runs SystemMonitor collection on a worker thread.
+
+    Each finished Sample is published by swapping one reference, so readers
+    never wait on collection: latest() just returns whatever is newest. Slow
+    calls (net_connections, disk_usage on a slow mount) delay the next sample,
+    not the UI.
+
+    Without a scheduler everything is collected every `interval_ms`. With one,
+    each collector (cpu, disks, connections, processes) runs on its own
+    adaptive cadence, and a Sample reuses the previous result of collectors
+    that were not due.
+    """
+
+    def __init__(self, monitor: SystemMonitor, interval_ms: int = 1000,
+                 with_connections: bool = True, sinks: Iterable[Callable[[Snapshot], None]] = (),
+                 processes: Optional[ProcessTable] = None, process_rows: int = 15,
+                 process_every_s: float = 2.0, scheduler: Optional[Scheduler] = None,
+                 conn_tracker: Optional[ConnectionTracker] = None):
+        self.monitor = monitor
+        self.interval = max(0.01, interval_ms / 1000.0)
+        self.with_connections = with_connections
+        # called with every snapshot on the sampler thread (e.g. Recorder.append)
+        self.sinks = list(sinks)
+        # per-process table, refreshed every process_every_s (it walks every process)
+        self.processes = processes
+        self.process_rows = process_rows
+        self.process_every_s = process_every_s
+        self._procs: Tuple[ProcRow, ...] = ()
+        self._procs_at: Optional[float] = None
+        self.scheduler = scheduler
+        # connections are diffed into the tracker (the UI reads its ConnView), not kept in Samples
+        self.conn_tracker = conn_tracker
+        self.last_error: Optional[str] = None
+        self._latest: Optional[Sample] = None
+        self._seq = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="syspulse-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def latest(self) -> Optional[Sample]:
+        return self._latest
+
+    def sample_once(self, due: Optional[Set[str]] = None) -> Sample:
+        """Run the collectors in `due` (default: all of them) and publish a Sample."""
+        t0 = time.perf_counter()
+        prev = self._latest
+        fresh = due is None or prev is None or "cpu" in due or "disks" in due
+        if fresh:
+            with STAGES.time("read_snapshot"):
+                snap = self.monitor.read_snapshot(with_disks=due is None or "disks" in due)
+        else:
+            snap = prev.snapshot
+        if self.with_connections and self.conn_tracker is not None and (due is None or "connections" in due):
+            with STAGES.time("connections.diff"):
+                self.conn_tracker.update()
+        if self.processes is not None:
+            now = time.monotonic()
+            if due is not None:
+                run = "processes" in due
+            else:
+                run = self._procs_at is None or now - self._procs_at >= self.process_every_s
+            if run:
+                with STAGES.time("processes"):
+                    self._procs = tuple(self.processes.sample(self.process_rows))
+                self._procs_at = now
+        self._seq += 1
+        sample = Sample(
+            seq=self._seq,
+            snapshot=snap,
+            collect_ms=(time.perf_counter() - t0) * 1000.0,
+            processes=self._procs,
+        )
+        self._latest = sample
+        # sinks see each snapshot once
+        if fresh:
+            for sink in self.sinks:
+                sink(snap)
+        return sample
+
+    def _run(self):
+        if self.scheduler is not None:
+            self._run_scheduled()
+            return
+        next_at = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.sample_once()
+                self.last_error = None
+            except Exception as e:  # keep sampling; the UI shows the last good sample
+                self.last_error = f"{type(e).__name__}: {e}"
+            # fixed cadence; if collection overran, skip the missed ticks
+            now = time.monotonic()
+            next_at += self.interval
+            while next_at <= now:
+                next_at += self.interval
+            self._stop.wait(next_at - now)
+
+    def _run_scheduled(self):
+        sched = self.scheduler
+        while not self._stop.is_set():
+            now = time.monotonic()
+            due = sched.due(now)
+            if "disks" in due:
+                # a disk refresh produces a full snapshot anyway
+                due.add("cpu")
+            if due:
+                try:
+                    sample = self.sample_once(due)
+                    self.last_error = None
+                    if "cpu" in due or "disks" in due:
+                        sched.observe(sample.snapshot, now)
+                except Exception as e:
+                    self.last_error = f"{type(e).__name__}: {e}"
+                sched.done(due, now)
+            # wake at least once a second so un-hiding the window is picked up quickly
+            self._stop.wait(min(max(0.0, sched.next_at() - time.monotonic()), 1.0))
@@ -0,0 +1,142 @@
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Set
+
+# Collectors the sampler knows how to run separately
+COLLECTORS = ("cpu", "disks", "connections", "processes")
+
+
+@dataclass(frozen=True)
+class Cadence:
+    base_s: float
+    min_s: float
+    max_s: float
+
+
+class Scheduler:
+    """
+    Per-collector refresh intervals that follow what the machine is doing.
+
+    Every collector starts at its base interval, then:
+    - stretches (up to `hidden_backoff`x) while the window is hidden,
+    - stretches gradually (up to `flat_max`x) while cpu / ram / disks stay flat,
+    - drops to its min interval while its warn threshold is crossed,
+    - and all intervals stretch together while the monitor's own CPU use
+      (this process, all threads) is above `budget_percent` of one core.
+
+    Only the sampler thread calls due() / done() / observe(); the UI just
+    sets `hidden` and reads describe().
+    """
+
+    def __init__(self, cadences: Dict[str, Cadence], hidden_backoff: float = 5.0,
+                 flat_delta: float = 2.0, flat_max: float = 4.0, budget_percent: float = 5.0,
+                 budget_window_s: float = 5.0, warn: Optional[Dict[str, float]] = None):
+        self.cadences = dict(cadences)
+        self.hidden_backoff = max(1.0, hidden_backoff)
+        self.flat_delta = flat_delta
+        self.flat_max = max(1.0, flat_max)
+        self.budget_percent = budget_percent
+        self.budget_window_s = budget_window_s
+        # {"cpu": %, "ram": %, "disk_free_gb": GB}
+        self.warn = dict(warn or {})
+        # set by the UI thread; a plain bool is enough
+        self.hidden = False
+        self._was_hidden = False
+
+        self._next: Dict[str, float] = {name: 0.0 for name in self.cadences}
+        self._flat = 1.0
+        self._budget = 1.0
+        self._alert: Set[str] = set()
+        self._last_values: Optional[tuple] = None
+        self._cpu0 = time.process_time()
+        self._wall0 = time.monotonic()
+        self.own_cpu_percent = 0.0
+
+    @classmethod
+    def from_config(cls, config, collectors: Iterable[str] = COLLECTORS) -> "Scheduler":
+        return cls(
+            {name: Cadence(*getattr(config, f"schedule_{name}_s")) for name in collectors},
+            hidden_backoff=config.schedule_hidden_backoff,
+            flat_delta=config.schedule_flat_delta,
+            flat_max=config.schedule_flat_max,
+            budget_percent=config.cpu_budget_percent,
+            warn={"cpu": config.cpu_warn, "ram": config.ram_warn, "disk_free_gb": config.disk_free_warn_gb},
+        )
+
+    def interval(self, name: str) -> float:
+        c = self.cadences[name]
+        if name in self._alert:
+            s = c.min_s
+        else:
+            s = c.base_s * self._flat * (self.hidden_backoff if self.hidden else 1.0)
+            s = min(max(s, c.min_s), c.max_s)
+        # the budget wins over everything, including alerts
+        return s * self._budget
+
+    def due(self, now: float) -> Set[str]:
+        if self.hidden != self._was_hidden:
+            # shown again: don't sit out the long hidden intervals
+            self._was_hidden = self.hidden
+            for name in self._next:
+                self._next[name] = min(self._next[name], now + self.interval(name))
+        return {name for name, at in self._next.items() if at <= now}
+
+    def done(self, names: Iterable[str], now: float):
+        for name in names:
+            self._next[name] = now + self.interval(name)
+
+    def next_at(self) -> float:
+        return min(self._next.values())
+
+    def observe(self, snap, now: float):
+        """Update the flat / alert / budget factors from a fresh snapshot."""
+        values = (snap.cpu.percent, snap.ram.percent) + tuple(d.percent for d in snap.disks)
+        last = self._last_values
+        if last is not None and len(last) == len(values):
+            if max(abs(a - b) for a, b in zip(values, last)) < self.flat_delta:
+                self._flat = min(self._flat * 1.2, self.flat_max)
+            else:
+                self._flat = 1.0
+        self._last_values = values
+
+        alert = set()
+        if (snap.cpu.percent >= self.warn.get("cpu", float("inf"))
+                or snap.ram.percent >= self.warn.get("ram", float("inf"))):
+            alert |= {"cpu", "processes"}
+        if any(d.free_gb <= self.warn.get("disk_free_gb", float("-inf")) for d in snap.disks):
+            alert.add("disks")
+        newly = alert - self._alert
+        self._alert = alert & set(self.cadences)
+        # tighten now rather than after the current (long) interval runs out
+        for name in newly & set(self.cadences):
+            self._next[name] = min(self._next[name], now + self.cadences[name].min_s)
+
+        self._check_budget(now)
+
+    def _check_budget(self, now: float):
+        wall = now - self._wall0
+        if wall < self.budget_window_s:
+            return
+        cpu = time.process_time()
+        self.own_cpu_percent = 100.0 * (cpu - self._cpu0) / wall
+        self._cpu0, self._wall0 = cpu, now
+        if not self.budget_percent:
+            return
+        if self.own_cpu_percent > self.budget_percent:
+            self._budget = min(self._budget * 1.5, 8.0)
+        elif self.own_cpu_percent < self.budget_percent / 2:
+            self._budget = max(self._budget / 1.5, 1.0)
+
+    def describe(self) -> str:
+        """e.g. 'cpu 1.0s, disks 5.0s, ... • own CPU 1.2% • flat x1.7'"""
+        parts = [", ".join(f"{name} {self.interval(name):.1f}s" for name in self.cadences)]
+        parts.append(f"own CPU {self.own_cpu_percent:.1f}%")
+        if self.hidden:
+            parts.append("hidden")
+        if self._flat > 1.0:
+            parts.append(f"flat x{self._flat:.1f}")
+        if self._budget > 1.0:
+            parts.append(f"over budget x{self._budget:.1f}")
+        if self._alert:
+            parts.append("tight: " + ", ".join(sorted(self._alert)))
+        return "  •  ".join(parts)
@@ -1,4 +1,5 @@
 import math
+import os
 import time
 import platform
 from dataclasses import asdict
@@ -6,12 +7,26 @@ from datetime import datetime
 from typing import Dict, Optional
 
 import customtkinter as ctk
+import psutil
 
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+from .alerts import AlertEngine, parse_rule
+from .charts import LiveCharts, default_panels
+from .collector import Collector
 from .config import CONFIG
+from .conn_table import ConnTable
+from .conn_tracker import ConnectionTracker
+from .disks import DiskProber
+from .history import HistoryStore
+from .instrument import STAGES
 from .monitor import SystemMonitor
+from .proc_cache import ProcessCache
+from .processes import ProcessTable
+from .recorder import Recorder
+from .sampler import Sampler
+from .scheduler import COLLECTORS, Scheduler
 from .exporter import export_snapshot_csv, export_app_usage_csv
 from .window_tracker import ActiveWindowTracker
 
@@ -43,15 +58,93 @@ class App(ctk.CTk):
         self.geometry("1200x720")
         self.minsize(1100, 650)
 
-        self.monitor = SystemMonitor(history_points=CONFIG.history_points)
-        self.tracker = ActiveWindowTracker()
+        self.proc_cache = ProcessCache(CONFIG.proc_cache_size, CONFIG.proc_cache_revalidate_s)
+        STAGES.enabled = CONFIG.enable_instrumentation
+        self.monitor = SystemMonitor(
+            history_points=CONFIG.history_points,
+            proc_cache=self.proc_cache,
+            disk_prober=DiskProber(
+                CONFIG.disk_partitions_refresh_s,
+                CONFIG.disk_probe_timeout_s,
+                CONFIG.disk_probe_workers,
+                CONFIG.disk_probe_max_workers,
+            ),
+            history_store=HistoryStore(
+                n_cores=psutil.cpu_count(logical=True) or 1,
+                raw_points=max(CONFIG.history_points, CONFIG.history_raw_points),
+                max_disks=CONFIG.history_max_disks,
+            ),
+        )
+        self.tracker = ActiveWindowTracker(proc_cache=self.proc_cache)
         self.enable_usage = CONFIG.enable_app_usage_tracker and self.tracker.enabled
 
+        # Multi-host: agents push snapshots here (app/agent.py)
+        self.collector = None
+        self.collector_error = None
+        if CONFIG.enable_collector:
+            try:
+                self.collector = Collector(
+                    CONFIG.collector_host,
+                    CONFIG.collector_port,
+                    points=CONFIG.collector_history_points,
+                    max_hosts=CONFIG.collector_max_hosts,
+                )
+                self.collector.start()
+            except OSError as e:
+                self.collector_error = f"collector: {e}"
+        self.host_grid = None
+
         self._build_layout()
 
         self._last_snapshot = None
+        self._last_seq = 0
+        self._last_procs = None
+        # the table keeps its own copy of the rows, patched with changes_since()
+        self.conn_tracker = ConnectionTracker(self.proc_cache)
+        self._conn_version = -1
+        self._hidden = False
         self._usage_seconds: Dict[str, int] = {}
 
+        self.recorder = None
+        if CONFIG.enable_recorder:
+            record_dir = CONFIG.record_dir
+            if not os.path.isabs(record_dir):
+                record_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), record_dir)
+            self.recorder = Recorder(record_dir, CONFIG.record_segment_rows, CONFIG.record_retention_days)
+
+        self.alerts = None
+        self._alerts_version = -1
+        if CONFIG.enable_alerts:
+            alert_log = CONFIG.alert_log
+            if alert_log and not os.path.isabs(alert_log):
+                alert_log = os.path.join(os.path.dirname(os.path.dirname(__file__)), alert_log)
+            self.alerts = AlertEngine(
+                [parse_rule(r) for r in CONFIG.alert_rules],
+                log_path=alert_log or None,
+                cooldown_s=CONFIG.alert_cooldown_s,
+            )
+
+        self.scheduler = None
+        if CONFIG.enable_adaptive_refresh:
+            collectors = [c for c in COLLECTORS if c != "processes" or CONFIG.enable_process_table]
+            self.scheduler = Scheduler.from_config(CONFIG, collectors)
+
+        self.sampler = Sampler(
+            self.monitor,
+            interval_ms=CONFIG.refresh_ms,
+            processes=ProcessTable() if CONFIG.enable_process_table else None,
+            process_rows=CONFIG.top_processes_rows,
+            process_every_s=CONFIG.process_refresh_ms / 1000.0,
+            sinks=[sink for sink in (
+                self.recorder.append if self.recorder else None,
+                self.alerts.observe if self.alerts else None,
+            ) if sink is not None],
+            scheduler=self.scheduler,
+            conn_tracker=self.conn_tracker,
+        )
+        self.sampler.start()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
         self.after(200, self.refresh)
 
     def _build_layout(self):
@@ -64,7 +157,8 @@ class App(ctk.CTk):
 
         self.subtitle_lbl = ctk.CTkLabel(
             top,
-            text=f"{platform.system()} • refresh {CONFIG.refresh_ms}ms",
+            text=f"{platform.system()} • refresh "
+                 + ("adaptive" if CONFIG.enable_adaptive_refresh else f"{CONFIG.refresh_ms}ms"),
             font=ctk.CTkFont(size=12),
         )
         self.subtitle_lbl.pack(side="left", padx=6)
@@ -76,6 +170,10 @@ class App(ctk.CTk):
             self.btn_export_usage = ctk.CTkButton(top, text="Export App Usage CSV", command=self._export_usage)
             self.btn_export_usage.pack(side="right", padx=10, pady=10)
 
+        if self.collector is not None:
+            self.btn_hosts = ctk.CTkButton(top, text="Hosts", width=80, command=self._open_hosts)
+            self.btn_hosts.pack(side="right", padx=10, pady=10)
+
         # Main split
         body = ctk.CTkFrame(self, corner_radius=12)
         body.pack(fill="both", expand=True, padx=12, pady=(6, 12))
@@ -103,13 +201,20 @@ class App(ctk.CTk):
         charts_title = ctk.CTkLabel(charts, text="Live Charts (last ~60s)", font=ctk.CTkFont(size=14, weight="bold"))
         charts_title.pack(anchor="w", padx=10, pady=(10, 0))
 
-        self.fig = Figure(figsize=(8, 3.6), dpi=100)
-        self.ax1 = self.fig.add_subplot(311)
-        self.ax2 = self.fig.add_subplot(312)
-        self.ax3 = self.fig.add_subplot(313)
-
+        self.fig = Figure(figsize=(8, 4.8 if CONFIG.chart_core_heatmap else 3.6), dpi=100)
         self.canvas = FigureCanvasTkAgg(self.fig, master=charts)
         self.canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
+        # artists are built once here; each tick only blits new data into them
+        self.charts = LiveCharts(
+            self.fig,
+            self.canvas,
+            default_panels(
+                per_core=CONFIG.chart_per_core,
+                disks=CONFIG.chart_disks,
+                heatmap=CONFIG.chart_core_heatmap,
+            ),
+            window_s=CONFIG.history_points,
+        )
 
         # Right: connections + optional usage
         conn_frame = ctk.CTkFrame(right, corner_radius=12)
@@ -118,9 +223,35 @@ class App(ctk.CTk):
         conn_title = ctk.CTkLabel(conn_frame, text="Active Connections", font=ctk.CTkFont(size=14, weight="bold"))
         conn_title.pack(anchor="w", padx=10, pady=(10, 0))
 
-        self.conn_box = ctk.CTkTextbox(conn_frame, height=260)
-        self.conn_box.pack(fill="both", expand=True, padx=10, pady=10)
-        self.conn_box.configure(state="disabled")
+        self.conn_summary = ctk.CTkLabel(conn_frame, text="", justify="left", font=ctk.CTkFont(size=11))
+        self.conn_summary.pack(anchor="w", padx=10, pady=(4, 0))
+
+        self.conn_table = ConnTable(conn_frame)
+        self.conn_table.pack(fill="both", expand=True, padx=10, pady=10)
+
+        self.proc_box = None
+        if CONFIG.enable_process_table:
+            proc_frame = ctk.CTkFrame(right, corner_radius=12)
+            proc_frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+            proc_title = ctk.CTkLabel(proc_frame, text="Top Processes", font=ctk.CTkFont(size=14, weight="bold"))
+            proc_title.pack(anchor="w", padx=10, pady=(10, 0))
+
+            self.proc_box = ctk.CTkTextbox(proc_frame, height=200)
+            self.proc_box.pack(fill="both", expand=True, padx=10, pady=10)
+            self.proc_box.configure(state="disabled")
+
+        self.alert_box = None
+        if CONFIG.enable_alerts:
+            alert_frame = ctk.CTkFrame(right, corner_radius=12)
+            alert_frame.pack(fill="x", padx=10, pady=(0, 10))
+
+            alert_title = ctk.CTkLabel(alert_frame, text="Alerts", font=ctk.CTkFont(size=14, weight="bold"))
+            alert_title.pack(anchor="w", padx=10, pady=(10, 0))
+
+            self.alert_box = ctk.CTkTextbox(alert_frame, height=110)
+            self.alert_box.pack(fill="x", padx=10, pady=10)
+            self.alert_box.configure(state="disabled")
 
         usage_frame = ctk.CTkFrame(right, corner_radius=12)
         usage_frame.pack(fill="x", padx=10, pady=(0, 10))
@@ -132,6 +263,12 @@ class App(ctk.CTk):
         self.usage_lbl = ctk.CTkLabel(usage_frame, text="Enable in app/config.py (Windows only).", justify="left")
         self.usage_lbl.pack(anchor="w", padx=10, pady=(6, 10))
 
+        # Debug panel: per-stage timings (CONFIG.enable_instrumentation)
+        self.debug_lbl = None
+        if STAGES.enabled:
+            self.debug_lbl = ctk.CTkLabel(self, text="", justify="left", font=ctk.CTkFont(family="Courier", size=10))
+            self.debug_lbl.pack(anchor="w", padx=18, pady=(0, 4))
+
         # Footer
         self.footer = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=11))
         self.footer.pack(anchor="w", padx=18, pady=(0, 10))
@@ -160,12 +297,48 @@ class App(ctk.CTk):
 
         return {"frame": card, "value": v, "bar": bar, "status": status}
 
+    def _open_hosts(self):
+        if self.host_grid is not None and self.host_grid.winfo_exists():
+            self.host_grid.focus()
+            return
+        self.host_grid = HostGrid(self, self.collector)
+
+    def _on_close(self):
+        self.sampler.stop()
+        if self.collector:
+            self.collector.stop()
+        if self.recorder:
+            self.recorder.close()
+        self.destroy()
+
     def refresh(self):
-        snap = self.monitor.read_snapshot()
+        # minimized: draw nothing and let the scheduler back off
+        hidden = self.state() in ("iconic", "withdrawn")
+        if hidden != self._hidden:
+            self._hidden = hidden
+            if self.scheduler is not None:
+                self.scheduler.hidden = hidden
+        if hidden:
+            self.after(CONFIG.ui_hidden_poll_ms, self.refresh)
+            return
+
+        # render only the newest sample; collection happens on the sampler thread
+        sample = self.sampler.latest()
+        if sample is not None and sample.seq != self._last_seq:
+            self._last_seq = sample.seq
+            with STAGES.time("ui.render"):
+                self._render(sample)
+            if self.debug_lbl is not None:
+                self.debug_lbl.configure(text=STAGES.format())
+        self.after(CONFIG.ui_poll_ms, self.refresh)
+
+    def _render(self, sample):
+        snap = sample.snapshot
         self._last_snapshot = snap
 
         # CPU
-        cpu_status = _status_from_percent(snap.cpu.percent, CONFIG.cpu_warn, CONFIG.cpu_crit)
+        cpu_status = self._alert_status(
+            ("cpu", "core"), _status_from_percent(snap.cpu.percent, CONFIG.cpu_warn, CONFIG.cpu_crit))
         self._update_card(
             self.cpu_card,
             f"{snap.cpu.percent:.1f}%  •  {snap.cpu.freq_mhz:.0f} MHz" if snap.cpu.freq_mhz else f"{snap.cpu.percent:.1f}%",
@@ -174,7 +347,8 @@ class App(ctk.CTk):
         )
 
         # RAM
-        ram_status = _status_from_percent(snap.ram.percent, CONFIG.ram_warn, CONFIG.ram_crit)
+        ram_status = self._alert_status(
+            ("ram",), _status_from_percent(snap.ram.percent, CONFIG.ram_warn, CONFIG.ram_crit))
         self._update_card(
             self.ram_card,
             f"{snap.ram.used_gb:.2f} / {snap.ram.total_gb:.2f} GB  •  {snap.ram.percent:.1f}%",
@@ -217,7 +391,8 @@ class App(ctk.CTk):
         disk_lines = []
         worst_free = None
         for d in snap.disks[:6]:  # show a few
-            disk_lines.append(f"{d.mount}: {d.used_gb:.1f}/{d.total_gb:.1f} GB ({d.percent:.0f}%) • free {d.free_gb:.1f} GB")
+            stale = " • stale" if d.stale else ""
+            disk_lines.append(f"{d.mount}: {d.used_gb:.1f}/{d.total_gb:.1f} GB ({d.percent:.0f}%) • free {d.free_gb:.1f} GB{stale}")
             worst_free = d.free_gb if worst_free is None else min(worst_free, d.free_gb)
 
         if worst_free is None:
@@ -234,16 +409,28 @@ class App(ctk.CTk):
                 disk_status = "WARNING"
             else:
                 disk_status = "OK"
+            disk_status = self._alert_status(("disk",), disk_status)
 
         self._update_card(self.disk_card, disk_val, disk_bar, disk_status)
 
-        # Connections
-        rows = self.monitor.get_connections(max_rows=CONFIG.max_connections_rows)
-        self._render_connections(rows)
+        # Alerts
+        if self.alert_box is not None and self.alerts.version != self._alerts_version:
+            self._alerts_version = self.alerts.version
+            self._render_alerts()
+
+        # Connections: only what changed since the last render
+        with STAGES.time("ui.render_connections"):
+            self._render_connections()
+
+        # Top processes
+        if self.proc_box is not None and sample.processes is not self._last_procs:
+            self._last_procs = sample.processes
+            self._render_processes(sample.processes)
 
         # App usage (optional)
         if self.enable_usage:
-            current, usage = self.tracker.tick()
+            with STAGES.time("tracker.tick"):
+                current, usage = self.tracker.tick()
             self._usage_seconds = usage
             tops = self.tracker.top_usage(usage, limit=8)
             now_app = f"Now: {current.name} (PID {current.pid})\nTitle: {current.title}" if current else "Now: —"
@@ -255,75 +442,85 @@ class App(ctk.CTk):
             self.usage_lbl.configure(text="Enable in app/config.py (Windows only).")
 
         # Charts
-        self._update_charts()
+        with STAGES.time("ui.update_charts"):
+            self._update_charts()
 
         # Footer
-        self.footer.configure(text=f"Updated: {datetime.fromtimestamp(snap.ts).strftime('%Y-%m-%d %H:%M:%S')}")
-
-        self.after(CONFIG.refresh_ms, self.refresh)
+        footer = f"Updated: {datetime.fromtimestamp(snap.ts).strftime('%Y-%m-%d %H:%M:%S')}"
+        footer += f"  •  collect {sample.collect_ms:.0f} ms"
+        pc = self.proc_cache.stats()
+        footer += f"  •  proc cache {pc['size']} ({pc['hit_rate'] * 100:.0f}% hits)"
+        if self.scheduler is not None:
+            footer += f"\n{self.scheduler.describe()}"
+        if self.collector is not None:
+            footer += f"  •  {len(self.collector.hosts)} hosts on :{self.collector.port}"
+        if self.collector_error:
+            footer += f"  •  {self.collector_error}"
+        if self.sampler.last_error:
+            footer += f"  •  sampler error: {self.sampler.last_error}"
+        self.footer.configure(text=footer)
+
+    def _alert_status(self, prefixes, instant: str) -> str:
+        # rolling-window rules when enabled; otherwise the single-sample threshold
+        return self.alerts.status(prefixes) if self.alerts is not None else instant
+
+    def _render_alerts(self):
+        active, events = self.alerts.snapshot()
+        lines = []
+        for e in sorted(active, key=lambda e: (e.severity != "CRITICAL", e.since)):
+            repeats = f" ×{e.repeats + 1}" if e.repeats else ""
+            lines.append(f"{e.severity:8} {e.rule} [{e.column}] {e.value:.1f}{repeats}")
+        if not lines:
+            lines.append("No active alerts.")
+        lines.append("")
+        for e in events[:10]:
+            lines.append(f"{datetime.fromtimestamp(e.ts):%H:%M:%S} {e.state:8} {e.rule} [{e.column}]")
+        self.alert_box.configure(state="normal")
+        self.alert_box.delete("1.0", "end")
+        self.alert_box.insert("1.0", "\n".join(lines))
+        self.alert_box.configure(state="disabled")
 
     def _update_card(self, card, text: str, progress: float, status: str):
         card["value"].configure(text=text)
         card["bar"].set(max(0.0, min(1.0, progress)))
         card["status"].configure(text=status, text_color=_status_color(status))
 
-    def _render_connections(self, rows):
-        header = f"{'PROCESS':18} {'PID':6} {'STATUS':12} {'LOCAL':22} {'REMOTE':22}"
+    def _render_connections(self):
+        changes = self.conn_tracker.changes_since(self._conn_version)
+        # redrawn every tick even without changes: the visible rows' ages move
+        self.conn_table.apply(changes)
+        if changes.version == self._conn_version:
+            return
+        self._conn_version = changes.version
+        stats = self.conn_tracker.stats()
+        agg = self.conn_tracker.aggregates(3)
+        self.conn_summary.configure(text="\n".join([
+            f"{stats['open']} open  •  {stats['closed']} closed (avg life {stats['lifetime_avg_s']:.0f}s)",
+            "by status:  " + ", ".join(f"{k} {n}" for k, n in agg["status"]),
+            "by process: " + ", ".join(f"{k} {n}" for k, n in agg["process"]),
+            "by remote:  " + ", ".join(f"{k} {n}" for k, n in agg["remote"]),
+        ]))
+
+    def _render_processes(self, rows):
+        header = f"{'PROCESS':18} {'PID':7} {'CPU%':>6} {'RSS MB':>8} {'READ':>11} {'WRITE':>11} {'THR':>4}"
         lines = [header, "-" * len(header)]
-        for r in rows:
-            proc = str(r["process"])[:18].ljust(18)
-            pid = str(r["pid"]).ljust(6)
-            status = str(r["status"])[:12].ljust(12)
-            local = str(r["local"])[:22].ljust(22)
-            remote = str(r["remote"])[:22].ljust(22)
-            lines.append(f"{proc} {pid} {status} {local} {remote}")
-        txt = "\n".join(lines) if lines else "No connections."
-
-        self.conn_box.configure(state="normal")
-        self.conn_box.delete("1.0", "end")
-        self.conn_box.insert("1.0", txt)
-        self.conn_box.configure(state="disabled")
+        for p in rows:
+            lines.append(
+                f"{p.name[:18]:18} {p.pid:<7} {p.cpu_percent:6.1f} {p.rss_mb:8.1f} "
+                f"{self.monitor.format_speed(p.read_bps):>11} {self.monitor.format_speed(p.write_bps):>11} {p.threads:4}"
+            )
+        self.proc_box.configure(state="normal")
+        self.proc_box.delete("1.0", "end")
+        self.proc_box.insert("1.0", "\n".join(lines))
+        self.proc_box.configure(state="disabled")
 
     def _update_charts(self):
-        ts = list(self.monitor.ts_hist)
-        if len(ts) < 2:
-            return
-        t0 = ts[0]
-        x = [t - t0 for t in ts]
-
-        cpu = list(self.monitor.cpu_hist)
-        ram = list(self.monitor.ram_hist)
-        up = list(self.monitor.net_up_hist)
-        down = list(self.monitor.net_down_hist)
-
-        self.ax1.clear()
-        self.ax2.clear()
-        self.ax3.clear()
-
-        self.ax1.plot(x, cpu)
-        self.ax1.set_ylabel("CPU %")
-        self.ax1.set_ylim(0, 100)
-
-        self.ax2.plot(x, ram)
-        self.ax2.set_ylabel("RAM %")
-        self.ax2.set_ylim(0, 100)
-
-        # scale net to MB/s for readability
-        up_mb = [v / (1024**2) for v in up]
-        down_mb = [v / (1024**2) for v in down]
-        self.ax3.plot(x, up_mb, label="Up (MB/s)")
-        self.ax3.plot(x, down_mb, label="Down (MB/s)")
-        self.ax3.set_ylabel("Net MB/s")
-        self.ax3.set_xlabel("seconds")
-        self.ax3.legend(loc="upper right", fontsize=8)
-
-        self.fig.tight_layout()
-        self.canvas.draw_idle()
+        self.charts.update(self.monitor.store)
 
     def _export_snapshot(self):
         if not self._last_snapshot:
             return
-        path = export_snapshot_csv(self._last_snapshot)
+        path = export_snapshot_csv(self._last_snapshot, timings=STAGES.summary() if STAGES.enabled else None)
         self._toast(f"Exported snapshot: {path}")
 
     def _export_usage(self):
@@ -336,3 +533,59 @@ class App(ctk.CTk):
     def _toast(self, msg: str):
         # simple transient message in footer
         self.footer.configure(text=msg)
+
+
+class HostGrid(ctk.CTkToplevel):
+    """One tile per agent host: latest CPU / RAM / network, 1-minute CPU average and age."""
+
+    COLUMNS = 4
+
+    def __init__(self, master, collector: Collector):
+        super().__init__(master)
+        self.title("SysPulse — Hosts")
+        self.geometry("980x620")
+        self.collector = collector
+        self.header = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=12))
+        self.header.pack(anchor="w", padx=12, pady=(10, 0))
+        self.body = ctk.CTkScrollableFrame(self, corner_radius=12)
+        self.body.pack(fill="both", expand=True, padx=10, pady=10)
+        for col in range(self.COLUMNS):
+            self.body.grid_columnconfigure(col, weight=1)
+        # host -> (title label, stats label); tiles are created once and only relabelled
+        self.tiles: Dict[str, tuple] = {}
+        self._tick()
+
+    def _tile(self, host: str):
+        i = len(self.tiles)
+        frame = ctk.CTkFrame(self.body, corner_radius=10)
+        frame.grid(row=i // self.COLUMNS, column=i % self.COLUMNS, padx=6, pady=6, sticky="nsew")
+        title = ctk.CTkLabel(frame, text=host, font=ctk.CTkFont(size=13, weight="bold"))
+        title.pack(anchor="w", padx=10, pady=(8, 0))
+        stats = ctk.CTkLabel(frame, text="", justify="left", font=ctk.CTkFont(size=11))
+        stats.pack(anchor="w", padx=10, pady=(2, 8))
+        self.tiles[host] = (title, stats)
+        return self.tiles[host]
+
+    def _tick(self):
+        if not self.winfo_exists():
+            return
+        rows = self.collector.summary()
+        stale_after = 3 * CONFIG.agent_batch_s
+        stale = 0
+        for r in rows:
+            title, stats = self.tiles.get(r["host"]) or self._tile(r["host"])
+            is_stale = r["age_s"] is None or r["age_s"] > stale_after
+            stale += is_stale
+            cpu = r["cpu"] or 0.0
+            ram = r["ram"] or 0.0
+            status = "STALE" if is_stale else _status_from_percent(max(cpu, ram), CONFIG.cpu_warn, CONFIG.cpu_crit)
+            title.configure(text_color="gray" if is_stale else _status_color(status))
+            avg = "" if math.isnan(r["cpu_avg"]) else f" (1m {r['cpu_avg']:.0f}%)"
+            stats.configure(text=(
+                f"CPU {cpu:5.1f}%{avg}\n"
+                f"RAM {ram:5.1f}%\n"
+                f"↑ {SystemMonitor.format_speed(r['net_up'] or 0.0)}  ↓ {SystemMonitor.format_speed(r['net_down'] or 0.0)}\n"
+                f"{r['transport']} • {r['age_s'] or 0:.0f}s ago"
+            ))
+        self.header.configure(text=f"{len(rows)} hosts • {stale} stale • listening on :{self.collector.port}")
+        self.after(1000, self._tick)
@@ -29,7 +29,9 @@ class ActiveApp:
 
 class ActiveWindowTracker:
     """Tracks foreground app usage time (Windows only)."""
-    def __init__(self):
+    def __init__(self, proc_cache=None):
+        # optional app.proc_cache.ProcessCache shared with the monitor
+        self.proc_cache = proc_cache
         self.enabled = IS_WINDOWS and win32gui is not None and win32process is not None and psutil is not None
         self._last_app: Optional[ActiveApp] = None
         self._last_ts: float = time.time()
@@ -46,10 +48,13 @@ class ActiveWindowTracker:
             _, pid = win32process.GetWindowThreadProcessId(hwnd)
             if not pid:
                 return None
-            try:
-                name = psutil.Process(pid).name()
-            except Exception:
-                name = f"PID {pid}"
+            if self.proc_cache is not None:
+                name = self.proc_cache.name(pid, default=f"PID {pid}")
+            else:
+                try:
+                    name = psutil.Process(pid).name()
+                except Exception:
+                    name = f"PID {pid}"
             return ActiveApp(name=name, title=title[:80], pid=int(pid))
         except Exception:
             return None
@@ -0,0 +1,218 @@
+"""
+Binary protocol between agents (app/agent.py) and the collector (app/collector.py).
+
+Every message starts with b"SP", a version byte and a type byte. Over TCP each
+message is prefixed with its length (u32); over UDP one datagram is one message.
+
+HELLO  host, schema id, columns (name + decimal places)
+BATCH  host, schema id, row count, first timestamp, then per row:
+       ts delta (ms) and one value per column, all zigzag varints.
+       Values are fixed-point (value * 10**places); the first row is absolute,
+       later rows are deltas from the row before. A flat metric costs one byte.
+
+Batches are self-contained, so a lost UDP datagram loses only its own rows.
+"""
+import struct
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+MAGIC = b"SP"
+VERSION = 1
+HELLO = 1
+BATCH = 2
+
+_HEAD = struct.Struct("<2sBB")
+_LEN = struct.Struct("<I")
+_U16 = struct.Struct("<H")
+_F64 = struct.Struct("<d")
+
+# TCP frames above this are treated as a broken stream
+MAX_FRAME = 1 << 20
+# schema ids are u16
+MAX_SCHEMAS = 1 << 16
+
+
+class WireError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Hello:
+    host: str
+    schema: int
+    columns: Tuple[str, ...]
+    places: Tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class Batch:
+    host: str
+    schema: int
+    # [(ts, (int, int, ...)), ...] still fixed-point; Hello.places scales them
+    rows: List[Tuple[float, Tuple[int, ...]]]
+
+
+def column_places(name: str) -> int:
+    """Decimal places kept on the wire: 0.01 for percentages, whole bytes/s for rates."""
+    return 0 if name.startswith("net_") else 2
+
+
+def quantize(values: Sequence[float], places: Sequence[int]) -> Tuple[int, ...]:
+    return tuple(int(round(v * 10 ** p)) if v == v else 0 for v, p in zip(values, places))
+
+
+# --- varints ---------------------------------------------------------------
+
+def _put_varint(out: bytearray, n: int):
+    # zigzag: small negative deltas stay small
+    n = (n << 1) ^ (n >> 63)
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _get_varint(buf, i: int) -> Tuple[int, int]:
+    n = shift = 0
+    while True:
+        if i >= len(buf):
+            raise WireError("truncated varint")
+        b = buf[i]
+        i += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            break
+        shift += 7
+    return (n >> 1) ^ -(n & 1), i
+
+
+def _put_str(out: bytearray, s: str):
+    b = s.encode("utf-8")[:255]
+    out.append(len(b))
+    out += b
+
+
+def _get_str(buf, i: int) -> Tuple[str, int]:
+    if i >= len(buf):
+        raise WireError("truncated string")
+    n = buf[i]
+    i += 1
+    if i + n > len(buf):
+        raise WireError("truncated string")
+    return bytes(buf[i:i + n]).decode("utf-8", "replace"), i + n
+
+
+# --- encode ----------------------------------------------------------------
+
+def encode_hello(host: str, schema: int, columns: Sequence[str], places: Sequence[int]) -> bytes:
+    out = bytearray(_HEAD.pack(MAGIC, VERSION, HELLO))
+    _put_str(out, host)
+    out += _U16.pack(schema)
+    out += _U16.pack(len(columns))
+    for name, p in zip(columns, places):
+        _put_str(out, name)
+        out.append(p)
+    return bytes(out)
+
+
+class BatchEncoder:
+    """Builds one BATCH message row by row; size() tells when a datagram is full."""
+
+    def __init__(self, host: str, schema: int):
+        self._out = bytearray(_HEAD.pack(MAGIC, VERSION, BATCH))
+        _put_str(self._out, host)
+        self._out += _U16.pack(schema)
+        self._count_at = len(self._out)
+        self._out += b"\0\0" + b"\0" * 8
+        self.rows = 0
+        self._t0 = 0.0
+        self._last_ms = 0
+        self._last: Tuple[int, ...] = ()
+
+    def add(self, ts: float, ivalues: Tuple[int, ...]):
+        out = self._out
+        ms = int(round(ts * 1000))
+        if self.rows == 0:
+            self._t0 = ts
+            self._last_ms = ms
+            out[self._count_at + 2:self._count_at + 10] = _F64.pack(ts)
+            _put_varint(out, 0)
+            for v in ivalues:
+                _put_varint(out, v)
+        else:
+            _put_varint(out, ms - self._last_ms)
+            self._last_ms = ms
+            for v, last in zip(ivalues, self._last):
+                _put_varint(out, v - last)
+        self._last = ivalues
+        self.rows += 1
+
+    def size(self) -> int:
+        return len(self._out)
+
+    def finish(self) -> bytes:
+        self._out[self._count_at:self._count_at + 2] = _U16.pack(self.rows)
+        return bytes(self._out)
+
+
+def frame(message: bytes) -> bytes:
+    """Length-prefixed for TCP."""
+    return _LEN.pack(len(message)) + message
+
+
+# --- decode ----------------------------------------------------------------
+
+def decode(buf, ncols: Dict[Tuple[str, int], int]):
+    """
+    One message -> Hello or Batch. `ncols` maps (host, schema) to its column
+    count (learned from HELLOs); a BATCH for an unknown schema raises KeyError.
+    """
+    if len(buf) < _HEAD.size:
+        raise WireError("short message")
+    magic, version, kind = _HEAD.unpack_from(buf, 0)
+    if magic != MAGIC or version != VERSION:
+        raise WireError("not a SysPulse message")
+    i = _HEAD.size
+    host, i = _get_str(buf, i)
+    if i + 2 > len(buf):
+        raise WireError("truncated header")
+    (schema,) = _U16.unpack_from(buf, i)
+    i += 2
+
+    if kind == HELLO:
+        (n,) = _U16.unpack_from(buf, i)
+        i += 2
+        columns, places = [], []
+        for _ in range(n):
+            name, i = _get_str(buf, i)
+            if i >= len(buf):
+                raise WireError("truncated hello")
+            columns.append(name)
+            places.append(buf[i])
+            i += 1
+        return Hello(host, schema, tuple(columns), tuple(places))
+
+    if kind == BATCH:
+        n = ncols[(host, schema)]
+        if i + 10 > len(buf):
+            raise WireError("truncated batch")
+        (count,) = _U16.unpack_from(buf, i)
+        (t0,) = _F64.unpack_from(buf, i + 2)
+        i += 10
+        rows = []
+        ms = 0
+        last = [0] * n
+        for r in range(count):
+            d, i = _get_varint(buf, i)
+            ms += d
+            if r == 0:
+                for c in range(n):
+                    last[c], i = _get_varint(buf, i)
+            else:
+                for c in range(n):
+                    d, i = _get_varint(buf, i)
+                    last[c] += d
+            rows.append((t0 + ms / 1000.0, tuple(last)))
+        return Batch(host, schema, rows)
+
+    raise WireError(f"unknown message type {kind}")
@@ -0,0 +1,121 @@
+import time
+
+import pytest
+
+from app import wire
+from app.agent import Agent
+from app.collector import Collector
+
+
+def _wait(pred, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if pred():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def _rows(collector, host):
+    with collector.lock:
+        h = collector.hosts.get(host)
+        return h.rows if h is not None else 0
+
+
+@pytest.fixture
+def collector():
+    c = Collector("127.0.0.1", 0)
+    c.start()
+    yield c
+    c.stop()
+
+
+def test_varint_zigzag_round_trip():
+    values = [0, 1, -1, 63, -64, 64, -65, 127, 128, -129, 300, -300, 2 ** 31, -2 ** 31, 2 ** 40, -2 ** 40]
+    out = bytearray()
+    for v in values:
+        wire._put_varint(out, v)
+    i = 0
+    for v in values:
+        got, i = wire._get_varint(out, i)
+        assert got == v
+    assert i == len(out)
+    # small magnitudes of either sign fit one byte
+    for v in (0, 1, -1, 63, -64):
+        out = bytearray()
+        wire._put_varint(out, v)
+        assert len(out) == 1
+
+
+def test_batch_round_trip():
+    columns = ("cpu", "net_up")
+    places = tuple(wire.column_places(c) for c in columns)
+    hello = wire.decode(wire.encode_hello("h", 3, columns, places), {})
+    assert hello == wire.Hello("h", 3, columns, places)
+
+    enc = wire.BatchEncoder("h", 3)
+    rows = [(1000.0, (1250, 5000)), (1001.0, (1200, 5000)), (1002.5, (1300, 4000))]
+    for ts, ivalues in rows:
+        enc.add(ts, ivalues)
+    batch = wire.decode(enc.finish(), {("h", 3): len(columns)})
+    assert batch.schema == 3
+    assert [(round(ts, 3), v) for ts, v in batch.rows] == rows
+
+
+@pytest.mark.parametrize("udp", [False, True])
+def test_agent_schema_change_mid_stream(collector, udp):
+    name = f"agent-{'udp' if udp else 'tcp'}"
+    agent = Agent(("127.0.0.1", collector.port), name=name, udp=udp)
+    t = time.time()
+    agent.append_values(t, ("cpu", "ram"), (10.0, 20.0))
+    agent.append_values(t + 1, ("cpu", "ram"), (11.0, 21.0))
+    # a disk shows up, then goes again
+    agent.append_values(t + 2, ("cpu", "ram", "disk:/mnt"), (12.0, 22.0, 50.0))
+    agent.append_values(t + 3, ("cpu", "ram"), (13.0, 23.0))
+    agent.flush()
+    try:
+        assert _wait(lambda: _rows(collector, name) == 4)
+        with collector.lock:
+            h = collector.hosts[name]
+            assert h.latest == {"cpu": 13.0, "ram": 23.0}
+            # the third column set reused the first one's id
+            assert len(h.schemas) == 2
+        assert len(agent._schemas) == 2
+        assert agent.last_error is None
+    finally:
+        agent.stop()
+
+
+def test_agent_reconnect_resends_hello():
+    collector = Collector("127.0.0.1", 0)
+    collector.start()
+    agent = Agent(("127.0.0.1", collector.port), name="agent-re")
+    t = time.time()
+    agent.append_values(t, ("cpu", "ram"), (10.0, 20.0))
+    agent.flush()
+    assert _wait(lambda: _rows(collector, "agent-re") == 1)
+    port = collector.port
+    collector.stop()
+
+    # a fresh collector knows no schemas: its rows only decode if the HELLO comes again
+    fresh = Collector("127.0.0.1", port)
+    fresh.start()
+    try:
+        agent._close()
+        agent._retry_at = 0.0
+        agent.append_values(t + 1, ("cpu", "ram"), (11.0, 21.0))
+        agent.flush()
+        assert _wait(lambda: _rows(fresh, "agent-re") == 1)
+        with fresh.lock:
+            assert fresh.hosts["agent-re"].latest == {"cpu": 11.0, "ram": 21.0}
+    finally:
+        agent.stop()
+        fresh.stop()
+
+
+def test_agent_schema_ids_stay_in_range():
+    agent = Agent(("127.0.0.1", 9), name="agent-ids", queue_rows=10)
+    for i in range(wire.MAX_SCHEMAS + 5):
+        agent.append_values(float(i), (f"disk:/m{i}",), (1.0,))
+    assert len(agent._schemas) <= wire.MAX_SCHEMAS
+    assert all(schema < wire.MAX_SCHEMAS for _, schema, _ in agent._rows)
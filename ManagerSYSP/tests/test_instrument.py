@@ -0,0 +1,41 @@
+import random
+
+from app.instrument import LatencyHistogram
+
+
+def _ordered(st):
+    return st["p50"] <= st["p95"] <= st["max"]
+
+
+def test_single_sample():
+    h = LatencyHistogram()
+    h.add(1.0)
+    st = h.stats()
+    assert st["count"] == 1
+    assert st["p50"] == st["p95"] == st["max"] == 1.0
+
+
+def test_one_bucket():
+    # all samples at the bottom of one bucket, below its geometric middle
+    h = LatencyHistogram()
+    for _ in range(100):
+        h.add(0.0105)
+    assert _ordered(h.stats())
+
+
+def test_percentiles_within_min_max():
+    rng = random.Random(1)
+    for _ in range(200):
+        h = LatencyHistogram()
+        samples = [rng.lognormvariate(0, 2) for _ in range(rng.randint(1, 50))]
+        for ms in samples:
+            h.add(ms)
+        st = h.stats()
+        assert _ordered(st), (samples, st)
+        assert st["p50"] >= round(min(samples), 3)
+
+
+def test_empty():
+    st = LatencyHistogram().stats()
+    assert st["count"] == 0
+    assert st["p50"] == st["p95"] == st["max"] == 0.0
@@ -1,84 +1,275 @@
-import csv
-from pathlib import Path
-
-INPUT_FILE = "people.csv"
-OUTPUT_FILE = "people_sorted.csv"
-
-def norm(s: str) -> str:
-    return (s or "").strip().lower()
-
-def normalize_text(text: str) -> str:
-    # If file contains literal "\n" sequences, convert them to real new lines
-    if "\\n" in text and "\n" not in text:
-        text = text.replace("\\n", "\n")
-    # Normalize line endings
-    text = text.replace("\r\n", "\n").replace("\r", "\n")
-    return text
-
-def main():
-    path = Path(INPUT_FILE)
-    if not path.exists():
-        print("File not found:", INPUT_FILE)
-        return
-
-    text = path.read_text(encoding="utf-8", errors="replace")
-    text = normalize_text(text)
-
-    lines = [ln for ln in text.split("\n") if ln.strip()]
-    if len(lines) < 2:
-        print("Your CSV seems to have no data lines. Check people.csv formatting.")
-        return
-
-    # Parse CSV line-by-line
-    rows = []
-    for ln in lines:
-        rows.append(next(csv.reader([ln])))
-
-    header = [norm(h).replace(" ", "_") for h in rows[0]]
-
-    # Find columns (supports Full Name / Full_Name etc.)
-    def col(*names):
-        for n in names:
-            n = n.replace(" ", "_")
-            if n in header:
-                return header.index(n)
-        return None
-
-    name_i = col("full_name", "name")
-    dob_i = col("dob", "date_of_birth")
-    ms_i  = col("marital_status", "status", "marriage_status")
-    addr_i = col("address", "addres")
-
-    # If header not detected, fallback to positions
-    if name_i is None:
-        name_i, dob_i, ms_i, addr_i = 0, 1, 2, 3
-        data_rows = rows
-    else:
-        data_rows = rows[1:]
-
-    cleaned = []
-    for r in data_rows:
-        if len(r) < 4:
-            continue
-        name = r[name_i].strip()
-        dob = r[dob_i].strip() if dob_i is not None and dob_i < len(r) else ""
-        status = r[ms_i].strip() if ms_i is not None and ms_i < len(r) else ""
-        address = ",".join(r[addr_i:]).strip() if addr_i is not None else ",".join(r[3:]).strip()
-        cleaned.append([name, dob, status, address])
-
-    # DEBUG: show how many rows were read
-    print("Rows parsed:", len(cleaned))
-    if cleaned:
-        print("First row:", cleaned[0])
-
-    cleaned.sort(key=lambda x: (norm(x[0]), norm(x[3])))
-
-    with open(OUTPUT_FILE, "w", encoding="utf-8", newline="") as f:
-        w = csv.writer(f)
-        w.writerow(["Full Name", "DOB", "Marital Status", "Address"])
-        w.writerows(cleaned)
-
-    print("Saved:", OUTPUT_FILE)
-
-if __name__ == "__main__":
-    main()
\ No newline at end of file
+import argparse
+import os
+import tempfile
+from pathlib import Path
+
+from collation import DEFAULT_SORT, Collator, dedup_sort_spec
+from dedup import (
+    DEFAULT_DEDUP_MEMORY_MB,
+    POLICIES,
+    FirstSeenFilter,
+    dedup_rows,
+    dedup_sorted,
+    merge_dedup_is_exact,
+    new_report,
+    print_report,
+    unique_indexes,
+)
+from external_sort import DEFAULT_MEMORY_MB, merge_runs, spill_sorted_runs
+from incremental import append_tail, check_append, describe_input, load_state, save_state
+from mmap_input import KEY_CACHE_SIZE, SORT_CHUNK_ROWS, MappedPeople
+from parallel_sort import sort_partitions
+from people_index import build_index, check_sort_spec, write_people_indexed
+from people_io import iter_people, norm, normalize_text, write_people  # noqa: F401
+from row_store import RowStore
+
+INPUT_FILE = "people.csv"
+OUTPUT_FILE = "people_sorted.csv"
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Sort people.csv A-Z by Full Name (Address as tie-breaker).")
+    p.add_argument("--input", default=INPUT_FILE, help=f"input CSV (default: {INPUT_FILE})")
+    p.add_argument("--output", default=OUTPUT_FILE, help=f"output CSV (default: {OUTPUT_FILE})")
+    p.add_argument("--sort-by", default=DEFAULT_SORT,
+                   help="comma-separated columns (name, dob, status, address), each optionally "
+                        f":asc or :desc, e.g. dob:desc,name (default: {DEFAULT_SORT})")
+    p.add_argument("--mmap", action="store_true",
+                   help="memory-map the input, keep each row as the byte offset of its line and "
+                        "sort in bounded chunks (in-memory sort only; peak RSS below the file size; "
+                        "rows are already compact, so --compact adds nothing)")
+    p.add_argument("--compact", action="store_true",
+                   help="hold rows in a packed buffer + array columns and sort an index array "
+                        "(in-memory sort only; far fewer bytes per row)")
+    p.add_argument("--external", action="store_true",
+                   help="stream the input and merge sorted runs from disk (for files larger than RAM)")
+    p.add_argument("--memory-mb", type=int, default=DEFAULT_MEMORY_MB,
+                   help=f"memory budget per sorted run with --external (default: {DEFAULT_MEMORY_MB})")
+    p.add_argument("--workers", type=int, default=1,
+                   help="parse and sort on N processes (0 = one per CPU); implies on-disk runs")
+    p.add_argument("--incremental", action="store_true",
+                   help="only parse rows appended since the last --incremental run and merge them "
+                        "into the existing output (full rebuild if the old part changed)")
+    p.add_argument("--index", type=int, default=0, metavar="N",
+                   help="also write a sparse name/address index (<output>.idx) with one entry "
+                        "every N rows, for people_index.py lookup")
+    p.add_argument("--dedup", choices=POLICIES, default=None,
+                   help="drop rows with the same name, DOB and address (ignoring case, accents and "
+                        "spacing); the policy picks which one is kept")
+    p.add_argument("--dedup-memory-mb", type=int, default=DEFAULT_DEDUP_MEMORY_MB,
+                   help="cap for the duplicate hash set with --external; past it, the rest is "
+                        f"deduplicated while merging (default: {DEFAULT_DEDUP_MEMORY_MB})")
+    p.add_argument("--dedup-report", default=None, metavar="PATH",
+                   help="also write the duplicate counts as JSON to PATH")
+    p.add_argument("--tmpdir", default=None, help="where to put sorted runs with --external / --workers")
+    return p.parse_args(argv)
+
+
+def _report(count: int, first_row) -> None:
+    # DEBUG: show how many rows were read
+    print("Rows parsed:", count)
+    if first_row is not None:
+        print("First row:", first_row)
+
+
+def _write(args, rows) -> None:
+    if args.index > 0:
+        write_people_indexed(args.output, rows, args.index, args.sort_by)
+    else:
+        write_people(args.output, rows)
+
+
+def sort_in_memory(args, key, report=None) -> bool:
+    stats = {}
+    cleaned = list(iter_people(args.input, stats))
+    if stats["lines"] < 2:
+        print("Your CSV seems to have no data lines. Check people.csv formatting.")
+        return False
+
+    _report(len(cleaned), cleaned[0] if cleaned else None)
+
+    if report is not None:
+        cleaned = dedup_rows(cleaned, args.dedup, report)
+    cleaned.sort(key=key)
+    _write(args, cleaned)
+    return True
+
+
+def sort_compact(args, key, report=None) -> bool:
+    stats = {}
+    store = RowStore()
+    store.extend(iter_people(args.input, stats))
+    if stats["lines"] < 2:
+        print("Your CSV seems to have no data lines. Check people.csv formatting.")
+        return False
+    return _sort_store(args, key, store, report)
+
+
+def sort_mapped(args, key, report=None) -> bool:
+    with MappedPeople(args.input) as people:
+        store = people.load()
+        if people.lines < 2:
+            print("Your CSV seems to have no data lines. Check people.csv formatting.")
+            return False
+        # rows are 8 bytes each here, so the sort keys would be most of the peak: one chunk at a time
+        key = Collator(key.spec, cache_size=KEY_CACHE_SIZE)
+        return _sort_store(args, key, store, report, chunk_rows=SORT_CHUNK_ROWS)
+
+
+def _sort_store(args, key, store: RowStore, report=None, chunk_rows: int = 0) -> bool:
+    _report(len(store), store.row(0) if len(store) else None)
+
+    kept = unique_indexes(store.iter_rows(), args.dedup, report) if report is not None else None
+    order = store.sort_order(key, kept, chunk_rows)
+    _write(args, store.iter_rows(order))
+    return True
+
+
+def sort_external(args, key, report=None) -> bool:
+    stats = {}
+    seen = {"rows": 0, "first": None}
+
+    def counted(rows):
+        for row in rows:
+            if seen["first"] is None:
+                seen["first"] = row
+            seen["rows"] += 1
+            yield row
+
+    rows = counted(iter_people(args.input, stats))
+    seen_filter = None
+    if report is not None and args.dedup == "first":
+        seen_filter = FirstSeenFilter(max(1, args.dedup_memory_mb) * 1024 * 1024, report)
+        rows = seen_filter(rows)
+
+    with tempfile.TemporaryDirectory(prefix="people_sort_", dir=args.tmpdir) as tmpdir:
+        runs, tail = spill_sorted_runs(
+            rows,
+            key=key,
+            memory_bytes=max(1, args.memory_mb) * 1024 * 1024,
+            tmpdir=tmpdir,
+        )
+        if stats["lines"] < 2:
+            print("Your CSV seems to have no data lines. Check people.csv formatting.")
+            return False
+
+        _report(seen["rows"], seen["first"])
+        print("Sorted runs on disk:", len(runs))
+
+        merged = merge_runs(runs, tail, key=key, tmpdir=tmpdir)
+        if report is not None:
+            if seen_filter is None or seen_filter.frozen:
+                report["method"] = "merge" if seen_filter is None else "hash+merge"
+                merged = dedup_sorted(merged, args.dedup, report)
+            else:
+                report["method"] = "hash"
+        _write(args, merged)
+    if report is not None:
+        report["rows_in"] = seen["rows"]
+        report["rows_out"] = seen["rows"] - report["duplicates"]
+    return True
+
+
+def sort_parallel(args, key, workers: int, report=None) -> bool:
+    with tempfile.TemporaryDirectory(prefix="people_sort_", dir=args.tmpdir) as tmpdir:
+        runs, rows, first_row, lines = sort_partitions(
+            args.input,
+            workers=workers,
+            key=key,
+            memory_bytes=max(1, args.memory_mb) * 1024 * 1024,
+            tmpdir=tmpdir,
+        )
+        if lines < 2:
+            print("Your CSV seems to have no data lines. Check people.csv formatting.")
+            return False
+
+        _report(rows, first_row)
+        print("Sorted runs on disk:", len(runs), f"({workers} workers)")
+
+        merged = merge_runs(runs, [], key=key, tmpdir=tmpdir)
+        if report is not None:
+            report["method"] = "merge"
+            merged = dedup_sorted(merged, args.dedup, report)
+        _write(args, merged)
+    return True
+
+
+def sort_appended(args, key, state, prefix_hasher, report=None) -> None:
+    with tempfile.TemporaryDirectory(prefix="people_sort_", dir=args.tmpdir) as tmpdir:
+        rows, first_row = append_tail(
+            args.input,
+            args.output,
+            state,
+            prefix_hasher,
+            key=key,
+            memory_bytes=max(1, args.memory_mb) * 1024 * 1024,
+            tmpdir=tmpdir,
+            dedup=None if report is None else lambda merged: dedup_sorted(merged, args.dedup, report),
+        )
+    if report is not None:
+        report["method"] = "merge"
+    print("Incremental: merged appended rows into", args.output)
+    _report(rows, first_row)
+    if args.index > 0:
+        build_index(args.output, args.index, args.sort_by)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    path = Path(args.input)
+    if not path.exists():
+        print("File not found:", args.input)
+        return
+    try:
+        if args.dedup:
+            # duplicates must sort next to each other for the merge-time pass
+            args.sort_by = dedup_sort_spec(args.sort_by)
+        key = Collator(args.sort_by)
+    except ValueError as e:
+        print("Bad --sort-by:", e)
+        return
+    if args.index > 0:
+        try:
+            check_sort_spec(args.sort_by)
+        except ValueError as e:
+            print("Can't use --index:", e)
+            return
+    report = new_report(args.dedup) if args.dedup else None
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    if report is not None and (workers > 1 or args.external or args.incremental) \
+            and not merge_dedup_is_exact(args.sort_by):
+        print("Note: status is sorted before name/dob/address, so duplicates that differ only "
+              "in status may be kept when deduplicating during the merge.")
+
+    if args.incremental:
+        state = load_state(args.output)
+        reason, prefix_hasher = check_append(args.input, args.output, args.sort_by, state, args.dedup)
+        if reason is None:
+            sort_appended(args, key, state, prefix_hasher, report)
+            if report is not None:
+                print_report(report, args.dedup_report)
+            print("Saved:", args.output)
+            return
+        print("Incremental: full rebuild,", reason)
+        size_before = path.stat().st_size
+
+    if workers > 1:
+        ok = sort_parallel(args, key, workers, report)
+    elif args.external:
+        ok = sort_external(args, key, report)
+    elif args.mmap:
+        ok = sort_mapped(args, key, report)
+    elif args.compact:
+        ok = sort_compact(args, key, report)
+    else:
+        ok = sort_in_memory(args, key, report)
+    if ok and args.incremental and path.stat().st_size == size_before:
+        save_state(args.output, describe_input(args.input, args.output, args.sort_by, size_before, args.dedup))
+    if ok and report is not None:
+        print_report(report, args.dedup_report)
+    if ok:
+        print("Saved:", args.output)
+
+
+if __name__ == "__main__":
+    main()
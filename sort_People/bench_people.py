@@ -0,0 +1,342 @@
+"""
+Benchmarks for the people sorter.
+
+    python bench_people.py --rows 500000
+    python bench_people.py --rows 1000000 --style crlf --stages --modes default,mmap,compact \
+        --json bench_results.jsonl --baseline bench_results.jsonl
+    python bench_people.py --rows 2000000 --scaling 1,2,4,8
+    python bench_people.py --rows 10000000 --bytes-per-row
+
+Input is generated by gen_people.py (seeded) unless --input is given.
+The default run compares rows/sec of the original parse (read_text +
+normalize_text + csv.reader per line) against the streaming parser.
+--stages times parse, clean, sort and write separately with peak RSS per stage.
+--modes runs Sort_people end to end in a fresh process per mode (time + peak RSS).
+--json appends the results as one JSON line; --baseline compares against the last
+line of a previous results file and exits 1 if a timing got slower than --tolerance.
+--scaling times the full parse + sort + merge + write with N worker processes.
+--bytes-per-row compares memory held by list-of-lists rows vs row_store.RowStore.
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from collation import DEFAULT_SORT, Collator
+from external_sort import DEFAULT_MEMORY_MB, merge_runs
+from gen_people import STYLES, write_people_csv
+from parallel_sort import sort_partitions
+from people_io import iter_lines, iter_people, iter_records, norm, normalize_text, write_people
+from row_store import RowStore
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+MODES = {
+    "default": [],
+    "external": ["--external"],
+    "workers": ["--workers", "0"],
+    "mmap": ["--mmap"],
+    "compact": ["--compact"],
+}
+
+
+def legacy_parse(path: str):
+    """The parse/clean half of the original Sort_people.main(), copied as it was."""
+    text = Path(path).read_text(encoding="utf-8", errors="replace")
+    text = normalize_text(text)
+
+    lines = [ln for ln in text.split("\n") if ln.strip()]
+
+    # Parse CSV line-by-line
+    rows = []
+    for ln in lines:
+        rows.append(next(csv.reader([ln])))
+
+    header = [norm(h).replace(" ", "_") for h in rows[0]]
+
+    # Find columns (supports Full Name / Full_Name etc.)
+    def col(*names):
+        for n in names:
+            n = n.replace(" ", "_")
+            if n in header:
+                return header.index(n)
+        return None
+
+    name_i = col("full_name", "name")
+    dob_i = col("dob", "date_of_birth")
+    ms_i = col("marital_status", "status", "marriage_status")
+    addr_i = col("address", "addres")
+
+    # If header not detected, fallback to positions
+    if name_i is None:
+        name_i, dob_i, ms_i, addr_i = 0, 1, 2, 3
+        data_rows = rows
+    else:
+        data_rows = rows[1:]
+
+    cleaned = []
+    for r in data_rows:
+        if len(r) < 4:
+            continue
+        name = r[name_i].strip()
+        dob = r[dob_i].strip() if dob_i is not None and dob_i < len(r) else ""
+        status = r[ms_i].strip() if ms_i is not None and ms_i < len(r) else ""
+        address = ",".join(r[addr_i:]).strip() if addr_i is not None else ",".join(r[3:]).strip()
+        cleaned.append([name, dob, status, address])
+    return cleaned
+
+
+def streaming_parse(path: str):
+    return list(iter_people(path))
+
+
+def bench(fn, path: str, repeat: int):
+    best = None
+    rows = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        rows = fn(path)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return rows, best
+
+
+def bench_scaling(path: str, worker_counts, tmp: str) -> None:
+    base = None
+    print(f"{'workers':>7}  {'seconds':>8}  {'rows/s':>12}  speedup")
+    for w in worker_counts:
+        run_dir = tempfile.mkdtemp(prefix=f"w{w}_", dir=tmp)
+        t0 = time.perf_counter()
+        key = Collator()
+        runs, rows, _, _ = sort_partitions(path, w, DEFAULT_MEMORY_MB * 1024 * 1024, run_dir, key)
+        write_people(os.path.join(run_dir, "out.csv"), merge_runs(runs, [], key=key, tmpdir=run_dir))
+        dt = time.perf_counter() - t0
+        base = dt if base is None else base
+        print(f"{w:>7}  {dt:>8.3f}  {rows / dt:>12,.0f}  {base / dt:.2f}x")
+
+
+def bench_bytes_per_row(path: str) -> None:
+    def held(build):
+        tracemalloc.start()
+        obj = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return obj, size
+
+    rows, list_bytes = held(lambda: list(iter_people(path)))
+    n = len(rows)
+    del rows
+
+    def build_store():
+        store = RowStore()
+        store.extend(iter_people(path))
+        return store
+
+    store, store_bytes = held(build_store)
+    print(f"rows: {n}")
+    print(f"list of lists : {list_bytes / n:8.1f} bytes/row  ({list_bytes / 2**20:,.1f} MB)")
+    print(f"RowStore      : {store_bytes / n:8.1f} bytes/row  ({store_bytes / 2**20:,.1f} MB)")
+    print(f"  of which payload (UTF-8 name+address): {len(store.buf) / n:.1f} bytes/row")
+
+
+def reset_peak_rss() -> None:
+    """Reset the kernel's peak-RSS counter (Linux only; elsewhere peaks are process-wide)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def bench_stages(path: str, tmp: str, sort_by: str) -> Dict[str, dict]:
+    results: Dict[str, dict] = {}
+
+    def stage(name, fn):
+        reset_peak_rss()
+        t0 = time.perf_counter()
+        out = fn()
+        results[name] = {"seconds": time.perf_counter() - t0, "peak_rss_mb": peak_rss_mb()}
+        return out
+
+    stage("parse", lambda: sum(1 for _ in iter_records(iter_lines(path))))
+    rows = stage("parse_clean", lambda: list(iter_people(path)))
+    # clean is measured as the extra cost of cleaning on top of the parse pass
+    results["clean"] = {
+        "seconds": max(0.0, results["parse_clean"]["seconds"] - results["parse"]["seconds"]),
+        "peak_rss_mb": results["parse_clean"]["peak_rss_mb"],
+    }
+    key = Collator(sort_by)
+    stage("sort", lambda: rows.sort(key=key))
+    stage("write", lambda: write_people(os.path.join(tmp, "stages_out.csv"), rows))
+
+    n = len(rows)
+    print(f"{'stage':<12} {'seconds':>8} {'rows/s':>12} {'peak RSS MB':>12}")
+    for name in ("parse", "clean", "sort", "write"):
+        r = results[name]
+        r["rows_per_sec"] = n / r["seconds"] if r["seconds"] else None
+        rate = f"{r['rows_per_sec']:,.0f}" if r["rows_per_sec"] else "-"
+        rss = f"{r['peak_rss_mb']:.1f}" if r["peak_rss_mb"] is not None else "-"
+        print(f"{name:<12} {r['seconds']:>8.3f} {rate:>12} {rss:>12}")
+    return results
+
+
+_MODE_CHILD = """
+import json, sys, time
+sys.path.insert(0, {here!r})
+import bench_people, Sort_people
+t0 = time.perf_counter()
+Sort_people.main({argv!r})
+print("BENCH " + json.dumps({{"seconds": time.perf_counter() - t0, "peak_rss_mb": bench_people.peak_rss_mb()}}))
+"""
+
+
+def bench_modes(path: str, tmp: str, modes, sort_by: str) -> Dict[str, dict]:
+    results = {}
+    print(f"{'mode':<10} {'seconds':>8} {'peak RSS MB':>12}")
+    for mode in modes:
+        argv = ["--input", path, "--output", os.path.join(tmp, f"out_{mode}.csv"),
+                "--sort-by", sort_by] + MODES[mode]
+        code = _MODE_CHILD.format(here=HERE, argv=argv)
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        r = json.loads(out.rsplit("BENCH ", 1)[1])
+        results[mode] = r
+        rss = f"{r['peak_rss_mb']:.1f}" if r["peak_rss_mb"] is not None else "-"
+        print(f"{mode:<10} {r['seconds']:>8.3f} {rss:>12}")
+    return results
+
+
+def compare_baseline(record: dict, baseline_path: str, tolerance: float) -> bool:
+    """True if no stage/mode got slower than baseline * (1 + tolerance)."""
+    try:
+        with open(baseline_path, encoding="utf-8") as f:
+            lines = [ln for ln in f if ln.strip()]
+    except OSError:
+        print("No baseline at", baseline_path)
+        return True
+    if not lines:
+        return True
+    base = json.loads(lines[-1])
+    if base.get("rows") != record["rows"] or base.get("style") != record["style"]:
+        print("Baseline was run with different --rows/--style; skipping comparison")
+        return True
+
+    ok = True
+    for section in ("stages", "modes"):
+        for name, r in record.get(section, {}).items():
+            old = base.get(section, {}).get(name)
+            if not old or not old.get("seconds"):
+                continue
+            ratio = r["seconds"] / old["seconds"]
+            if ratio > 1 + tolerance:
+                ok = False
+                print(f"REGRESSION {section}.{name}: {old['seconds']:.3f}s -> {r['seconds']:.3f}s ({ratio:.2f}x)")
+    if ok:
+        print("No regressions vs", baseline_path)
+    return ok
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="benchmarks for the people sorter")
+    p.add_argument("--rows", type=int, default=200_000)
+    p.add_argument("--style", choices=STYLES, default="lf", help="line breaks of the generated file")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--input", default=None, help="benchmark an existing file instead of a generated one")
+    p.add_argument("--sort-by", default=DEFAULT_SORT)
+    p.add_argument("--stages", action="store_true", help="time parse / clean / sort / write separately")
+    p.add_argument("--modes", default=None, metavar="default,mmap",
+                   help=f"time Sort_people end to end in these modes ({', '.join(MODES)})")
+    p.add_argument("--json", default=None, metavar="FILE", help="append results as one JSON line")
+    p.add_argument("--baseline", default=None, metavar="FILE",
+                   help="compare with the last result in FILE; exit 1 on regression")
+    p.add_argument("--tolerance", type=float, default=0.20, help="allowed slowdown vs baseline (default 0.20)")
+    p.add_argument("--scaling", default=None, metavar="1,2,4,8",
+                   help="time the full sort with these worker counts instead of the parse benchmark")
+    p.add_argument("--bytes-per-row", action="store_true",
+                   help="report memory per row for list rows vs the compact row store")
+    args = p.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="people_bench_") as tmp:
+        path = args.input
+        if path is None:
+            path = os.path.join(tmp, "people.csv")
+            write_people_csv(path, args.rows, args.style, args.seed)
+
+        if args.stages or args.modes:
+            modes = [m.strip() for m in args.modes.split(",")] if args.modes else []
+            unknown = [m for m in modes if m not in MODES]
+            if unknown:
+                p.error(f"unknown mode(s): {', '.join(unknown)}")
+            record = {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "input": args.input,
+                "rows": args.rows if args.input is None else None,
+                "style": args.style if args.input is None else None,
+                "seed": args.seed,
+                "file_bytes": os.path.getsize(path),
+                "sort_by": args.sort_by,
+            }
+            if args.stages:
+                record["stages"] = bench_stages(path, tmp, args.sort_by)
+            if modes:
+                record["modes"] = bench_modes(path, tmp, modes, args.sort_by)
+
+            ok = True
+            if args.baseline:
+                ok = compare_baseline(record, args.baseline, args.tolerance)
+            if args.json:
+                with open(args.json, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+                print("Results appended to", args.json)
+            if not ok:
+                sys.exit(1)
+            return
+
+        if args.scaling:
+            bench_scaling(path, [int(w) for w in args.scaling.split(",")], tmp)
+            return
+        if args.bytes_per_row:
+            bench_bytes_per_row(path)
+            return
+
+        old_rows, old_t = bench(legacy_parse, path, args.repeat)
+        new_rows, new_t = bench(streaming_parse, path, args.repeat)
+
+    if old_rows != new_rows:
+        print("WARNING: parsers disagree")
+    n = len(new_rows)
+    print(f"rows: {n}")
+    print(f"legacy    : {old_t:.3f}s  {n / old_t:,.0f} rows/s")
+    print(f"streaming : {new_t:.3f}s  {n / new_t:,.0f} rows/s  ({old_t / new_t:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
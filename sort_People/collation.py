@@ -0,0 +1,112 @@
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+DEFAULT_SORT = "name,address"
+
+COLUMNS = {
+    "name": 0, "full_name": 0,
+    "dob": 1, "date_of_birth": 1,
+    "status": 2, "marital_status": 2,
+    "address": 3,
+}
+
+# Distinct values whose keys are kept per column (statuses, DOBs, repeated cities...)
+DEFAULT_CACHE_SIZE = 1 << 16
+
+
+def collate(s: str) -> str:
+    """Case-, accent- and whitespace-insensitive form: "  Élodie  Roy " -> "elodie roy"."""
+    s = s or ""
+    if not s.isascii():
+        s = unicodedata.normalize("NFKD", s)
+        s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    return " ".join(s.casefold().split())
+
+
+class _Desc:
+    """Wraps a key so it sorts in reverse inside a tuple key."""
+    __slots__ = ("k",)
+
+    def __init__(self, k):
+        self.k = k
+
+    def __eq__(self, other):
+        return self.k == other.k
+
+    def __lt__(self, other):
+        return other.k < self.k
+
+    def __reduce__(self):
+        return (_Desc, (self.k,))
+
+
+@dataclass(frozen=True)
+class SortColumn:
+    index: int
+    descending: bool = False
+
+
+def parse_sort_spec(spec: str) -> List[SortColumn]:
+    """ "dob:desc,name" -> [SortColumn(1, True), SortColumn(0, False)] """
+    cols = []
+    for part in (spec or DEFAULT_SORT).split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        name, _, direction = part.partition(":")
+        if name not in COLUMNS:
+            raise ValueError(f"unknown sort column: {name!r} (use {', '.join(sorted(set(COLUMNS)))})")
+        if direction not in ("", "asc", "desc"):
+            raise ValueError(f"sort direction must be asc or desc, got {direction!r}")
+        cols.append(SortColumn(COLUMNS[name], direction == "desc"))
+    if not cols:
+        raise ValueError("empty sort spec")
+    return cols
+
+
+def dedup_sort_spec(spec: str) -> str:
+    """
+    `spec` plus any of name, dob, address it lacks, as tie-breakers.
+
+    Rows with the same dedup key (normalized name, DOB, address) then sort next
+    to each other, so duplicates can be dropped while merging sorted runs.
+    """
+    have = {c.index for c in parse_sort_spec(spec)}
+    extra = [n for n in ("name", "dob", "address") if COLUMNS[n] not in have]
+    return ",".join([spec or DEFAULT_SORT] + extra)
+
+
+class Collator:
+    """
+    Builds the sort key for a row once, from per-column collation keys.
+
+    Keys of repeated values are cached (up to `cache_size` per column), so
+    millions of rows with the same status or city share one key object.
+    """
+
+    def __init__(self, spec: str = DEFAULT_SORT, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.spec = spec
+        self.columns = parse_sort_spec(spec)
+        self.cache_size = cache_size
+        self._caches: List[Dict[str, object]] = [{} for _ in self.columns]
+
+    def __reduce__(self):
+        # workers get a fresh collator (with empty caches)
+        return (Collator, (self.spec, self.cache_size))
+
+    def column_key(self, i: int, value: str):
+        cache = self._caches[i]
+        k = cache.get(value)
+        if k is not None:
+            return k
+        k = collate(value)
+        if self.columns[i].descending:
+            k = _Desc(k)
+        if len(cache) < self.cache_size:
+            cache[value] = k
+        return k
+
+    def __call__(self, row: List[str]) -> Tuple:
+        column_key = self.column_key
+        return tuple(column_key(i, row[c.index]) for i, c in enumerate(self.columns))
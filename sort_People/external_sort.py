@@ -0,0 +1,92 @@
+import heapq
+import os
+import pickle
+from typing import Callable, Iterable, Iterator, List
+
+DEFAULT_MEMORY_MB = 256
+
+# Rough per-row cost of a 4-field list of str plus its (name, address) sort key.
+# Only used to decide when to spill, so it does not need to be exact.
+ROW_OVERHEAD = 360
+
+# Rows per pickle block inside a run file
+BLOCK_ROWS = 4096
+
+# Max runs merged at once; more than this are merged in several passes
+MAX_FAN_IN = 64
+
+
+def estimate_row_bytes(row: List[str]) -> int:
+    return ROW_OVERHEAD + 2 * sum(len(f) for f in row)
+
+
+def write_run(rows: Iterable[List[str]], tmpdir: str, n: int) -> str:
+    path = os.path.join(tmpdir, f"run_{n:05d}.pkl")
+    with open(path, "wb") as f:
+        block = []
+        for row in rows:
+            block.append(row)
+            if len(block) >= BLOCK_ROWS:
+                pickle.dump(block, f, protocol=pickle.HIGHEST_PROTOCOL)
+                block = []
+        if block:
+            pickle.dump(block, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def read_run(path: str) -> Iterator[List[str]]:
+    with open(path, "rb") as f:
+        while True:
+            try:
+                block = pickle.load(f)
+            except EOFError:
+                return
+            yield from block
+
+
+def spill_sorted_runs(rows: Iterable[List[str]], key: Callable, memory_bytes: int, tmpdir: str):
+    """
+    Consume `rows`, sorting chunks of at most ~memory_bytes and spilling them to `tmpdir`.
+
+    Returns (run_paths, tail) where `tail` is the last sorted chunk, kept in memory.
+    Runs are in input order, so a stable merge gives the same result as one big sort.
+    """
+    runs: List[str] = []
+    chunk: List[List[str]] = []
+    used = 0
+    for row in rows:
+        chunk.append(row)
+        used += estimate_row_bytes(row)
+        if used >= memory_bytes:
+            chunk.sort(key=key)
+            runs.append(write_run(chunk, tmpdir, len(runs)))
+            chunk = []
+            used = 0
+    chunk.sort(key=key)
+    return runs, chunk
+
+
+def merge_runs(runs: List[str], tail: List[List[str]], key: Callable, tmpdir: str,
+               max_fan_in: int = MAX_FAN_IN) -> Iterator[List[str]]:
+    """k-way merge of sorted runs (+ in-memory tail). heapq.merge breaks ties by input order."""
+    n = len(runs)
+    while len(runs) > max_fan_in:
+        # merge neighbouring runs so ties keep their original order
+        merged = []
+        for i in range(0, len(runs), max_fan_in):
+            group = runs[i:i + max_fan_in]
+            if len(group) == 1:
+                merged.append(group[0])
+                continue
+            rows = heapq.merge(*[read_run(p) for p in group], key=key)
+            path = write_run(rows, tmpdir, n)
+            n += 1
+            for p in group:
+                os.remove(p)
+            merged.append(path)
+        runs = merged
+
+    sources = [read_run(p) for p in runs]
+    if tail:
+        sources.append(iter(tail))
+    return heapq.merge(*sources, key=key)
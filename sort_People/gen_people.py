@@ -0,0 +1,110 @@
+"""
+Seeded generator of synthetic people.csv files for benchmarks.
+
+    python gen_people.py --rows 1000000 --style crlf --out people_1m.csv
+
+Rows look like real roster exports: unicode names with case/whitespace noise,
+missing DOBs and statuses, addresses with embedded commas (mostly quoted, some
+left unquoted the way hand-made files do). Styles: lf, crlf, literal (one line
+with literal "\\n" separators) and cr. Rows are streamed, so 50M rows is fine.
+"""
+import argparse
+import csv
+import io
+import random
+
+FIRST = [
+    "Aarav", "Jane", "Carlos", "Mei", "Fatima", "Rahul", "Elena", "David", "Sarah", "Liam",
+    "Zoë", "Émile", "José", "Søren", "Łukasz", "Ana", "Noah", "Olivia", "Yuki", "Ольга",
+    "Дмитрий", "محمد", "李", "Chloé", "Björn", "Ngozi", "Priya", "Siobhán", "Ömer", "Nguyễn",
+]
+LAST = [
+    "Patel", "Smith", "Gomez", "Lin", "Zahra", "Sharma", "Rodriguez", "Kim", "Johnson",
+    "Müller", "García", "O'Brien", "Nowak", "Иванова", "王", "Dubois", "Okafor", "Tanaka",
+    "Van der Berg", "Çelik", "Núñez", "Andersson", "Silva", "Haddad", "Rossi",
+]
+STATUS = ["Single", "Married", "Divorced", "Widowed", "single", "MARRIED"]
+STREETS = ["MG Road", "Oak St", "Pine Ave", "Cedar Ln", "Elm St", "Maple Dr", "Birch Ct", "Rue de Rivoli",
+           "Hauptstraße", "Calle Mayor", "Andheri West"]
+CITIES = [
+    ("Bangalore", "KA", "India"), ("New York", "NY", "USA"), ("Miami", "FL", "USA"),
+    ("Chicago", "IL", "USA"), ("Mumbai", "MH", "India"), ("Paris", "IDF", "France"),
+    ("Berlin", "BE", "Germany"), ("Madrid", "MD", "Spain"), ("São Paulo", "SP", "Brazil"),
+]
+STYLES = ("lf", "crlf", "cr", "literal")
+HEADER = ["Full_Name", "DOB", "Marital_Status", "Address"]
+
+
+def _noise(rnd: random.Random, s: str) -> str:
+    r = rnd.random()
+    if r < 0.05:
+        return s.upper()
+    if r < 0.10:
+        return s.lower()
+    if r < 0.15:
+        return f"  {s} "
+    return s
+
+
+def iter_fields(rows: int, seed: int = 42):
+    """Yield the fields of each row; an unquoted-comma address comes back already split."""
+    rnd = random.Random(seed)
+    for _ in range(rows):
+        name = _noise(rnd, f"{rnd.choice(FIRST)} {rnd.choice(LAST)}")
+        dob = "" if rnd.random() < 0.05 else \
+            f"{rnd.randint(1930, 2008)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}"
+        status = "" if rnd.random() < 0.03 else rnd.choice(STATUS)
+        city, state, country = rnd.choice(CITIES)
+        street = f"{rnd.randint(1, 9999)} {rnd.choice(STREETS)}"
+        r = rnd.random()
+        if r < 0.50:
+            yield [name, dob, status, f"{street} {city} {state} {rnd.randint(10000, 99999)} {country}"]
+        elif r < 0.90:
+            # quoted by the csv writer
+            yield [name, dob, status, f"{street}, {city}, {state} {rnd.randint(10000, 99999)}, {country}"]
+        else:
+            # hand-made file: commas in the address but no quotes
+            yield [name, dob, status, street, city, f"{state} {rnd.randint(10000, 99999)}", country]
+
+
+def write_people_csv(path: str, rows: int, style: str = "lf", seed: int = 42, header: bool = True) -> None:
+    if style not in STYLES:
+        raise ValueError(f"style must be one of {STYLES}")
+    sep = {"lf": "\n", "crlf": "\r\n", "cr": "\r", "literal": "\\n"}[style]
+    line = io.StringIO()
+    w = csv.writer(line, lineterminator="")
+
+    def fmt(fields):
+        line.seek(0)
+        line.truncate()
+        w.writerow(fields)
+        return line.getvalue()
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        first = True
+        if header:
+            f.write(fmt(HEADER))
+            first = False
+        for fields in iter_fields(rows, seed):
+            if not first:
+                f.write(sep)
+            f.write(fmt(fields))
+            first = False
+        if style != "literal":
+            f.write(sep)
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="generate a synthetic people.csv")
+    p.add_argument("--rows", type=int, default=10_000)
+    p.add_argument("--style", choices=STYLES, default="lf")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--no-header", action="store_true")
+    p.add_argument("--out", default="people_synthetic.csv")
+    args = p.parse_args(argv)
+    write_people_csv(args.out, args.rows, args.style, args.seed, header=not args.no_header)
+    print("Saved:", args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import csv
+import hashlib
+import heapq
+import json
+import os
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from external_sort import merge_runs, spill_sorted_runs
+from parallel_sort import first_line_end
+from people_io import (
+    CHUNK_SIZE,
+    clean_records,
+    find_columns,
+    iter_lines,
+    iter_records,
+    uses_literal_newlines,
+    write_people,
+)
+
+STATE_SUFFIX = ".state.json"
+STATE_VERSION = 1
+
+
+def state_path(output: str) -> str:
+    return output + STATE_SUFFIX
+
+
+def hash_range(path: str, start: int, end: int, h=None):
+    """sha256 of bytes [start, end) of `path`, continuing `h` if given."""
+    h = h or hashlib.sha256()
+    left = end - start
+    with open(path, "rb") as f:
+        f.seek(start)
+        while left > 0:
+            chunk = f.read(min(CHUNK_SIZE, left))
+            if not chunk:
+                break
+            h.update(chunk)
+            left -= len(chunk)
+    return h
+
+
+def _last_bytes(path: str, size: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(max(0, size - 2))
+        return f.read(2)
+
+
+def describe_input(path: str, output: str, spec: str, size: int, dedup: Optional[str] = None) -> dict:
+    """State recorded after a full sort of the first `size` bytes of `path` into `output`."""
+    literal = uses_literal_newlines(path)
+    first, _ = first_line_end(path, literal)
+    cols, has_header = find_columns(next(iter_records([first]))) if first is not None else ((0, 1, 2, 3), False)
+    out = os.stat(output)
+    return {
+        "version": STATE_VERSION,
+        "input_size": size,
+        "input_sha256": hash_range(path, 0, size).hexdigest(),
+        "input_tail": _last_bytes(path, size).hex(),
+        "literal": literal,
+        "cols": list(cols),
+        "has_header": has_header,
+        "sort_by": spec,
+        "dedup": dedup,
+        "output_size": out.st_size,
+        "output_mtime_ns": out.st_mtime_ns,
+    }
+
+
+def load_state(output: str) -> Optional[dict]:
+    try:
+        with open(state_path(output), encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if state.get("version") == STATE_VERSION else None
+
+
+def save_state(output: str, state: dict) -> None:
+    tmp = state_path(output) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, state_path(output))
+
+
+def _ends_line(last: bytes, literal: bool) -> bool:
+    if literal:
+        return last.endswith(b"\\n")
+    return last.endswith(b"\n") or last.endswith(b"\r")
+
+
+def check_append(path: str, output: str, spec: str, state: Optional[dict], dedup: Optional[str] = None):
+    """
+    Check that `path` is the recorded input plus appended lines.
+
+    Returns (None, prefix_hasher) if so, else (why a full rebuild is needed, None).
+    """
+    if state is None:
+        return "no saved state", None
+    if state["sort_by"] != spec:
+        return "sort order changed", None
+    if state.get("dedup") != dedup:
+        return "dedup policy changed", None
+    try:
+        out = os.stat(output)
+    except OSError:
+        return "output missing", None
+    if (out.st_size, out.st_mtime_ns) != (state["output_size"], state["output_mtime_ns"]):
+        return "output was modified", None
+
+    size = os.path.getsize(path)
+    old = state["input_size"]
+    if size < old:
+        return "input shrank", None
+    h = hash_range(path, 0, old)
+    if h.hexdigest() != state["input_sha256"]:
+        return "input prefix changed", None
+    if size == old:
+        return None, h
+
+    literal = state["literal"]
+    if uses_literal_newlines(path) != literal:
+        return "line break style changed", None
+    if not _ends_line(bytes.fromhex(state["input_tail"]), literal):
+        # the old last line had no line break: only OK if the new data starts with one
+        with open(path, "rb") as f:
+            f.seek(old)
+            head = f.read(2)
+        if not (head.startswith(b"\\n") if literal else head[:1] in (b"\n", b"\r")):
+            return "last line was extended", None
+    return None, h
+
+
+def read_sorted_output(output: str) -> Iterator[List[str]]:
+    with open(output, encoding="utf-8", newline="") as f:
+        r = csv.reader(f)
+        next(r, None)  # header
+        yield from r
+
+
+def append_tail(path: str, output: str, state: dict, prefix_hasher, key, memory_bytes: int,
+                tmpdir: str, dedup: Optional[Callable[[Iterable[List[str]]], Iterator[List[str]]]] = None
+                ) -> Tuple[int, Optional[list]]:
+    """
+    Parse only the bytes appended since `state`, sort them and merge them into `output`.
+
+    `prefix_hasher` is the one returned by check_append (already fed the old prefix).
+    `dedup`, if given, filters the merged stream (see dedup.dedup_sorted).
+
+    Old rows come first on ties, so the result matches a full rebuild.
+    Returns (new_rows, first_new_row).
+    """
+    stats = {"lines": 0}
+    seen = {"rows": 0, "first": None}
+
+    def counted(rows):
+        for row in rows:
+            if seen["first"] is None:
+                seen["first"] = row
+            seen["rows"] += 1
+            yield row
+
+    size = os.path.getsize(path)
+    records = iter_records(iter_lines(path, start=state["input_size"], end=size, literal=state["literal"]))
+    rows = counted(clean_records(records, tuple(state["cols"]), stats))
+    runs, tail = spill_sorted_runs(rows, key, memory_bytes, tmpdir)
+
+    if seen["rows"]:
+        tmp_out = output + ".tmp"
+        merged = heapq.merge(read_sorted_output(output), merge_runs(runs, tail, key=key, tmpdir=tmpdir), key=key)
+        if dedup is not None:
+            merged = dedup(merged)
+        write_people(tmp_out, merged)
+        os.replace(tmp_out, output)
+
+    old = state["input_size"]
+    state = dict(state)
+    out = os.stat(output)
+    state.update(
+        input_size=size,
+        input_sha256=hash_range(path, old, size, prefix_hasher).hexdigest(),
+        input_tail=_last_bytes(path, size).hex(),
+        output_size=out.st_size,
+        output_mtime_ns=out.st_mtime_ns,
+    )
+    save_state(output, state)
+    return seen["rows"], seen["first"]
@@ -0,0 +1,197 @@
+import mmap
+import os
+import re
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from people_io import find_columns, iter_records
+from row_store import RowStore
+
+# Give already-scanned pages back (they stay in the page cache) every this many bytes
+RELEASE_EVERY = 8 << 20
+# Rows whose sort keys exist at once while sorting (see RowStore.sort_order)
+SORT_CHUNK_ROWS = 1 << 15
+# Collation keys cached per column; addresses rarely repeat, so a big cache is mostly dead weight
+KEY_CACHE_SIZE = 4096
+
+_LINE_BREAK = re.compile(rb"\r\n|\r|\n")
+
+# a row is kept as one packed (offset << 24 | length) of its line
+_MAX_LEN = (1 << 24) - 1
+# ref of a row whose line is too long to pack (kept parsed in MappedRowStore.extra)
+_EXTRA = _MAX_LEN
+
+_PREAD = getattr(os, "pread", None)
+
+
+class MappedPeople:
+    """
+    Memory-mapped people.csv.
+
+    Lines are found by scanning the raw bytes. load() keeps each row as the
+    byte range of its line and parses the line again whenever the row is
+    needed (sort key, output), so the process holds neither a decoded copy
+    of the file nor a Python object per row.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, "rb")
+        size = os.fstat(self._f.fileno()).st_size
+        self.mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.lines = 0
+        # (name_i, dob_i, ms_i, addr_i), from the first line
+        self._cols = None
+
+    def close(self) -> None:
+        if isinstance(self.mm, mmap.mmap):
+            self.mm.close()
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def release(self) -> None:
+        """Drop mapped pages from this process's RSS (Linux); no-op elsewhere."""
+        if isinstance(self.mm, mmap.mmap) and hasattr(mmap, "MADV_DONTNEED"):
+            self.mm.madvise(mmap.MADV_DONTNEED)
+
+    def _contains(self, needle: bytes) -> bool:
+        """needle in the map, searched a window at a time so a miss does not make the whole file resident."""
+        mm = self.mm
+        size = len(mm)
+        for a in range(0, size, RELEASE_EVERY):
+            found = mm.find(needle, a, min(size, a + RELEASE_EVERY + len(needle) - 1)) >= 0
+            self.release()
+            if found:
+                return True
+        return False
+
+    def _literal(self) -> bool:
+        return not self._contains(b"\n") and not self._contains(b"\r") and self._contains(b"\\n")
+
+    def iter_line_spans(self) -> Iterator[Tuple[int, int]]:
+        """(start, end) of every line, without the line break (blank lines included)."""
+        mm = self.mm
+        size = len(mm)
+        pos = 0
+        if self._literal():
+            while pos < size:
+                i = mm.find(b"\\n", pos)
+                end = size if i < 0 else i
+                yield pos, end
+                pos = size if i < 0 else i + 2
+        elif not self._contains(b"\r"):
+            while pos < size:
+                i = mm.find(b"\n", pos)
+                end = size if i < 0 else i
+                yield pos, end
+                pos = size if i < 0 else i + 1
+        else:
+            for m in _LINE_BREAK.finditer(mm):
+                yield pos, m.start()
+                pos = m.end()
+            if pos < size:
+                yield pos, size
+
+    def read(self, start: int, length: int) -> bytes:
+        """
+        Bytes at a random offset. pread instead of the map where there is one:
+        pages touched in sort order, plus the kernel's fault-around, would
+        soon make the whole file resident again.
+        """
+        if _PREAD is not None:
+            return _PREAD(self._f.fileno(), length, start)
+        return self.mm[start:start + length]
+
+    def parse(self, b: bytes) -> Optional[List[str]]:
+        """Cleaned [name, dob, status, address] of one data line (None if it has under 4 fields)."""
+        name_i, dob_i, ms_i, addr_i = self._cols
+        text = b.decode("utf-8", errors="replace")
+        # quoted fields: let the csv reader handle them
+        r = next(iter_records([text])) if b'"' in b else text.split(",")
+        size = len(r)
+        if size < 4:
+            return None
+        return [
+            r[name_i].strip(),
+            r[dob_i].strip() if dob_i is not None and dob_i < size else "",
+            r[ms_i].strip() if ms_i is not None and ms_i < size else "",
+            (r[addr_i] if size == addr_i + 1 else ",".join(r[addr_i:])).strip(),
+        ]
+
+    def iter_rows(self) -> Iterator[Tuple[int, int, List[str]]]:
+        """
+        (start, end, cleaned row) of every data line; the rows are the same,
+        in the same order, as people_io.iter_people. `self.lines` counts
+        non-blank lines.
+        """
+        mm = self.mm
+        self.lines = 0
+        released = 0
+        for a, e in self.iter_line_spans():
+            if a - released >= RELEASE_EVERY:
+                self.release()
+                released = a
+            b = mm[a:e]
+            if not b.strip():
+                continue
+            if not b.isascii() and not b.decode("utf-8", errors="replace").strip():
+                continue
+            self.lines += 1
+
+            if self._cols is None:
+                cols, has_header = find_columns(next(iter_records([b.decode("utf-8", errors="replace")])))
+                self._cols = cols if cols[3] is not None else cols[:3] + (3,)
+                if has_header:
+                    continue
+
+            row = self.parse(b)
+            if row is not None:
+                yield a, e, row
+        self.release()
+
+    def load(self) -> "MappedRowStore":
+        store = MappedRowStore(self)
+        for a, e, row in self.iter_rows():
+            store.append_line(a, e, row)
+        return store
+
+
+class MappedRowStore(RowStore):
+    """
+    RowStore over a MappedPeople with one 8-byte line ref per row.
+
+    Rows are re-read (MappedPeople.read) and re-parsed on access, trading
+    CPU for memory: the store is 8 bytes per row whatever the row holds.
+    """
+
+    def __init__(self, people: MappedPeople):
+        super().__init__()
+        self.people = people
+        self.refs = array("Q")
+        # row -> cleaned row, for lines too long to pack
+        self.extra: Dict[int, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.refs)
+
+    def append_line(self, start: int, end: int, row: List[str]) -> None:
+        if end - start >= _MAX_LEN:
+            self.extra[len(self.refs)] = row
+            self.refs.append(_EXTRA)
+        else:
+            self.refs.append(start << 24 | (end - start))
+
+    def row(self, i: int) -> List[str]:
+        ref = self.refs[i]
+        if ref == _EXTRA:
+            return self.extra[i]
+        return self.people.parse(self.people.read(ref >> 24, ref & _MAX_LEN))
+
+    def nbytes(self) -> int:
+        extra = sum(sum(len(f) + 49 for f in row) for row in self.extra.values())
+        return self.refs.itemsize * len(self.refs) + extra
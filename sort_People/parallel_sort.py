@@ -0,0 +1,147 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from external_sort import spill_sorted_runs, write_run
+from people_io import (
+    clean_records,
+    find_columns,
+    iter_lines,
+    iter_records,
+    uses_literal_newlines,
+)
+
+# Bytes read at a time while looking for a line boundary
+SCAN_BLOCK = 1 << 16
+
+
+def next_boundary(f, pos: int, size: int, literal: bool) -> int:
+    """
+    First offset >= pos that starts a new line.
+
+    Records never span lines (a quote left open is closed at the end of its
+    line), so any line boundary is a safe place to split. A "\\r\\n" pair is never
+    cut in half, and literal "\\n" files are split right after the marker.
+    """
+    f.seek(pos)
+    buf_start = pos
+    buf = f.read(SCAN_BLOCK)
+    while buf:
+        if literal:
+            i = buf.find(b"\\n")
+            if i >= 0:
+                return buf_start + i + 2
+            keep = 1
+        else:
+            hits = [i for i in (buf.find(b"\n"), buf.find(b"\r")) if i >= 0]
+            if hits:
+                i = min(hits)
+                if buf[i:i + 1] == b"\r":
+                    nxt = buf[i + 1:i + 2] if i + 1 < len(buf) else f.read(1)
+                    return buf_start + i + (2 if nxt == b"\n" else 1)
+                return buf_start + i + 1
+            keep = 0
+        more = f.read(SCAN_BLOCK)
+        if not more:
+            break
+        buf_start += len(buf) - keep
+        buf = buf[len(buf) - keep:] + more
+    return size
+
+
+def first_line_end(path: str, literal: bool) -> Tuple[Optional[str], int]:
+    """Return (first non-blank line, offset just after it); (None, size) for an empty file."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        start = 0
+        while start < size:
+            end = next_boundary(f, start, size, literal)
+            f.seek(start)
+            raw = f.read(end - start)
+            ln = raw.decode("utf-8", errors="replace")
+            for marker in (("\\n",) if literal else ("\r\n", "\n", "\r")):
+                if ln.endswith(marker):
+                    ln = ln[:-len(marker)]
+                    break
+            if ln.strip():
+                return ln, end
+            start = end
+    return None, size
+
+
+def split_offsets(path: str, start: int, parts: int, literal: bool) -> List[Tuple[int, int]]:
+    """Cut bytes [start, EOF) into about `parts` ranges that begin and end on line boundaries."""
+    size = os.path.getsize(path)
+    span = size - start
+    cuts = [start]
+    with open(path, "rb") as f:
+        for i in range(1, parts):
+            b = next_boundary(f, start + span * i // parts, size, literal)
+            if b > cuts[-1]:
+                cuts.append(b)
+    if size > cuts[-1]:
+        cuts.append(size)
+    return [(a, b) for a, b in zip(cuts, cuts[1:]) if b > a]
+
+
+def sort_partition(job):
+    """Worker: parse, clean and sort one byte range; spill it as sorted runs in its own dir."""
+    path, start, end, literal, cols, key, tmpdir, memory_bytes = job
+    stats = {"lines": 0}
+    seen = {"rows": 0, "first": None}
+
+    def counted(rows):
+        for row in rows:
+            if seen["first"] is None:
+                seen["first"] = row
+            seen["rows"] += 1
+            yield row
+
+    os.makedirs(tmpdir, exist_ok=True)
+    records = iter_records(iter_lines(path, start=start, end=end, literal=literal))
+    runs, tail = spill_sorted_runs(counted(clean_records(records, cols, stats)), key, memory_bytes, tmpdir)
+    if tail:
+        runs.append(write_run(tail, tmpdir, len(runs)))
+    return runs, seen["rows"], seen["first"], stats["lines"]
+
+
+def sort_partitions(path: str, workers: int, memory_bytes: int, tmpdir: str, key):
+    """
+    Parse and sort `path` on `workers` processes, ordered by `key` (a collation.Collator).
+
+    Returns (run_paths, rows, first_row, lines); runs are in input order, so
+    merging them with external_sort.merge_runs matches the single-core output.
+    """
+    literal = uses_literal_newlines(path)
+    first, data_start = first_line_end(path, literal)
+    if first is None:
+        return [], 0, None, 0
+
+    cols, has_header = find_columns(next(iter_records([first])))
+    if not has_header:
+        data_start = 0
+
+    ranges = split_offsets(path, data_start, workers, literal)
+    per_worker = max(1, memory_bytes // max(1, len(ranges)))
+    jobs = [
+        (path, a, b, literal, cols, key, os.path.join(tmpdir, f"part_{i:04d}"), per_worker)
+        for i, (a, b) in enumerate(ranges)
+    ]
+
+    runs: List[str] = []
+    rows = 0
+    first_row = None
+    lines = 1 if has_header else 0
+    if len(jobs) <= 1:
+        results = map(sort_partition, jobs)
+    else:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(jobs)))
+        with pool:
+            results = list(pool.map(sort_partition, jobs))
+    for part_runs, part_rows, part_first, part_lines in results:
+        runs.extend(part_runs)
+        rows += part_rows
+        lines += part_lines
+        if first_row is None:
+            first_row = part_first
+    return runs, rows, first_row, lines
@@ -0,0 +1,196 @@
+"""
+Sparse prefix index for people_sorted.csv.
+
+Every N rows the index records the collated (name, address) key of the row
+and its byte offset in the sorted CSV. Lookups binary-search the index and
+read only the block(s) of the CSV that can hold matches.
+
+    python people_index.py build --csv people_sorted.csv --every 1000
+    python people_index.py lookup "jane sm"
+    python people_index.py lookup "jane smith" --address "456 oak" --exact-name
+"""
+import argparse
+import bisect
+import csv
+import json
+import os
+import sys
+import time
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from collation import DEFAULT_SORT, SortColumn, collate, parse_sort_spec
+from people_io import OUTPUT_HEADER
+
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 1
+DEFAULT_EVERY = 1000
+
+
+def index_path(csv_path: str) -> str:
+    return csv_path + INDEX_SUFFIX
+
+
+def check_sort_spec(spec: str) -> None:
+    cols = parse_sort_spec(spec)
+    if cols[0].index != 0 or cols[0].descending:
+        raise ValueError("the index needs output sorted by name ascending first")
+
+
+def _save(csv_path: str, entries: List[Tuple[int, str, str]], every: int, spec: str, rows: int) -> None:
+    st = os.stat(csv_path)
+    meta = {
+        "version": INDEX_VERSION,
+        "every": every,
+        "sort_by": spec,
+        "rows": rows,
+        "csv_size": st.st_size,
+        "csv_mtime_ns": st.st_mtime_ns,
+    }
+    tmp = index_path(csv_path) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(json.dumps(meta) + "\n")
+        for e in entries:
+            f.write(json.dumps(e, ensure_ascii=False) + "\n")
+    os.replace(tmp, index_path(csv_path))
+
+
+def write_people_indexed(path: str, rows: Iterable[List[str]], every: int = DEFAULT_EVERY,
+                         spec: str = DEFAULT_SORT) -> None:
+    """Like people_io.write_people, also writing the sparse index next to `path`."""
+    check_sort_spec(spec)
+    entries = []
+    n = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(OUTPUT_HEADER)
+        for row in rows:
+            if n % every == 0:
+                entries.append((f.tell(), collate(row[0]), collate(row[3])))
+            w.writerow(row)
+            n += 1
+    _save(path, entries, every, spec, n)
+
+
+def build_index(csv_path: str, every: int = DEFAULT_EVERY, spec: str = DEFAULT_SORT) -> int:
+    """Index an existing sorted CSV (one streaming pass). Returns the number of rows."""
+    check_sort_spec(spec)
+    entries = []
+    n = 0
+    for offset, row in _iter_rows_at(csv_path, None):
+        if n % every == 0:
+            entries.append((offset, collate(row[0]), collate(row[3])))
+        n += 1
+    _save(csv_path, entries, every, spec, n)
+    return n
+
+
+def _iter_rows_at(csv_path: str, offset: Optional[int]) -> Iterator[Tuple[int, List[str]]]:
+    """(offset, row) for rows of the sorted CSV from `offset` (None = first data row)."""
+    with open(csv_path, "rb") as f:
+        if offset is None:
+            f.readline()  # header
+        else:
+            f.seek(offset)
+        pos = f.tell()
+        for raw in f:
+            # our own output: one record per line, so per-line parsing is exact
+            ln = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+            row = next(csv.reader([ln])) if '"' in ln else ln.split(",")
+            if len(row) >= 4:
+                yield pos, row
+            pos += len(raw)
+
+
+class PeopleIndex:
+    def __init__(self, csv_path: str):
+        self.csv_path = csv_path
+        with open(index_path(csv_path), encoding="utf-8") as f:
+            self.meta = json.loads(f.readline())
+            entries = [json.loads(ln) for ln in f if ln.strip()]
+        if self.meta.get("version") != INDEX_VERSION:
+            raise ValueError("unsupported index version; rebuild it")
+        self.offsets = [e[0] for e in entries]
+        self.keys = [(e[1], e[2]) for e in entries]
+        cols = parse_sort_spec(self.meta["sort_by"])
+        # rows with the same name are also ordered by address
+        self.by_address = len(cols) > 1 and cols[1] == SortColumn(3, False)
+
+    def is_stale(self) -> bool:
+        st = os.stat(self.csv_path)
+        return (st.st_size, st.st_mtime_ns) != (self.meta["csv_size"], self.meta["csv_mtime_ns"])
+
+    def lookup(self, name: str, address: Optional[str] = None, exact_name: bool = False,
+               limit: Optional[int] = None) -> List[List[str]]:
+        """
+        Rows whose collated name starts with `name` (or equals it with exact_name),
+        and whose address starts with `address` if given.
+        """
+        qn = collate(name)
+        qa = collate(address) if address else ""
+        if not self.keys:
+            return []
+        # the block before the first entry >= start may still hold matches
+        start_key = (qn, qa if exact_name and self.by_address else "")
+        i = max(0, bisect.bisect_left(self.keys, start_key) - 1)
+
+        out = []
+        for _, row in _iter_rows_at(self.csv_path, self.offsets[i]):
+            n = collate(row[0])
+            if exact_name:
+                if n != qn:
+                    if n > qn:
+                        break
+                    continue
+            elif not n.startswith(qn):
+                if n > qn:
+                    break
+                continue
+            if qa:
+                a = collate(row[3])
+                if not a.startswith(qa):
+                    if exact_name and self.by_address and a > qa:
+                        break
+                    continue
+            out.append(row)
+            if limit is not None and len(out) >= limit:
+                break
+        return out
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="sparse name/address index for people_sorted.csv")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    b = sub.add_parser("build", help="index an existing sorted CSV")
+    b.add_argument("--csv", default="people_sorted.csv")
+    b.add_argument("--every", type=int, default=DEFAULT_EVERY, help="rows per index entry")
+    b.add_argument("--sort-by", default=DEFAULT_SORT, help="order the CSV was sorted with")
+
+    q = sub.add_parser("lookup", help="find rows by name prefix (and address prefix)")
+    q.add_argument("name")
+    q.add_argument("--address", default=None)
+    q.add_argument("--exact-name", action="store_true")
+    q.add_argument("--limit", type=int, default=None)
+    q.add_argument("--csv", default="people_sorted.csv")
+    args = p.parse_args(argv)
+
+    if args.cmd == "build":
+        t0 = time.perf_counter()
+        n = build_index(args.csv, max(1, args.every), args.sort_by)
+        print(f"Indexed {n} rows in {time.perf_counter() - t0:.2f}s:", index_path(args.csv))
+        return
+
+    idx = PeopleIndex(args.csv)
+    if idx.is_stale():
+        print("Index is stale (CSV changed); run: python people_index.py build", file=sys.stderr)
+    t0 = time.perf_counter()
+    rows = idx.lookup(args.name, args.address, args.exact_name, args.limit)
+    dt = time.perf_counter() - t0
+    w = csv.writer(sys.stdout)
+    w.writerow(OUTPUT_HEADER)
+    w.writerows(rows)
+    print(f"{len(rows)} match(es) in {dt * 1000:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import csv
+import io
+import os
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+OUTPUT_HEADER = ["Full Name", "DOB", "Marital Status", "Address"]
+
+# Read size used when scanning / streaming the input file
+CHUNK_SIZE = 1 << 20
+
+
+def norm(s: str) -> str:
+    return (s or "").strip().lower()
+
+
+def normalize_text(text: str) -> str:
+    # If file contains literal "\n" sequences, convert them to real new lines
+    if "\\n" in text and "\n" not in text:
+        text = text.replace("\\n", "\n")
+    # Normalize line endings
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def uses_literal_newlines(path: str, chunk_size: int = CHUNK_SIZE) -> bool:
+    """True if the file has no real line breaks but does contain literal "\\n"."""
+    found = False
+    prev = b""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return found
+            if b"\n" in chunk or b"\r" in chunk:
+                return False
+            if not found and b"\\n" in prev + chunk:
+                found = True
+            prev = chunk[-1:]
+
+
+class _RangeReader(io.RawIOBase):
+    """Raw reader that stops at byte offset `end` of an already-positioned file."""
+
+    def __init__(self, f, end: int):
+        self._f = f
+        self._left = end - f.tell()
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if self._left <= 0:
+            return 0
+        n = self._f.readinto(memoryview(b)[:min(len(b), self._left)])
+        self._left -= n
+        return n
+
+
+def iter_text_lines(f, literal: bool, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Non-blank lines of an open text file (universal newlines mode)."""
+    if not literal:
+        for ln in f:
+            if ln.endswith("\n"):
+                ln = ln[:-1]
+            if ln.strip():
+                yield ln
+        return
+
+    # No real line breaks in the file: split on the literal "\n" marker.
+    # A trailing backslash is held back in case the "n" is in the next chunk.
+    pending = ""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        pending += chunk
+        hold = ""
+        if pending.endswith("\\"):
+            pending, hold = pending[:-1], "\\"
+        parts = pending.replace("\\n", "\n").split("\n")
+        pending = parts.pop() + hold
+        for ln in parts:
+            if ln.strip():
+                yield ln
+    if pending.strip():
+        yield pending
+
+
+def iter_lines(path: str, chunk_size: int = CHUNK_SIZE, start: int = 0, end: Optional[int] = None,
+               literal: Optional[bool] = None) -> Iterator[str]:
+    """
+    Stream the non-blank lines of `path` (or of bytes [start, end) of it).
+
+    Gives the same lines as normalize_text(read_text()).split("\\n") but never
+    holds more than one line (or one chunk, for literal "\\n" files) in memory.
+    `start`/`end` must sit on line boundaries (see parallel_sort.split_offsets).
+    """
+    if literal is None:
+        literal = uses_literal_newlines(path, chunk_size)
+    if start == 0 and end is None:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            yield from iter_text_lines(f, literal, chunk_size)
+        return
+
+    with open(path, "rb") as raw:
+        raw.seek(start)
+        if end is None:
+            end = os.fstat(raw.fileno()).st_size
+        buffered = io.BufferedReader(_RangeReader(raw, end), CHUNK_SIZE)
+        with io.TextIOWrapper(buffered, encoding="utf-8", errors="replace") as f:
+            yield from iter_text_lines(f, literal, chunk_size)
+
+
+class _LineFeed:
+    """One-slot iterator so a single csv.reader can be reused line by line."""
+    __slots__ = ("line",)
+
+    def __init__(self):
+        self.line = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        ln = self.line
+        if ln is None:
+            raise StopIteration
+        self.line = None
+        return ln
+
+
+def iter_records(lines: Iterable[str]) -> Iterator[List[str]]:
+    """
+    Parse each line as one CSV record, through one long-lived csv.reader.
+
+    Same result as next(csv.reader([ln])) per line: a quote left open at the end
+    of a line is closed there instead of swallowing the following lines.
+    Lines without quotes skip the reader entirely (split gives the same fields).
+    """
+    feed = _LineFeed()
+    reader = csv.reader(feed)
+    for ln in lines:
+        if '"' in ln:
+            feed.line = ln
+            yield next(reader)
+        else:
+            yield ln.split(",")
+
+
+def find_columns(first_row: List[str]) -> Tuple[Tuple[int, Optional[int], Optional[int], Optional[int]], bool]:
+    """Return ((name_i, dob_i, ms_i, addr_i), has_header) for the first parsed row."""
+    header = [norm(h).replace(" ", "_") for h in first_row]
+
+    # Find columns (supports Full Name / Full_Name etc.)
+    def col(*names):
+        for n in names:
+            n = n.replace(" ", "_")
+            if n in header:
+                return header.index(n)
+        return None
+
+    name_i = col("full_name", "name")
+    dob_i = col("dob", "date_of_birth")
+    ms_i = col("marital_status", "status", "marriage_status")
+    addr_i = col("address", "addres")
+
+    # If header not detected, fallback to positions
+    if name_i is None:
+        return (0, 1, 2, 3), False
+    return (name_i, dob_i, ms_i, addr_i), True
+
+
+def clean_records(records: Iterable[List[str]], cols, stats: Dict[str, int]) -> Iterator[List[str]]:
+    """Turn parsed records into [name, dob, status, address]; counts lines in stats["lines"]."""
+    name_i, dob_i, ms_i, addr_i = cols
+    if addr_i is None:
+        addr_i = 3
+    for r in records:
+        stats["lines"] += 1
+        size = len(r)
+        if size < 4:
+            continue
+        yield [
+            r[name_i].strip(),
+            r[dob_i].strip() if dob_i is not None and dob_i < size else "",
+            r[ms_i].strip() if ms_i is not None and ms_i < size else "",
+            (r[addr_i] if size == addr_i + 1 else ",".join(r[addr_i:])).strip(),
+        ]
+
+
+def iter_people(path: str, stats: Optional[Dict[str, int]] = None) -> Iterator[List[str]]:
+    """
+    Stream cleaned [name, dob, status, address] records from `path`.
+
+    Single pass: lines are normalized as they are read and parsed by one reader.
+    `stats["lines"]` is set to the number of non-blank lines seen so far.
+    """
+    if stats is None:
+        stats = {}
+    stats["lines"] = 0
+
+    records = iter_records(iter_lines(path))
+    first = next(records, None)
+    if first is None:
+        return
+    cols, has_header = find_columns(first)
+    if has_header:
+        stats["lines"] = 1
+    else:
+        records = chain((first,), records)
+    yield from clean_records(records, cols, stats)
+
+
+def write_people(path: str, rows) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(OUTPUT_HEADER)
+        w.writerows(rows)